@@ -0,0 +1,132 @@
+# aggregator.py - Fenster-Aggregation (min/max/mean/stddev/count) fuer CircuitPython
+#
+# Statt jede Rohmessung zu publizieren, wird pro Zeitfenster genau eine
+# Zusammenfassung erzeugt. Speicherbedarf ist konstant (Welford-Verfahren),
+# unabhaengig davon, wie viele Messungen in ein Fenster fallen.
+
+import math
+
+
+class RunningStats:
+    """Laufende Statistik eines Messwerts ohne Rohwerte zu speichern."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        if self.min is None or x < self.min:
+            self.min = x
+        if self.max is None or x > self.max:
+            self.max = x
+
+    def stddev(self) -> float:
+        # Populations-Standardabweichung; bei < 2 Werten 0.0
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self._m2 / self.count)
+
+    def summary(self, ndigits: int = 2) -> dict:
+        return {
+            "min": self.min,
+            "max": self.max,
+            "mean": round(self.mean, ndigits),
+            "stddev": round(self.stddev(), ndigits),
+        }
+
+
+class WindowAggregator:
+    """
+    Sammelt Messungen (dict mit den Feldern aus `fields`) in Zeitfenstern
+    der Laenge `window_s` (Sekunden, time.monotonic()).
+
+    add() liefert die Zusammenfassung zurueck, sobald ein Fenster voll ist,
+    sonst None. Die Fenstergrenzen laufen fest im Raster weiter, damit sich
+    keine Drift ueber viele Fenster aufsummiert.
+    """
+
+    def __init__(self, window_s: float, fields=("temperature", "humidity")):
+        self.window_s = window_s
+        self.fields = tuple(fields)
+        self.stats = {f: RunningStats() for f in self.fields}
+        self.count = 0
+        self.window_start = None
+        self.window_end = None
+
+    def add(self, sample: dict, now: float) -> dict | None:
+        if self.window_end is None:
+            self.window_start = now
+            self.window_end = now + self.window_s
+
+        for f in self.fields:
+            v = sample.get(f)
+            if v is not None:
+                self.stats[f].add(v)
+        self.count += 1
+
+        if now >= self.window_end:
+            return self._close(now)
+        return None
+
+    def flush(self, now: float) -> dict | None:
+        """Schliesst das laufende Fenster vorzeitig (z.B. vor dem Abschalten)."""
+        if self.count == 0:
+            return None
+        return self._close(now)
+
+    def _close(self, now: float) -> dict:
+        summary = {
+            "count": self.count,
+            "window_s": self.window_s,
+            "duration_s": round(now - self.window_start, 1),
+        }
+        for f in self.fields:
+            summary[f] = self.stats[f].summary()
+            self.stats[f].reset()
+        self.count = 0
+
+        # Naechstes Fenster im festen Raster; wenn wir weit zurueckliegen
+        # (z.B. lange Sensorausfaelle), neu am aktuellen Zeitpunkt ausrichten.
+        if self.window_end + self.window_s <= now:
+            self.window_start = now
+        else:
+            self.window_start = self.window_end
+        self.window_end = self.window_start + self.window_s
+        return summary
+
+
+class History:
+    """Ringpuffer fester Groesse fuer Rohmessungen (Abruf per HTTP /history)."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._items = [None] * size
+        self._next = 0
+        self.count = 0
+
+    def append(self, item):
+        if self.size <= 0:
+            return
+        self._items[self._next] = item
+        self._next = (self._next + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def items(self, limit: int | None = None) -> list:
+        """Liefert die Eintraege von alt nach neu (optional nur die letzten `limit`)."""
+        n = self.count if limit is None else max(0, min(limit, self.count))
+        start = (self._next - n) % self.size if self.size else 0
+        return [self._items[(start + i) % self.size] for i in range(n)]
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,86 @@
+# announce.py - UDP-Discovery auf dem Geraet (CircuitPython)
+#
+# Das Geraet meldet sich regelmaessig per UDP-Broadcast mit device_id, IP,
+# HTTP-Port und Base-Topic ("announce") und beantwortet Suchanfragen
+# ({"type": "discover"}) direkt an den Absender. Die Host-Seite
+# (fleet/discovery.py) baut daraus einen device_id -> Endpoint-Index, so dass
+# niemand mehr IP-Listen pflegen oder Subnetze scannen muss.
+# Laeuft unveraendert auch unter CPython (pool = das Modul `socket`).
+
+import json
+import time
+
+DISCOVERY_PORT = 5354
+
+
+class Announcer:
+    def __init__(self, pool, info: dict, interval_s=60, listen_port=DISCOVERY_PORT,
+                 announce_port=DISCOVERY_PORT, broadcast_addr="255.255.255.255",
+                 clock=time.monotonic):
+        self.pool = pool
+        self.info = info              # device_id, ip, port, base_topic
+        self.interval_s = interval_s
+        self.listen_port = listen_port
+        self.announce_port = announce_port
+        self.broadcast_addr = broadcast_addr
+        self.clock = clock
+        self._sock = None
+        self._next = 0.0
+        self._buf = bytearray(256)
+        self.stats = {"announced": 0, "queries": 0, "errors": 0}
+
+    def start(self, host="0.0.0.0"):
+        s = self.pool.socket(self.pool.AF_INET, self.pool.SOCK_DGRAM)
+        try:
+            s.setsockopt(self.pool.SOL_SOCKET, self.pool.SO_BROADCAST, 1)
+        except (AttributeError, OSError):
+            pass  # CircuitPython: Broadcast ist ohne Option erlaubt
+        s.bind((host, self.listen_port))
+        s.setblocking(False)
+        self._sock = s
+        self._next = self.clock()
+
+    def stop(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def message(self) -> bytes:
+        msg = {"type": "announce", "ttl": 3 * self.interval_s}
+        msg.update(self.info)
+        return json.dumps(msg).encode("utf-8")
+
+    def poll(self, now=None) -> int:
+        """Suchanfragen beantworten und ggf. periodisch announcen; blockiert nie."""
+        if self._sock is None:
+            return 0
+        now = self.clock() if now is None else now
+        handled = 0
+        while True:
+            try:
+                n, addr = self._sock.recvfrom_into(self._buf)
+            except OSError:
+                break  # nichts da (EAGAIN) oder Fehler: naechster Tick
+            handled += 1
+            try:
+                query = json.loads(bytes(self._buf[:n]).decode("utf-8"))
+            except ValueError:
+                continue
+            if not isinstance(query, dict) or query.get("type") != "discover":
+                continue  # z.B. Announcements anderer Geraete
+            wanted = query.get("device_id")
+            if wanted and wanted != self.info.get("device_id"):
+                continue
+            self.stats["queries"] += 1
+            self._send(addr)
+        if now >= self._next:
+            self._next = now + self.interval_s
+            self._send((self.broadcast_addr, self.announce_port))
+            self.stats["announced"] += 1
+        return handled
+
+    def _send(self, addr):
+        try:
+            self._sock.sendto(self.message(), addr)
+        except OSError:
+            self.stats["errors"] += 1
@@ -0,0 +1,159 @@
+"""asyncio-Client gegen den ThreadPool-Pfad des generierten Clients (CPython).
+
+Aufruf:  python src/project/bench/bench_async_client.py [--devices 500] [--delay 0.05] [--rounds 3]
+
+Ein Unterprozess startet `--devices` lokale Stand-in-Geraete (ein Port je
+Geraet, GET /status mit `--delay` Sekunden Antwortzeit wie ein Pico im
+WLAN, Keep-Alive). Pro Runde wird /status aller Geraete einmal abgefragt:
+  threadpool   DefaultApi.status_get(async_req=True), ein ApiClient je Geraet,
+               alle teilen sich einen ThreadPool() (= cpu_count Threads)
+  thread/dev   wie oben, aber jeder ApiClient mit eigenem ThreadPool()
+               (Standardverhalten: mindestens ein Thread je Geraet)
+  asyncio      AsyncApiClient je Geraet mit gemeinsamem AsyncHTTPTransport
+Runde 1 enthaelt die Verbindungsaufbauten, danach Keep-Alive.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(HERE))
+sys.path.append(os.path.join(os.path.dirname(HERE), "generated", "swagger-python-client"))
+
+from swagger_client import ApiClient, AsyncApiClient, Configuration, DefaultApi  # noqa: E402
+from swagger_client.asyncio_client import AsyncHTTPTransport  # noqa: E402
+
+STATUS = {
+    "device_id": "sensor-bench", "timestamp": "2026-01-19T10:00:00Z", "uptime_s": 1234,
+    "wifi": {"connected": True, "ip": "192.168.1.50", "ssid": "iot"},
+    "mqtt": {"connected": True, "broker": "10.0.0.1", "port": 1883, "base_topic": "iiot/x"},
+    "config": {"interval_s": 10, "aggregation_window_s": 300},
+    "last_sensor": {"temperature": 21.5, "humidity": 40.0, "timestamp": "2026-01-19T10:00:00Z"},
+    "last_published": {"temperature": 21.5, "humidity": 40.0, "timestamp": "2026-01-19T10:00:00Z"},
+}
+
+
+def serve(devices, delay):
+    """Stand-in-Geraete: ein asyncio-Server je Port; Ports als JSON auf stdout."""
+    body = json.dumps(STATUS).encode()
+    head = ("HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            "Content-Length: %d\r\nConnection: keep-alive\r\n\r\n" % len(body)).encode()
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                if not request:
+                    break
+                await asyncio.sleep(delay)
+                writer.write(head + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        servers = [await asyncio.start_server(handle, "127.0.0.1", 0, backlog=64)
+                   for _ in range(devices)]
+        print(json.dumps([s.sockets[0].getsockname()[1] for s in servers]), flush=True)
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+def _config(port):
+    cfg = Configuration()
+    cfg.host = "http://127.0.0.1:%d" % port
+    return cfg
+
+
+def run_threadpool(ports, rounds, shared_pool):
+    clients = [ApiClient(_config(p)) for p in ports]
+    pool = ThreadPool() if shared_pool else None
+    if pool is not None:
+        for c in clients:
+            c._pool = pool
+    apis = [DefaultApi(c) for c in clients]
+    times, peak = [], 0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        pending = [api.status_get(async_req=True) for api in apis]
+        peak = max(peak, threading.active_count())
+        results = [p.get() for p in pending]
+        times.append(time.perf_counter() - t0)
+        assert all(r.device_id == "sensor-bench" for r in results)
+    for c in clients:
+        if c._pool is not None and c._pool is not pool:
+            c._pool.terminate()
+        c._pool = None
+    if pool is not None:
+        pool.terminate()
+    return times, peak
+
+
+def run_asyncio(ports, rounds):
+    async def main():
+        transport = AsyncHTTPTransport(Configuration())
+        apis = [DefaultApi(AsyncApiClient(_config(p), transport=transport)) for p in ports]
+        times = []
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            results = await asyncio.gather(*(api.status_get() for api in apis))
+            times.append(time.perf_counter() - t0)
+            assert all(r.device_id == "sensor-bench" for r in results)
+        await transport.close()
+        return times, threading.active_count()
+
+    return asyncio.run(main())
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--devices", type=int, default=500)
+    ap.add_argument("--delay", type=float, default=0.05, help="Antwortzeit je Geraet [s]")
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.serve:
+        serve(args.devices, args.delay)
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    need = 3 * args.devices + 64
+    if soft < need:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(need, hard), hard))
+    child = subprocess.Popen([sys.executable, __file__, "--serve", "--devices", str(args.devices),
+                              "--delay", str(args.delay)], stdout=subprocess.PIPE, text=True)
+    try:
+        ports = json.loads(child.stdout.readline())
+        print(f"{args.devices} Geraete, {args.delay * 1000:.0f} ms Antwortzeit, "
+              f"cpu_count={os.cpu_count()}")
+        print(f"{'Variante':<12} {'Runde 1 [s]':>12} {'danach [s]':>11} {'Geraete/s':>10} "
+              f"{'Threads':>8}")
+        rows = [
+            ("threadpool", lambda: run_threadpool(ports, args.rounds, shared_pool=True)),
+            ("thread/dev", lambda: run_threadpool(ports, args.rounds, shared_pool=False)),
+            ("asyncio", lambda: run_asyncio(ports, args.rounds)),
+        ]
+        for name, fn in rows:
+            times, threads = fn()
+            steady = min(times[1:]) if len(times) > 1 else times[0]
+            print(f"{name:<12} {times[0]:>12.2f} {steady:>11.2f} {args.devices / steady:>10.0f} "
+                  f"{threads:>8}")
+    finally:
+        child.kill()
+        child.wait()
+
+
+if __name__ == "__main__":
+    main()
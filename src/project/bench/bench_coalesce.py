@@ -0,0 +1,104 @@
+"""Socket-Writes und Bytes on the wire mit/ohne Write-Coalescing (CPython).
+
+Aufruf:  python src/project/bench/bench_coalesce.py [--ticks 2000] [--rtt-ms 0 5]
+
+Pro Tick publiziert das Geraet Temperatur, Feuchte und den retained
+Last-Value (QoS0), jeden 10. Tick zusaetzlich den Status (QoS1). Der Client
+schreibt wie MiniMQTT drei send() pro PUBLISH; gemessen wird, was tatsaechlich
+auf dem Socket landet. "wire" schaetzt zusaetzlich 40 B TCP/IP-Header je Write
+(ohne WLAN-MAC-Overhead, der pro Frame noch einmal dazukommt).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(HERE))
+
+from coalesce import CoalescingSocket  # noqa: E402
+from mqtt_standin import StandinBroker, StandinClient  # noqa: E402
+from outbox import PRIO_STATUS, Outbox  # noqa: E402
+
+TCP_IP_HEADER = 40
+
+
+class CountingSocket:
+    """Zaehlt die Writes auf dem echten Socket."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.writes = 0
+        self.bytes = 0
+
+    def send(self, data):
+        self.writes += 1
+        self.bytes += len(data)
+        return self.sock.send(data)
+
+    def sendall(self, data):
+        self.writes += 1
+        self.bytes += len(data)
+        return self.sock.sendall(data)
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+def run(ticks, coalesce, rtt_s):
+    with StandinBroker(ack_delay_s=rtt_s) as broker:
+        client = StandinClient(broker.host, broker.port)
+        client.connect()
+        counting = CountingSocket(client.sock)
+        client.sock = counting
+        ob = Outbox(capacity=(4, 8, 64))
+        base = "iiot/bench/sensor-1"
+        reading = {"device_id": "sensor-1", "value": 21.5, "timestamp": "2026-01-19T10:00:00Z"}
+
+        def _publish(topic, payload, qos, retain):
+            client.publish(topic, payload, retain=retain, qos=qos)
+
+        t0 = time.perf_counter()
+        for i in range(ticks):
+            ob.put(base + "/temperature", json.dumps(dict(reading, unit="°C")), qos=0)
+            ob.put(base + "/humidity", json.dumps(dict(reading, unit="%")), qos=0)
+            ob.put(base + "/last", json.dumps(reading), qos=0, retain=True)
+            if i % 10 == 0:
+                ob.put(base + "/status", json.dumps({"device_id": "sensor-1", "status": "ok"}),
+                       qos=1, retain=True, prio=PRIO_STATUS)
+            if coalesce:
+                wrapped = CoalescingSocket(counting)
+                client.sock = wrapped
+                try:
+                    ob.drain(_publish, budget_s=60)
+                finally:
+                    client.sock = counting
+                    wrapped.flush()
+            else:
+                ob.drain(_publish, budget_s=60)
+        dt = time.perf_counter() - t0
+        msgs = ob.sent
+        writes, nbytes = counting.writes, counting.bytes
+        client.disconnect()
+    return msgs / dt, writes, nbytes, nbytes + writes * TCP_IP_HEADER, writes / msgs
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--ticks", type=int, default=2000)
+    ap.add_argument("--rtt-ms", type=float, nargs="+", default=[0.0, 5.0])
+    args = ap.parse_args(argv)
+
+    print(f"{'RTT [ms]':>8} {'Variante':<9} {'Pakete/s':>9} {'Writes':>8} {'Writes/Pkt':>10} "
+          f"{'Bytes':>9} {'Wire [B]':>9}")
+    for rtt in args.rtt_ms:
+        ticks = args.ticks if rtt == 0 else max(100, int(args.ticks / (1 + rtt)))
+        for name, co in (("direkt", False), ("coalesce", True)):
+            pps, writes, nbytes, wire, per = run(ticks, co, rtt / 1000.0)
+            print(f"{rtt:>8.1f} {name:<9} {pps:>9.0f} {writes:>8} {per:>10.2f} {nbytes:>9} {wire:>9}")
+
+
+if __name__ == "__main__":
+    main()
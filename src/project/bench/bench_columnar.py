@@ -0,0 +1,98 @@
+"""/history als Modelle gegen spaltenweise Dekodierung (CPython).
+
+Aufruf:  python src/project/bench/bench_columnar.py [--rows 100000] [--batch 1000]
+
+  modelle  DefaultApi.history_get(): eine ReadingSnapshot je Zeile
+           (Properties, datetime-Objekt je Zeitstempel)
+  spalten  DefaultApi.history_get(_columnar=True): je Feld ein Array
+           (Zeitstempel int64 Epoch-Sekunden, Temperatur/Feuchte float32),
+           NumPy falls installiert, sonst array.array
+Gemessen werden Zeilen/s inkl. json.loads auf Antworten mit je `--batch`
+Messungen und die gehaltenen Bytes je Zeile (tracemalloc auf dem Ergebnis,
+ohne den JSON-Text).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(os.path.dirname(HERE), "generated", "swagger-python-client"))
+
+from swagger_client import ApiClient, DefaultApi  # noqa: E402
+from swagger_client import columnar  # noqa: E402
+
+
+class _Resp:
+    def __init__(self, data):
+        self.data = data
+
+
+class CannedClient(ApiClient):
+    """Liefert die vorbereiteten Antworten nacheinander, ohne Netzwerk."""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = responses
+        self.next = 0
+
+    def call_api(self, resource_path, method, *args, response_type=None, **kwargs):
+        response = self.responses[self.next % len(self.responses)]
+        self.next += 1
+        return self.deserialize(response, response_type)
+
+
+def history_payload(rnd, n):
+    t = 1768816800 + rnd.randrange(0, 86400 * 30)
+    return json.dumps([{"temperature": round(rnd.uniform(15, 30), 2),
+                        "humidity": round(rnd.uniform(30, 60), 2),
+                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t + 10 * i))}
+                       for i in range(n)])
+
+
+def held_bytes(fn):
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--batch", type=int, default=1000, help="Messungen je /history-Antwort")
+    args = ap.parse_args(argv)
+
+    rnd = random.Random(1)
+    responses = [_Resp(history_payload(rnd, args.batch)) for _ in range(max(1, args.rows // args.batch))]
+    rows = len(responses) * args.batch
+    api = DefaultApi(CannedClient(responses))
+
+    # gleiche Werte auf beiden Pfaden
+    models = api.history_get()
+    api.api_client.next = 0
+    cols = api.history_get(_columnar=True)
+    assert [int(m.timestamp.timestamp()) for m in models] == list(cols.timestamp)
+    assert all(abs(m.temperature - t) < 1e-3 for m, t in zip(models, cols.temperature))
+
+    backend = "numpy" if columnar.numpy is not None else "array.array"
+    print(f"{rows} Zeilen in Antworten zu {args.batch}, Spalten-Backend {backend}")
+    print(f"{'Variante':<9} {'Zeit [s]':>9} {'Zeilen/s':>11} {'B/Zeile':>8} {'Faktor':>7}")
+    base = None
+    for name, kw in (("modelle", {}), ("spalten", {"_columnar": True})):
+        t0 = time.perf_counter()
+        for _ in responses:
+            api.history_get(**kw)
+        t = time.perf_counter() - t0
+        base = base or t
+        _, size = held_bytes(lambda: api.history_get(**kw))
+        print(f"{name:<9} {t:>9.2f} {rows / t:>11.0f} {size / args.batch:>8.0f} {base / t:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
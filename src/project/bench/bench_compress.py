@@ -0,0 +1,145 @@
+"""Kompressionsrate und Uebertragungszeit grosser Geraete-Antworten (CPython).
+
+Aufruf:  python src/project/bench/bench_compress.py [--kbit 250] [--rounds 3]
+
+Der httpd.Server laeuft lokal; die Sende-Seite des Geraets wird auf
+`--kbit` gedrosselt (schwaches WLAN am Pico: Airtime ist der Engpass, nicht
+die CPU). Gemessen wird die Zeit vom Request bis zum dekodierten Body mit
+dem generierten RESTClientObject, einmal ohne und einmal mit
+Accept-Encoding. Nutzlasten: /history mit 120 bzw. 500 Messungen (DHT11-
+typisch: ganze Grad/Prozent, Zeitstempel im Messintervall) und /status.
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(HERE))
+sys.path.append(os.path.join(os.path.dirname(HERE), "generated", "swagger-python-client"))
+
+from httpd import GET, JSONResponse, Server, compress  # noqa: E402
+from swagger_client import Configuration  # noqa: E402
+from swagger_client.rest import RESTClientObject  # noqa: E402
+
+from bench_http import STATUS  # noqa: E402
+
+
+def history(n, seed=1):
+    rnd = random.Random(seed)
+    t, h, out = 21.0, 40.0, []
+    for i in range(n):
+        t += rnd.choice((-1, 0, 0, 0, 1))
+        h += rnd.choice((-1, 0, 0, 1))
+        ts = 1768816800 + 10 * i
+        out.append({
+            "temperature": float(t), "humidity": float(h),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)),
+        })
+    return out
+
+
+class _Throttled:
+    """Verbindungs-Socket, der send() auf eine feste Bitrate begrenzt."""
+
+    def __init__(self, sock, bytes_per_s):
+        self._s = sock
+        self._rate = bytes_per_s
+
+    def send(self, data):
+        n = self._s.send(data[:1460])    # ein TCP-Segment pro Aufruf
+        time.sleep(n / self._rate)
+        return n
+
+    def __getattr__(self, name):
+        return getattr(self._s, name)
+
+
+class _ThrottledListener:
+    def __init__(self, sock, bytes_per_s):
+        self._s = sock
+        self._rate = bytes_per_s
+
+    def accept(self):
+        conn, addr = self._s.accept()
+        return _Throttled(conn, self._rate), addr
+
+    def __getattr__(self, name):
+        return getattr(self._s, name)
+
+
+class ThrottledPool:
+    AF_INET = socket.AF_INET
+    SOCK_STREAM = socket.SOCK_STREAM
+    SOL_SOCKET = socket.SOL_SOCKET
+    SO_REUSEADDR = socket.SO_REUSEADDR
+
+    def __init__(self, kbit):
+        self.rate = kbit * 1000 / 8
+
+    def socket(self, *args):
+        return _ThrottledListener(socket.socket(*args), self.rate)
+
+    def getaddrinfo(self, *args, **kw):
+        return socket.getaddrinfo(*args, **kw)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--kbit", type=float, default=250.0, help="Sende-Bitrate des Geraets")
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    payloads = {
+        "/history/120": history(120),
+        "/history/500": history(500),
+        "/status": dict(STATUS, http={"accepted": 12, "requests": 40, "timeouts": 0, "errors": 0}),
+    }
+    srv = Server(ThrottledPool(args.kbit), max_connections=2, write_timeout_s=30.0)
+    for path, data in payloads.items():
+        srv.route(path, GET)(lambda request, data=data: JSONResponse(request, data))
+    srv.start("127.0.0.1", 0)
+    stop = threading.Event()
+
+    def _loop():
+        while not stop.is_set():
+            srv.poll()
+            time.sleep(0.001)
+
+    threading.Thread(target=_loop, daemon=True).start()
+
+    print(f"Link: {args.kbit:.0f} kbit/s, Schwelle {srv.compress_min} B")
+    print(f"{'Nutzlast':<14} {'roh [B]':>8} {'gzip [B]':>9} {'Rate':>6} {'zlib [ms]':>10} "
+          f"{'ohne [ms]':>10} {'mit [ms]':>9}")
+    for path, data in payloads.items():
+        body = json.dumps(data).encode()
+        t0 = time.perf_counter()
+        packed = compress(body, "gzip")
+        t_zlib = (time.perf_counter() - t0) * 1000
+        times = {}
+        for label, enc in (("ohne", None), ("mit", "gzip, deflate")):
+            cfg = Configuration()
+            cfg.accept_encoding = enc
+            rest = RESTClientObject(cfg)
+            best = float("inf")
+            for _ in range(args.rounds):
+                t0 = time.perf_counter()
+                r = rest.GET("http://127.0.0.1:%d%s" % (srv.port, path))
+                assert json.loads(r.data) == data
+                best = min(best, time.perf_counter() - t0)
+            times[label] = best * 1000
+        sent = len(packed) if len(body) >= srv.compress_min else len(body)
+        print(f"{path:<14} {len(body):>8} {sent:>9} {len(body) / sent:>5.1f}x {t_zlib:>10.2f} "
+              f"{times['ohne']:>10.0f} {times['mit']:>9.0f}")
+
+    stop.set()
+    srv.stop()
+
+
+if __name__ == "__main__":
+    main()
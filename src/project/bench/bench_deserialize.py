@@ -0,0 +1,203 @@
+"""Deserialisierung im generierten Client: alter rekursiver Pfad gegen Plan-Cache (CPython).
+
+Aufruf:  python src/project/bench/bench_deserialize.py [--n 100000]
+
+  alt   ApiClient.__deserialize wie generiert: Typ-String per Regex zerlegen,
+        Modellklasse per getattr(swagger_client.models, ...) suchen und
+        swagger_types bei jeder Antwort neu durchlaufen
+  plan  ApiClient.deserialize mit vorkompilierten, gecachten Plaenen
+        (Zeitstempel im Geraeteformat ohne dateutil)
+Gemessen wird ApiClient.deserialize() inkl. json.loads auf `--n` synthetischen
+/status-Antworten und auf /history-Antworten mit je 120 Messungen, dazu das
+Parsen der Zeitstempel allein (dateutil gegen den RFC-3339-Schnellpfad).
+
+Mit `--rss N` wird stattdessen in einem frischen Prozess der Speicher fuer
+N gehaltene ReadingSnapshot-Objekte (RSS-Zuwachs) und die Zeit zum Anlegen
+gemessen.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(os.path.dirname(HERE), "generated", "swagger-python-client"))
+
+import six  # noqa: E402
+
+import swagger_client.models  # noqa: E402
+from swagger_client import ApiClient  # noqa: E402
+from swagger_client.api_client import _parse_rfc3339  # noqa: E402
+from dateutil.parser import parse as dateutil_parse  # noqa: E402
+
+
+class LegacyApiClient(ApiClient):
+    """Der generierte Deserialisierer vor dem Plan-Cache (rekursiv, ohne Cache)."""
+
+    def deserialize(self, response, response_type):
+        try:
+            data = json.loads(response.data)
+        except ValueError:
+            data = response.data
+        return self._legacy(data, response_type)
+
+    def _legacy(self, data, klass):
+        if data is None:
+            return None
+        if type(klass) == str:
+            if klass.startswith('list['):
+                sub_kls = re.match(r'list\[(.*)\]', klass).group(1)
+                return [self._legacy(sub_data, sub_kls) for sub_data in data]
+            if klass.startswith('dict('):
+                sub_kls = re.match(r'dict\(([^,]*), (.*)\)', klass).group(2)
+                return {k: self._legacy(v, sub_kls) for k, v in six.iteritems(data)}
+            if klass in self.NATIVE_TYPES_MAPPING:
+                klass = self.NATIVE_TYPES_MAPPING[klass]
+            else:
+                klass = getattr(swagger_client.models, klass)
+        if klass in self.PRIMITIVE_TYPES:
+            try:
+                return klass(data)
+            except TypeError:
+                return data
+        elif klass == object:
+            return data
+        elif klass == datetime.datetime:
+            from dateutil.parser import parse
+            return parse(data)
+        elif klass == datetime.date:
+            from dateutil.parser import parse
+            return parse(data).date()
+        return self._legacy_model(data, klass)
+
+    def _legacy_model(self, data, klass):
+        if not klass.swagger_types and 'get_real_child_model' not in klass.__dict__:
+            return data
+        kwargs = {}
+        if klass.swagger_types is not None:
+            for attr, attr_type in six.iteritems(klass.swagger_types):
+                if (data is not None and klass.attribute_map[attr] in data and
+                        isinstance(data, (list, dict))):
+                    kwargs[attr] = self._legacy(data[klass.attribute_map[attr]], attr_type)
+        return klass(**kwargs)
+
+
+class _Resp:
+    def __init__(self, data):
+        self.data = data
+
+
+def _ts(rnd):
+    t = 1768816800 + rnd.randrange(0, 86400 * 30)
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t))
+
+
+def status_payload(rnd):
+    reading = {"temperature": float(rnd.randint(15, 30)), "humidity": float(rnd.randint(30, 60)),
+               "timestamp": _ts(rnd)}
+    return json.dumps({
+        "device_id": "sensor-%03d" % rnd.randrange(500), "timestamp": _ts(rnd),
+        "uptime_s": rnd.randrange(10 ** 6),
+        "wifi": {"connected": True, "ip": "192.168.1.%d" % rnd.randrange(2, 250), "ssid": "iot"},
+        "mqtt": {"connected": rnd.random() > 0.1, "broker": "10.0.0.1", "port": 1883,
+                 "base_topic": "iiot/group/x"},
+        "config": {"interval_s": 10, "aggregation_window_s": 300},
+        "last_sensor": reading, "last_published": reading,
+    })
+
+
+def history_payload(rnd, n=120):
+    return json.dumps([{"temperature": float(rnd.randint(15, 30)),
+                        "humidity": float(rnd.randint(30, 60)), "timestamp": _ts(rnd)}
+                       for _ in range(n)])
+
+
+def _rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def hold_snapshots(n):
+    """N Snapshots mit eigenen datetime-Objekten anlegen und festhalten."""
+    from swagger_client import ReadingSnapshot
+    t0 = datetime.datetime(2026, 1, 19, tzinfo=datetime.timezone.utc)
+    step = datetime.timedelta(seconds=10)
+    base = _rss_kb()
+    start = time.perf_counter()
+    held = [ReadingSnapshot(humidity=40.0 + i % 7, temperature=21.0 + i % 5,
+                            timestamp=t0 + i * step) for i in range(n)]
+    elapsed = time.perf_counter() - start
+    grown = _rss_kb() - base
+    print(json.dumps({"n": len(held), "rss_mb": round(grown / 1024, 1),
+                      "bytes_per_snapshot": round(grown * 1024 / n), "create_s": round(elapsed, 2)}))
+
+
+def bench(client, responses, response_type):
+    t0 = time.perf_counter()
+    for r in responses:
+        client.deserialize(r, response_type)
+    return time.perf_counter() - t0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--n", type=int, default=100000, help="Anzahl /status-Antworten")
+    ap.add_argument("--rss", type=int, default=0, help="Speicher fuer N gehaltene Snapshots")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.rss:
+        if args.child:
+            hold_snapshots(args.rss)
+            return
+        out = subprocess.run([sys.executable, __file__, "--rss", str(args.rss), "--child"],
+                             check=True, capture_output=True, text=True).stdout
+        r = json.loads(out)
+        print(f"{'Snapshots':>10} {'RSS [MB]':>9} {'B/Snapshot':>11} {'Anlegen [s]':>12}")
+        print(f"{r['n']:>10} {r['rss_mb']:>9.1f} {r['bytes_per_snapshot']:>11} {r['create_s']:>12.2f}")
+        return
+
+    rnd = random.Random(1)
+    status = [_Resp(status_payload(rnd)) for _ in range(args.n)]
+    history = [_Resp(history_payload(rnd)) for _ in range(max(1, args.n // 120))]
+
+    legacy, client = LegacyApiClient(), ApiClient()
+    # gleiche Ergebnisse auf beiden Pfaden
+    for r in status[:50]:
+        assert (legacy.deserialize(r, "StatusResponse").to_dict()
+                == client.deserialize(r, "StatusResponse").to_dict())
+    assert ([x.to_dict() for x in legacy.deserialize(history[0], "list[ReadingSnapshot]")]
+            == [x.to_dict() for x in client.deserialize(history[0], "list[ReadingSnapshot]")])
+
+    print(f"{'Variante':<8} {'Nutzlast':<26} {'Zeit [s]':>9} {'us/Antwort':>11} {'Faktor':>7}")
+    for label, responses, rtype in (("/status", status, "StatusResponse"),
+                                    ("/history (120)", history, "list[ReadingSnapshot]")):
+        base = None
+        for name, c in (("alt", legacy), ("plan", client)):
+            t = bench(c, responses, rtype)
+            base = base or t
+            print(f"{name:<8} {label + ' x%d' % len(responses):<26} {t:>9.2f} "
+                  f"{t / len(responses) * 1e6:>11.1f} {base / t:>6.2f}x")
+
+    stamps = [_ts(rnd) for _ in range(args.n)]
+    assert all(dateutil_parse(s) == _parse_rfc3339(s) for s in stamps[:1000])
+    print()
+    print(f"{'Parser':<10} {'Zeitstempel':>12} {'Zeit [s]':>9} {'us/Stk':>8} {'Faktor':>7}")
+    base = None
+    for name, parse in (("dateutil", dateutil_parse), ("rfc3339", _parse_rfc3339)):
+        t0 = time.perf_counter()
+        for s in stamps:
+            parse(s)
+        t = time.perf_counter() - t0
+        base = base or t
+        print(f"{name:<10} {len(stamps):>12} {t:>9.2f} {t / len(stamps) * 1e6:>8.2f} {base / t:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Durchsatz und p99-Latenz des Geraete-HTTP-Servers mit mehreren Clients (CPython).
+
+Aufruf:  python src/project/bench/bench_http.py [--clients 3] [--seconds 8]
+
+Emuliert die Hauptschleife des Picos in einem Thread:
+  alt:  adafruit_httpserver-Verhalten (eine Anfrage pro poll(), Verbindung
+        wird danach geschlossen), mqtt.loop(1.0) + sleep(0.1) pro Tick
+  neu:  httpd.Server mit Verbindungstabelle + Keep-Alive,
+        mqtt.loop(0.1) + sleep(0.01) pro Tick
+Die Clients (Grafana, Fleet-Poller, Techniker) fragen parallel /status ab.
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(HERE))
+
+from httpd import GET, JSONResponse, Server  # noqa: E402
+
+STATUS = {
+    "device_id": "sensor-bench", "timestamp": "2026-01-19T10:00:00Z", "uptime_s": 1234,
+    "wifi": {"connected": True, "ip": "192.168.1.50", "ssid": "iot"},
+    "mqtt": {"connected": True, "broker": "10.0.0.1", "port": 1883, "base_topic": "iiot/x"},
+    "config": {"interval_s": 10, "aggregation_window_s": 300},
+    "last_sensor": {"temperature": 21.5, "humidity": 40.0, "timestamp": "2026-01-19T10:00:00Z"},
+    "last_published": {"temperature": 21.5, "humidity": 40.0, "timestamp": "2026-01-19T10:00:00Z"},
+}
+
+
+class LegacyServer(Server):
+    """Wie adafruit_httpserver: pro poll() eine Verbindung, eine Anfrage, dann close."""
+
+    def poll(self, budget_s=None):
+        try:
+            conn, addr = self._sock.accept()
+        except OSError:
+            return 0
+        conn.setblocking(True)
+        conn.settimeout(1.0)
+        try:
+            buf = b""
+            while b"\r\n\r\n" not in buf:
+                chunk = conn.recv(1024)
+                if not chunk:
+                    return 0
+                buf += chunk
+            line = buf.split(b"\r\n", 1)[0].decode()
+            method, path, _ = line.split(" ", 2)
+            resp = self._dispatch(_Req(method, path))
+            head = "HTTP/1.1 %d OK\r\nContent-Type: %s\r\nContent-Length: %d\r\nConnection: close\r\n\r\n" % (
+                resp.status, resp.content_type, len(resp.body))
+            conn.sendall(head.encode() + resp.body)
+        except OSError:
+            pass
+        finally:
+            conn.close()
+        return 1
+
+
+class _Req:
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+
+
+def device_loop(server, mqtt_block_s, sleep_s, stop):
+    while not stop.is_set():
+        server.poll()
+        time.sleep(mqtt_block_s)   # mqtt.loop(timeout)
+        time.sleep(sleep_s)
+
+
+def client(port, stop, latencies, errors):
+    conn = None
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            conn.request("GET", "/status")
+            r = conn.getresponse()
+            r.read()
+            if r.getheader("Connection") == "close":
+                conn.close()
+                conn = None
+            latencies.append(time.perf_counter() - t0)
+        except (OSError, http.client.HTTPException):
+            errors.append(1)
+            if conn is not None:
+                conn.close()
+            conn = None
+
+
+def run(server_cls, mqtt_block_s, sleep_s, clients, seconds, **server_kw):
+    srv = server_cls(socket, **server_kw)
+
+    @srv.route("/status", GET)
+    def status(request):
+        return JSONResponse(request, STATUS)
+
+    srv.start("127.0.0.1", 0)
+    stop_dev, stop_cli = threading.Event(), threading.Event()
+    dev = threading.Thread(target=device_loop, args=(srv, mqtt_block_s, sleep_s, stop_dev), daemon=True)
+    dev.start()
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(srv.port, stop_cli, latencies, errors), daemon=True)
+               for _ in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop_cli.set()
+    for t in threads:
+        t.join(12)
+    elapsed = time.perf_counter() - t0
+    stop_dev.set()
+    dev.join()
+    srv.stop()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] if latencies else float("nan")
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else float("nan")
+    return len(latencies) / elapsed, p50 * 1000, p99 * 1000, len(errors)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--clients", type=int, default=3)
+    ap.add_argument("--seconds", type=float, default=8.0)
+    args = ap.parse_args(argv)
+
+    print(f"{'Variante':<10} {'req/s':>8} {'p50 [ms]':>9} {'p99 [ms]':>9} {'Fehler':>7}")
+    rows = [
+        ("alt", LegacyServer, 1.0, 0.1, {}),
+        ("neu", Server, 0.1, 0.01, {"max_connections": 4}),
+    ]
+    for name, cls, block, sleep_s, kw in rows:
+        rps, p50, p99, err = run(cls, block, sleep_s, args.clients, args.seconds, **kw)
+        print(f"{name:<10} {rps:>8.1f} {p50:>9.0f} {p99:>9.0f} {err:>7}")
+
+
+if __name__ == "__main__":
+    main()
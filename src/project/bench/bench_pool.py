@@ -0,0 +1,74 @@
+"""Verbindungs-Pools des generierten Clients bei vielen Geraeten (CPython).
+
+Aufruf:  python src/project/bench/bench_pool.py [--devices 200] [--requests 5000]
+
+Stand-in-Geraete wie in bench_async_client.py (ein Port je Geraet,
+Keep-Alive, ohne Antwortverzoegerung). Ein RESTClientObject fragt sie
+reihum ab, wie eine Scrape-Schleife ueber die Flotte:
+  alt        4 Host-Pools (urllib3/swagger-Standard vorher): bei mehr als
+             vier Geraeten wird fast jeder Aufruf neu verbunden
+  flotte     Configuration-Standard (connection_pool_hosts=512,
+             Keep-Alive-Probes, Timeouts)
+Gezaehlt werden geoeffnete TCP-Verbindungen je 1000 Anfragen und die
+Pool-Trefferquote (RESTClientObject.pool_stats()).
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(os.path.dirname(HERE), "generated", "swagger-python-client"))
+
+from swagger_client import Configuration  # noqa: E402
+from swagger_client.rest import RESTClientObject  # noqa: E402
+
+
+def run(urls, requests, **settings):
+    cfg = Configuration()
+    for k, v in settings.items():
+        setattr(cfg, k, v)
+    client = RESTClientObject(cfg)
+    t0 = time.perf_counter()
+    for i in range(requests):
+        client.request("GET", urls[i % len(urls)])
+    elapsed = time.perf_counter() - t0
+    stats = client.pool_stats()
+    client.pool_manager.clear()
+    return elapsed, stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--devices", type=int, default=200)
+    ap.add_argument("--requests", type=int, default=5000)
+    args = ap.parse_args(argv)
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    need = 3 * args.devices + 64
+    if soft < need:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(need, hard), hard))
+    child = subprocess.Popen([sys.executable, os.path.join(HERE, "bench_async_client.py"), "--serve",
+                              "--devices", str(args.devices), "--delay", "0"],
+                             stdout=subprocess.PIPE, text=True)
+    try:
+        urls = ["http://127.0.0.1:%d/status" % p for p in json.loads(child.stdout.readline())]
+        print(f"{args.devices} Geraete, {args.requests} Anfragen reihum")
+        print(f"{'Variante':<8} {'Zeit [s]':>9} {'Anfr./s':>8} {'Verb./1000':>11} "
+              f"{'Pool-Treffer':>13} {'verdraengt':>11}")
+        for name, settings in (("alt", {"connection_pool_hosts": 4}), ("flotte", {})):
+            elapsed, s = run(urls, args.requests, **settings)
+            print(f"{name:<8} {elapsed:>9.2f} {args.requests / elapsed:>8.0f} "
+                  f"{s['connections_opened'] * 1000 / s['requests']:>11.0f} "
+                  f"{s['pool_hit_rate']:>12.1%} {s['pools_evicted']:>11}")
+    finally:
+        child.kill()
+        child.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Energie pro Messung und Datenlatenz: Dauerbetrieb vs. Duty-Cycle (Modell).
+
+Aufruf:  python src/project/bench/bench_power.py [--interval 30] [--awake 1.2] [--upload 4.0]
+
+Rechnet mit dutycycle.EnergyModel und typischen Phasendauern des Pico W
+(`--awake`: Wake + DHT11-Messung, `--upload`: WLAN + NTP + MQTT + Batch).
+Die Stromwerte sind Modellannahmen; echte Werte liefert das Feld `energy`
+im Batch-Upload bzw. ein Messgeraet an der Versorgung.
+"""
+
+import argparse
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(HERE))
+
+from dutycycle import EnergyModel  # noqa: E402
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--interval", type=float, default=30.0)
+    ap.add_argument("--awake", type=float, default=1.2)
+    ap.add_argument("--upload", type=float, default=4.0)
+    ap.add_argument("--battery-mah", type=float, default=2000.0)
+    args = ap.parse_args(argv)
+    model = EnergyModel()
+
+    print(f"{'Modus':<12} {'mJ/Messung':>11} {'mA (Mittel)':>12} {'Akku [d]':>9} {'Latenz max [s]':>15}")
+    # Dauerbetrieb: WLAN immer an, jede Messung sofort publiziert
+    n = 100
+    r = model.report(n, 0, 0, int(n * args.interval * 1000), battery_mah=args.battery_mah)
+    print(f"{'continuous':<12} {r['mj_per_sample']:>11.1f} {r['avg_ma']:>12.2f} "
+          f"{r['battery_days']:>9.1f} {0:>15.0f}")
+    for every in (1, 5, 10, 30):
+        awake_ms = int(every * args.awake * 1000)
+        upload_ms = int(args.upload * 1000)
+        sleep_ms = int(every * args.interval * 1000) - awake_ms - upload_ms
+        r = model.report(every, awake_ms, max(0, sleep_ms), upload_ms, battery_mah=args.battery_mah)
+        latency = (every - 1) * args.interval + args.upload
+        print(f"{'duty N=%d' % every:<12} {r['mj_per_sample']:>11.1f} {r['avg_ma']:>12.2f} "
+              f"{r['battery_days']:>9.1f} {latency:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
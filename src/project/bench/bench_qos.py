@@ -0,0 +1,59 @@
+"""Nachrichten/s bei QoS0 vs. QoS1 gegen den lokalen Broker-Stand-in.
+
+Aufruf:  python src/project/bench/bench_qos.py [--count 2000] [--rtt-ms 0 5 20]
+
+Die Telemetrie laeuft wie auf dem Geraet ueber die Outbox; `--rtt-ms`
+verzoegert den PUBACK des Stand-ins und bildet so die WLAN-Round-Trip-Zeit
+nach, die bei QoS1 pro Nachricht anfaellt.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(HERE))
+
+from mqtt_standin import StandinBroker, StandinClient  # noqa: E402
+from outbox import Outbox  # noqa: E402
+
+
+def run(count, qos, rtt_s):
+    with StandinBroker(ack_delay_s=rtt_s) as broker:
+        client = StandinClient(broker.host, broker.port)
+        client.connect()
+        ob = Outbox(capacity=(4, 8, count), max_inflight=count)
+
+        def _publish(topic, payload, q, retain):
+            client.publish(topic, payload, retain=retain, qos=q)
+
+        payload = json.dumps({"device_id": "bench", "unit": "°C", "value": 21.5,
+                              "timestamp": "2026-01-19T10:00:00Z"})
+        t0 = time.perf_counter()
+        for _ in range(count):
+            ob.put("iiot/bench/sensor/temperature", payload, qos=qos)
+        ob.drain(_publish, budget_s=3600)
+        dt = time.perf_counter() - t0
+        client.disconnect()
+    return count / dt
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--count", type=int, default=2000)
+    ap.add_argument("--rtt-ms", type=float, nargs="+", default=[0.0, 5.0, 20.0])
+    args = ap.parse_args(argv)
+
+    print(f"{'RTT [ms]':>8} {'QoS0 msg/s':>12} {'QoS1 msg/s':>12} {'Faktor':>7}")
+    for rtt in args.rtt_ms:
+        # Mit RTT nur einen Bruchteil senden, sonst dauert QoS1 ewig
+        n = args.count if rtt == 0 else max(50, int(args.count / (1 + rtt)))
+        q0 = run(n, 0, rtt / 1000.0)
+        q1 = run(n, 1, rtt / 1000.0)
+        print(f"{rtt:>8.1f} {q0:>12.0f} {q1:>12.0f} {q0 / q1:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
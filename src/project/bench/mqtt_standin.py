@@ -0,0 +1,257 @@
+"""Minimaler MQTT-3.1.1-Broker/Client als Stand-in fuer Benchmarks (CPython).
+
+Kein vollstaendiger Broker: CONNECT/CONNACK, PUBLISH mit QoS 0/1 (PUBACK),
+Retained Messages, SUBSCRIBE mit exakten Topics oder `prefix/#`, PINGREQ und
+DISCONNECT. Das reicht, um das Sendeverhalten des Geraets (MiniMQTT schreibt
+Fixed Header, Topic und Payload als getrennte send()-Aufrufe) auf dem
+Laptop nachzustellen und zu vermessen.
+"""
+
+import socket
+import struct
+import threading
+import time
+
+
+def encode_remaining_length(n):
+    out = bytearray()
+    while True:
+        b = n % 128
+        n //= 128
+        if n:
+            b |= 0x80
+        out.append(b)
+        if not n:
+            return bytes(out)
+
+
+def encode_str(s):
+    b = s.encode("utf-8") if isinstance(s, str) else s
+    return struct.pack("!H", len(b)) + b
+
+
+def publish_packet(topic, payload, qos=0, retain=False, pid=1):
+    """Kompletter PUBLISH als ein bytes-Objekt."""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    var = encode_str(topic) + (struct.pack("!H", pid) if qos else b"")
+    fixed = bytes([0x30 | (qos << 1) | int(bool(retain))])
+    return fixed + encode_remaining_length(len(var) + len(payload)) + var + payload
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("Verbindung geschlossen")
+        buf += chunk
+    return bytes(buf)
+
+
+def read_packet(sock):
+    """Liest ein Paket -> (typ, flags, body)."""
+    first = _recv_exact(sock, 1)[0]
+    mult, length = 1, 0
+    while True:
+        b = _recv_exact(sock, 1)[0]
+        length += (b & 0x7F) * mult
+        if not b & 0x80:
+            break
+        mult *= 128
+    return first >> 4, first & 0x0F, _recv_exact(sock, length) if length else b""
+
+
+def _topic_matches(flt, topic):
+    if flt.endswith("/#"):
+        return topic.startswith(flt[:-1]) or topic == flt[:-2]
+    return flt == topic
+
+
+class StandinBroker:
+    """Broker im Hintergrund-Thread; `ack_delay_s` simuliert die Funk-RTT."""
+
+    def __init__(self, host="127.0.0.1", port=0, ack_delay_s=0.0):
+        self.ack_delay_s = ack_delay_s
+        self.retained = {}
+        self.stats = {"connections": 0, "packets": 0, "publishes": 0, "bytes": 0}
+        self._subs = []  # (filter, sock)
+        self._lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._sock.listen(16)
+        self.host, self.port = self._sock.getsockname()
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def close(self):
+        self._running = False
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self.stats["connections"] += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            while True:
+                ptype, flags, body = read_packet(conn)
+                with self._lock:
+                    self.stats["packets"] += 1
+                    self.stats["bytes"] += len(body) + 2
+                if ptype == 1:      # CONNECT
+                    conn.sendall(b"\x20\x02\x00\x00")
+                elif ptype == 3:    # PUBLISH
+                    self._on_publish(conn, flags, body)
+                elif ptype == 8:    # SUBSCRIBE
+                    self._on_subscribe(conn, body)
+                elif ptype == 12:   # PINGREQ
+                    conn.sendall(b"\xd0\x00")
+                elif ptype == 14:   # DISCONNECT
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with self._lock:
+                self._subs = [s for s in self._subs if s[1] is not conn]
+            conn.close()
+
+    def _on_publish(self, conn, flags, body):
+        qos = (flags >> 1) & 0x03
+        retain = flags & 0x01
+        tlen = struct.unpack("!H", body[:2])[0]
+        topic = body[2:2 + tlen].decode("utf-8")
+        pos = 2 + tlen
+        pid = None
+        if qos:
+            pid = body[pos:pos + 2]
+            pos += 2
+        payload = body[pos:]
+        with self._lock:
+            self.stats["publishes"] += 1
+            if retain:
+                if payload:
+                    self.retained[topic] = payload
+                else:
+                    self.retained.pop(topic, None)
+            targets = [s for f, s in self._subs if _topic_matches(f, topic)]
+        if qos:
+            if self.ack_delay_s:
+                time.sleep(self.ack_delay_s)
+            conn.sendall(b"\x40\x02" + pid)
+        for s in targets:
+            try:
+                s.sendall(publish_packet(topic, payload, 0, False))
+            except OSError:
+                pass
+
+    def _on_subscribe(self, conn, body):
+        pid = body[:2]
+        pos = 2
+        filters = []
+        while pos < len(body):
+            flen = struct.unpack("!H", body[pos:pos + 2])[0]
+            filters.append(body[pos + 2:pos + 2 + flen].decode("utf-8"))
+            pos += 2 + flen + 1
+        with self._lock:
+            for f in filters:
+                self._subs.append((f, conn))
+            retained = [(t, p) for t, p in self.retained.items()
+                        if any(_topic_matches(f, t) for f in filters)]
+        conn.sendall(b"\x90" + encode_remaining_length(2 + len(filters)) + pid + b"\x00" * len(filters))
+        for t, p in retained:
+            conn.sendall(publish_packet(t, p, 0, True))
+
+
+class StandinClient:
+    """
+    Publiziert wie MiniMQTT: Fixed Header, variabler Header und Payload als
+    drei getrennte send()-Aufrufe; bei QoS1 wird blockierend auf den PUBACK
+    gewartet. `sends`/`bytes_sent` zaehlen, was auf den Socket geht.
+    """
+
+    def __init__(self, host, port, client_id="bench", nodelay=True):
+        self.sock = socket.create_connection((host, port))
+        if nodelay:
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.client_id = client_id
+        self.sends = 0
+        self.bytes_sent = 0
+        self._pid = 0
+
+    def send(self, data):
+        self.sends += 1
+        self.bytes_sent += len(data)
+        return self.sock.send(data)
+
+    def recv(self, n):
+        return self.sock.recv(n)
+
+    def connect(self):
+        var = encode_str("MQTT") + b"\x04\x02" + struct.pack("!H", 30)
+        body = var + encode_str(self.client_id)
+        self.sock.sendall(b"\x10" + encode_remaining_length(len(body)) + body)
+        ptype, _, _ = read_packet(self.sock)
+        assert ptype == 2, "kein CONNACK"
+
+    def publish(self, topic, payload, retain=False, qos=0):
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        var = encode_str(topic)
+        if qos:
+            self._pid = self._pid % 0xFFFF + 1
+            var += struct.pack("!H", self._pid)
+        fixed = bytes([0x30 | (qos << 1) | int(bool(retain))])
+        self.send(fixed + encode_remaining_length(len(var) + len(payload)))
+        self.send(var)
+        self.send(payload)
+        if qos:
+            self.wait_puback()
+
+    def wait_puback(self):
+        while True:
+            ptype, _, _ = read_packet(self)
+            if ptype == 4:
+                return
+
+    def subscribe(self, topic):
+        self._pid = self._pid % 0xFFFF + 1
+        body = struct.pack("!H", self._pid) + encode_str(topic) + b"\x00"
+        self.sock.sendall(b"\x82" + encode_remaining_length(len(body)) + body)
+        ptype, _, _ = read_packet(self.sock)
+        assert ptype == 9, "kein SUBACK"
+
+    def read_publish(self, timeout=1.0):
+        """Naechste eingehende PUBLISH -> (topic, payload, retain) oder None."""
+        self.sock.settimeout(timeout)
+        try:
+            ptype, flags, body = read_packet(self.sock)
+        except socket.timeout:
+            return None
+        finally:
+            self.sock.settimeout(None)
+        tlen = struct.unpack("!H", body[:2])[0]
+        return body[2:2 + tlen].decode("utf-8"), body[2 + tlen:], bool(flags & 0x01)
+
+    def disconnect(self):
+        try:
+            self.sock.sendall(b"\xe0\x00")
+        finally:
+            self.sock.close()
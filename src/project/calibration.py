@@ -0,0 +1,106 @@
+# calibration.py - Kalibrier-/Transformationskette je Messgroesse fuer CircuitPython
+#
+# Konfiguration in settings.toml als String, Schritte mit ";" getrennt und
+# in dieser Reihenfolge angewendet, z.B.
+#   CAL_TEMPERATURE = "offset:-0.5;gain:1.02;clamp:-40,80;round:1"
+#   CAL_HUMIDITY = "poly:1.5,0.97;clamp:0,100;round:0"
+# Schritte:
+#   offset:a        x + a
+#   gain:g          x * g
+#   poly:c0,c1,...  c0 + c1*x + c2*x^2 + ...
+#   clamp:lo,hi     auf [lo, hi] begrenzen
+#   round:n         auf n Nachkommastellen (Sensoraufloesung) runden
+# Einmal auf dem Geraet angewendet, statt bei jeder Grafana/Flux-Abfrage.
+
+OPS = ("offset", "gain", "poly", "clamp", "round")
+
+
+def parse_chain(spec: str) -> list:
+    """'offset:-0.5;round:1' -> [("offset", (-0.5,)), ("round", (1,))]; ValueError bei Unsinn."""
+    chain = []
+    for part in (spec or "").split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        if ":" not in part:
+            raise ValueError("Schritt ohne Parameter: " + part)
+        op, args = part.split(":", 1)
+        op = op.strip().lower()
+        if op not in OPS:
+            raise ValueError("unbekannter Schritt: " + op)
+        params = tuple(float(a) for a in args.split(","))
+        if op in ("offset", "gain") and len(params) != 1:
+            raise ValueError(op + " erwartet genau einen Wert")
+        if op == "clamp" and (len(params) != 2 or params[0] > params[1]):
+            raise ValueError("clamp erwartet lo,hi mit lo <= hi")
+        if op == "round":
+            if len(params) != 1 or params[0] < 0:
+                raise ValueError("round erwartet Nachkommastellen >= 0")
+            params = (int(params[0]),)
+        chain.append((op, params))
+    return chain
+
+
+def format_chain(chain: list) -> str:
+    """Normalisierte Schreibweise fuer die Status-Metadaten."""
+    parts = []
+    for op, params in chain:
+        parts.append(op + ":" + ",".join(str(p) for p in params))
+    return ";".join(parts)
+
+
+def apply_chain(chain: list, x: float) -> float:
+    for op, p in chain:
+        if op == "offset":
+            x = x + p[0]
+        elif op == "gain":
+            x = x * p[0]
+        elif op == "poly":
+            y = 0.0
+            for c in reversed(p):   # Horner
+                y = y * x + c
+            x = y
+        elif op == "clamp":
+            x = min(p[1], max(p[0], x))
+        elif op == "round":
+            x = round(x, p[0])
+    return x
+
+
+class Calibration:
+    """Ketten je Feld; Felder ohne Kette bleiben unveraendert."""
+
+    def __init__(self, specs: dict):
+        self.chains = {}
+        self.errors = {}
+        for field, spec in specs.items():
+            try:
+                chain = parse_chain(spec)
+            except ValueError as e:
+                # Fehlkonfiguration: Rohwert publizieren statt gar nichts
+                self.errors[field] = str(e)
+                continue
+            if chain:
+                self.chains[field] = chain
+
+    @classmethod
+    def from_settings(cls, cfg: dict, fields=("temperature", "humidity")):
+        specs = {}
+        for field in fields:
+            specs[field] = cfg.get("CAL_" + field.upper(), "")
+        return cls(specs)
+
+    def apply(self, data: dict) -> dict:
+        out = dict(data)
+        for field, chain in self.chains.items():
+            if out.get(field) is not None:
+                out[field] = apply_chain(chain, out[field])
+        return out
+
+    def metadata(self) -> dict:
+        meta = {}
+        for field, chain in self.chains.items():
+            meta[field] = format_chain(chain)
+        for field, err in self.errors.items():
+            meta[field] = {"error": err}
+        return meta
@@ -0,0 +1,85 @@
+# coalesce.py - Schreibpuffer fuer den MiniMQTT-Socket (CircuitPython)
+#
+# MiniMQTT schreibt pro PUBLISH Fixed Header, Topic und Payload mit drei
+# getrennten send()-Aufrufen - ueber WLAN werden daraus viele winzige
+# TCP-Segmente. CoalescingSocket sammelt die Schreibaufrufe und gibt sie als
+# einen send() weiter: sobald gelesen wird (PUBACK/PINGRESP, die Gegenseite
+# braucht vorher die komplette Anfrage), der Puffer `max_buffer` erreicht
+# oder der Aufrufer flush() ruft (Ende eines Outbox-Durchlaufs).
+# Meldet der Socket laenger als `flush_timeout_s` EAGAIN, wirft flush()
+# OSError(ETIMEDOUT); der ungesendete Rest bleibt im Puffer.
+
+import time
+
+EAGAIN = 11
+ETIMEDOUT = 110
+
+
+class CoalescingSocket:
+    def __init__(self, sock, max_buffer=1024, stats=None, flush_timeout_s=2.0):
+        self.sock = sock
+        self.max_buffer = max_buffer
+        self.flush_timeout_s = flush_timeout_s
+        self._buf = bytearray()
+        # sends = Schreibaufrufe des Clients, writes = tatsaechliche Socket-Writes
+        self.stats = stats if stats is not None else {"sends": 0, "writes": 0, "bytes": 0}
+
+    def send(self, data) -> int:
+        self._buf += data   # kopiert auch memoryview-Slices von MiniMQTT
+        self.stats["sends"] += 1
+        if len(self._buf) >= self.max_buffer:
+            self.flush()
+        return len(data)
+
+    def sendall(self, data):
+        self.send(data)
+
+    def pending(self) -> int:
+        return len(self._buf)
+
+    def flush(self):
+        if not self._buf:
+            return
+        view = memoryview(self._buf)
+        sent = 0
+        deadline = None
+        try:
+            while sent < len(self._buf):
+                try:
+                    n = self.sock.send(view[sent:])
+                except OSError as e:
+                    if not (e.args and e.args[0] == EAGAIN):
+                        raise
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_timeout_s
+                    elif time.monotonic() >= deadline:
+                        raise OSError(ETIMEDOUT, "flush: socket not writable")
+                    time.sleep(0.005)
+                    continue
+                if not isinstance(n, int):   # manche send() liefern nichts zurueck
+                    n = len(self._buf) - sent
+                sent += n
+        finally:
+            # bei Fehler bleibt der ungesendete Rest fuer den naechsten Versuch
+            if sent:
+                self.stats["writes"] += 1
+                self.stats["bytes"] += sent
+                self._buf = self._buf[sent:]
+
+    def recv_into(self, buf, nbytes=0):
+        self.flush()
+        return self.sock.recv_into(buf, nbytes)
+
+    def recv(self, bufsize):
+        self.flush()
+        return self.sock.recv(bufsize)
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.sock.close()
+
+    def __getattr__(self, name):
+        # settimeout, setblocking, ... unveraendert durchreichen
+        return getattr(self.sock, name)
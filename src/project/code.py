@@ -13,14 +13,21 @@ import digitalio
 import wifi
 import socketpool
 import adafruit_dht
-import adafruit_ntp
-import adafruit_minimqtt.adafruit_minimqtt as MQTT
-from adafruit_httpserver import Server, Request, Response, JSONResponse, GET, POST
 import toml
+from aggregator import WindowAggregator, History
+from outbox import Outbox, PRIO_STATUS, PRIO_REPLY, PRIO_TELEMETRY
+from coalesce import CoalescingSocket
 import rtc
 import json
-import ssl
-import re
+import microcontroller
+from health import LoopHealth, Breadcrumbs, boot_report
+from ledstatus import LedStatus
+from calibration import Calibration
+from remoteconfig import ConfigSync
+
+# Schnellstart: adafruit_ntp, MiniMQTT, httpd, ssl und re werden
+# erst dort importiert, wo sie gebraucht werden (ssl nur bei Port 8883,
+# re nur beim Persistieren). Das verkuerzt die Zeit bis zur ersten Messung.
 
 # ============================== Config ==============================
 
@@ -36,34 +43,45 @@ class ConfigManager:
             print("Fehler beim Laden der settings:", e)
             return {}
 
-def update_interval_in_file(filepath: str, new_interval: int) -> bool:
+def update_settings_in_file(filepath: str, updates: dict) -> bool:
     """
-    Ersetzt/fuegt READING_INTERVAL_SECONDS in settings.toml.
-    Robuste Zeilenersetzung ohne toml.dumps-Abhaengigkeit.
+    Ersetzt/fuegt mehrere Schluessel in settings.toml mit einem Schreibvorgang.
+    Robuste Zeilenersetzung ohne toml.dumps-Abhaengigkeit; Werte: int, bool, str.
     """
+    import re
+
     try:
         with open(filepath, "r") as f:
             content = f.read()
     except Exception:
         content = ""
 
-    pattern = r'(?m)^\s*READING_INTERVAL_SECONDS\s*=\s*\d+\s*$'
-    line = f"READING_INTERVAL_SECONDS = {new_interval}"
+    for key, value in updates.items():
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        elif isinstance(value, str):
+            value = '"' + value + '"'
+        pattern = r'(?m)^\s*' + key + r'\s*=.*$'
+        line = f"{key} = {value}"
 
-    if re.search(pattern, content):
-        new_content = re.sub(pattern, line, content)
-    else:
-        sep = "" if content.endswith("\n") or content == "" else "\n"
-        new_content = f"{content}{sep}{line}\n"
+        if re.search(pattern, content):
+            content = re.sub(pattern, line, content)
+        else:
+            sep = "" if content.endswith("\n") or content == "" else "\n"
+            content = f"{content}{sep}{line}\n"
 
     try:
         with open(filepath, "w") as f:
-            f.write(new_content)
+            f.write(content)
         return True
     except Exception as e:
         print("Persistenz-Fehler:", e)
         return False
 
+def update_interval_in_file(filepath: str, new_interval: int) -> bool:
+    """Ersetzt/fuegt READING_INTERVAL_SECONDS in settings.toml."""
+    return update_settings_in_file(filepath, {"READING_INTERVAL_SECONDS": int(new_interval)})
+
 # ============================== Helpers =============================
 
 def iso_utc(ts: float | None = None) -> str:
@@ -73,6 +91,43 @@ def iso_utc(ts: float | None = None) -> str:
     # localtime ist nach NTP-Set UTC, daher "Z"
     return f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}Z"
 
+# Vor diesem Zeitpunkt (Sept. 2020) ist die RTC sicher nicht gestellt
+CLOCK_VALID_AFTER = 1600000000
+
+def backoff_s(attempt: int, base: float = 0.5, cap: float = 4.0) -> float:
+    # 0.5, 1, 2, 4, 4, ... Sekunden statt fester 2 s zwischen Versuchen
+    return min(cap, base * (2 ** attempt))
+
+def new_epoch() -> int:
+    # Zufaellige Boot-Epoche (31 bit): trennt die Sequenznummern verschiedener Boots
+    try:
+        import os
+        return int.from_bytes(os.urandom(4), "big") & 0x7FFFFFFF
+    except (ImportError, NotImplementedError):
+        return int(time.monotonic() * 1000) & 0x7FFFFFFF
+
+class BootTimer:
+    """Misst die Dauer der Boot-Phasen; der Report wird nach dem Connect publiziert."""
+
+    def __init__(self):
+        self.t0 = time.monotonic()
+        self.last = self.t0
+        self.phases = {}
+
+    def mark(self, phase: str):
+        now = time.monotonic()
+        self.phases[phase] = round(now - self.last, 3)
+        self.last = now
+
+    def since_start(self) -> float:
+        return round(time.monotonic() - self.t0, 3)
+
+    def report(self) -> dict:
+        return {
+            "phases": self.phases,
+            "total_s": round(self.last - self.t0, 3),
+        }
+
 # ============================== Network =============================
 
 class NetworkManager:
@@ -91,7 +146,7 @@ class NetworkManager:
                 return True
             except Exception as e:
                 print(f"Fehler bei WLAN-Verbindung (Versuch {attempt+1}/5):", e)
-                time.sleep(2)
+                time.sleep(backoff_s(attempt))
         return False
 
     def get_ip(self) -> str:
@@ -103,24 +158,54 @@ class NetworkManager:
 # ============================== Sensor ==============================
 
 class Sensor:
-    def __init__(self, pin_number: int):
+    def __init__(self, pin_number: int, calibration: Calibration | None = None):
         # DHT11 ist langsam; immer >=2s zwischen Messungen einhalten
         self.dht = adafruit_dht.DHT11(getattr(board, f"GP{pin_number}"))
+        self.calibration = calibration
 
     def read_data(self) -> dict | None:
         try:
             t = self.dht.temperature
             h = self.dht.humidity
             if (t is not None) and (h is not None):
-                return {"temperature": float(t), "humidity": float(h)}
+                data = {"temperature": float(t), "humidity": float(h)}
+                # Kalibrierung einmal hier statt bei jeder Abfrage in Grafana/Flux
+                if self.calibration is not None:
+                    data = self.calibration.apply(data)
+                return data
         except Exception:
             pass
         return None
 
 # ============================== MQTT ================================
 
+# QoS/Retain je Nachrichtenklasse: (qos, retain). MiniMQTT kann nur QoS 0/1.
+DEFAULT_PUBLISH_POLICY = {
+    "status":    (1, True),
+    "reply":     (1, False),
+    "summary":   (1, False),
+    "telemetry": (0, False),   # spart den PUBACK-Round-Trip pro Messwert
+    "last":      (0, True),    # letzter Wert, retained fuer spaete Abonnenten
+    "batch":     (1, False),   # Duty-Cycle: gepufferte Messungen als ein Upload
+}
+
+def load_publish_policy(cfg: dict) -> dict:
+    """
+    Liest MQTT_QOS_<KLASSE> / MQTT_RETAIN_<KLASSE> aus settings.toml,
+    z.B. MQTT_QOS_TELEMETRY = 1 oder MQTT_RETAIN_SUMMARY = true.
+    """
+    policy = {}
+    for name, (qos, retain) in DEFAULT_PUBLISH_POLICY.items():
+        key = name.upper()
+        qos = min(1, max(0, int(cfg.get("MQTT_QOS_" + key, qos))))
+        retain = bool(cfg.get("MQTT_RETAIN_" + key, retain))
+        policy[name] = (qos, retain)
+    return policy
+
 class MqttClient:
-    def __init__(self, broker, port, username, password, client_id, base_topic, pool, state=None):
+    def __init__(self, broker, port, username, password, client_id, base_topic, pool, state=None,
+                 queue_size=32, queue_policy="drop_oldest", policy=None, loop_timeout=1.0,
+                 coalesce=True):
         self.client_id = client_id or "pico-w"
         self.device_id = self.client_id
         self.base = (base_topic or "iiot/test").rstrip("/")
@@ -131,9 +216,32 @@ class MqttClient:
         self.topic_status = f"{self.base}/{self.client_id}/status"
         self.topic_temp   = f"{self.base}/{self.client_id}/temperature"
         self.topic_hum    = f"{self.base}/{self.client_id}/humidity"
+        self.topic_summary = f"{self.base}/{self.client_id}/summary"
+        self.topic_reply  = f"{self.base}/{self.client_id}/reply"
+        self.topic_last   = f"{self.base}/{self.client_id}/last"
+        self.topic_boot   = f"{self.base}/{self.client_id}/boot"
+        self.topic_batch  = f"{self.base}/{self.client_id}/batch"
+        self.topic_config = f"{self.base}/{self.client_id}/config"   # retained Override
+        self.topic_group_config = f"{self.base}/_config"              # retained Gruppe
+
+        self.policy = policy or DEFAULT_PUBLISH_POLICY
+
+        # Epoche + Sequenz je Messung: Luecken/Duplikate downstream erkennbar (fleet/sequence.py)
+        self.epoch = new_epoch()
+        self.seq = 0
+
+        # Ausgehende Nachrichten laufen ueber die Outbox (Status > Replies > Telemetrie)
+        self.outbox = Outbox(capacity=(4, 8, queue_size), policy=queue_policy)
+        # Pakete eines Outbox-Durchlaufs als ein Socket-Write senden (coalesce.py)
+        self.coalesce = coalesce
+        self.write_stats = {"sends": 0, "writes": 0, "bytes": 0}
 
-        use_ssl = (port == 8883)
-        ssl_ctx = ssl.create_default_context() if use_ssl else None
+        import adafruit_minimqtt.adafruit_minimqtt as MQTT
+
+        ssl_ctx = None
+        if port == 8883:
+            import ssl  # nur fuer TLS laden
+            ssl_ctx = ssl.create_default_context()
 
         self.client = MQTT.MQTT(
             broker=broker,
@@ -144,7 +252,13 @@ class MqttClient:
             ssl_context=ssl_ctx,
             keep_alive=30,
             client_id=self.client_id,
+            # MiniMQTT verlangt loop(timeout) >= socket_timeout
+            socket_timeout=loop_timeout,
+            # ein Versuch je connect(): interne Backoff-Schleifen koennten
+            # laenger blockieren als der Watchdog erlaubt
+            connect_retries=1,
         )
+        self.loop_timeout = loop_timeout
 
         # Last Will: offline
         will_payload = json.dumps({
@@ -152,7 +266,8 @@ class MqttClient:
             "status": "offline",
             "timestamp": iso_utc(),
         })
-        self.client.will_set(self.topic_status, will_payload, retain=True, qos=1)
+        qos, retain = self.policy["status"]
+        self.client.will_set(self.topic_status, will_payload, retain=retain, qos=qos)
 
         def _on_connect(client, userdata, flags, rc):
             print("MQTT connected, rc=", rc)
@@ -170,39 +285,131 @@ class MqttClient:
     def connect(self):
         print("Verbinde mit MQTT…")
         self.client.connect()
+        if self.state is not None:
+            self.state["mqtt_connected"] = True
 
-        online_payload = json.dumps({
+        # Status vor allem anderen ausliefern, danach ggf. aufgelaufenen Rueckstau
+        self.publish_status()
+        self.flush()
+        print("MQTT verbunden. Status 'online' publiziert.")
+
+    def publish_status(self):
+        # Retained Online-Status; traegt auch die Quittung fuer Remote-Config
+        online = {
             "device_id": self.device_id,
             "status": "ok",
             "timestamp": iso_utc(),
-        })
-        self.client.publish(self.topic_status, online_payload, retain=True, qos=1)
-        print("MQTT verbunden. Status 'online' publiziert.")
-
+            "epoch": self.epoch,
+        }
         if self.state is not None:
-            self.state["mqtt_connected"] = True
+            # Reset-Grund + Breadcrumbs des letzten Laufs (Stall vs. Crash)
+            if self.state.get("reset"):
+                online["reset"] = self.state["reset"]
+            if self.state.get("calibration"):
+                online["calibration"] = self.state["calibration"]
+            if self.state.get("config_version"):
+                online["config_version"] = self.state["config_version"]
+            # IP + Port im retained Status: Discovery auch ohne UDP (fleet/discovery.py)
+            if self.state.get("ip"):
+                online["ip"] = self.state["ip"]
+                online["http_port"] = self.state.get("http_port", 8080)
+        self._put("status", self.topic_status, json.dumps(online), PRIO_STATUS)
 
     def publish_telemetry(self, t: float, h: float):
         ts = iso_utc()
+        # beide Nachrichten einer Messung tragen dieselbe Sequenznummer
+        self.seq += 1
         temp_msg = json.dumps({
             "device_id": self.device_id,
             "unit": "°C",
             "value": t,
             "timestamp": ts,
+            "epoch": self.epoch,
+            "seq": self.seq,
         })
         hum_msg = json.dumps({
             "device_id": self.device_id,
             "unit": "%",
             "value": h,
             "timestamp": ts,
+            "epoch": self.epoch,
+            "seq": self.seq,
         })
-        self.client.publish(self.topic_temp, temp_msg, qos=1, retain=False)
-        self.client.publish(self.topic_hum, hum_msg, qos=1, retain=False)
+        self._put("telemetry", self.topic_temp, temp_msg, PRIO_TELEMETRY)
+        self._put("telemetry", self.topic_hum, hum_msg, PRIO_TELEMETRY)
         print("TEMP →", self.topic_temp, temp_msg)
         print("HUM  →", self.topic_hum, hum_msg)
 
-    def loop(self, timeout: float = 0.5):
-        self.client.loop(timeout)
+    def publish_summary(self, summary: dict):
+        # Eine Nachricht pro Aggregationsfenster statt jeder Rohmessung
+        msg = {
+            "device_id": self.device_id,
+            "timestamp": iso_utc(),
+        }
+        msg.update(summary)
+        payload = json.dumps(msg)
+        self._put("summary", self.topic_summary, payload, PRIO_TELEMETRY)
+        print("SUM  →", self.topic_summary, payload)
+
+    def publish_last(self, reading: dict):
+        # Letzter Messwert (retained): neue Abonnenten sehen ihn sofort
+        msg = {"device_id": self.device_id}
+        msg.update(reading)
+        self._put("last", self.topic_last, json.dumps(msg), PRIO_TELEMETRY)
+
+    def publish_batch(self, batch: dict):
+        # Duty-Cycle: alle seit dem letzten Upload gepufferten Messungen
+        msg = {
+            "device_id": self.device_id,
+            "timestamp": iso_utc(),
+        }
+        msg.update(batch)
+        payload = json.dumps(msg)
+        self._put("batch", self.topic_batch, payload, PRIO_TELEMETRY)
+        print("BAT  →", self.topic_batch, len(batch.get("samples", ())), "Messungen")
+
+    def publish_boot(self, report: dict):
+        # Einmal pro Boot: Dauer der einzelnen Startphasen
+        msg = {
+            "device_id": self.device_id,
+            "timestamp": iso_utc(),
+        }
+        msg.update(report)
+        self._put("status", self.topic_boot, json.dumps(msg), PRIO_STATUS)
+
+    def publish_reply(self, reply: dict):
+        # Antwort auf ein MQTT-Command (Quittung)
+        msg = {
+            "device_id": self.device_id,
+            "timestamp": iso_utc(),
+        }
+        msg.update(reply)
+        self._put("reply", self.topic_reply, json.dumps(msg), PRIO_REPLY)
+
+    def _put(self, kind: str, topic: str, payload: str, prio: int):
+        qos, retain = self.policy[kind]
+        self.outbox.put(topic, payload, qos=qos, retain=retain, prio=prio)
+
+    def flush(self, budget_s: float = 0.25) -> int:
+        # Outbox abarbeiten; wirft bei Verbindungsfehlern (Nachricht bleibt in der Queue)
+        def _publish(topic, payload, qos, retain):
+            self.client.publish(topic, payload, retain=retain, qos=qos)
+
+        sock = getattr(self.client, "_sock", None)
+        if not self.coalesce or sock is None:
+            return self.outbox.drain(_publish, budget_s)
+        # Nur fuer die Dauer des Durchlaufs einhaengen: MiniMQTT schliesst den
+        # Socket ueber den ConnectionManager, der nur das Original kennt
+        wrapped = CoalescingSocket(sock, stats=self.write_stats)
+        self.client._sock = wrapped
+        try:
+            return self.outbox.drain(_publish, budget_s)
+        finally:
+            self.client._sock = sock
+            wrapped.flush()
+
+    def loop(self, timeout: float | None = None):
+        self.client.loop(self.loop_timeout if timeout is None else timeout)
 
     def disconnect_clean(self):
         # Explizit offline setzen (best effort) und disconnect
@@ -212,7 +419,8 @@ class MqttClient:
                 "status": "offline",
                 "timestamp": iso_utc(),
             })
-            self.client.publish(self.topic_status, offline_payload, retain=True, qos=1)
+            qos, retain = self.policy["status"]
+            self.client.publish(self.topic_status, offline_payload, retain=retain, qos=qos)
         except Exception:
             pass
         try:
@@ -222,13 +430,122 @@ class MqttClient:
         if self.state is not None:
             self.state["mqtt_connected"] = False
 
+# ============================== Duty-Cycle ==========================
+
+def upload_batch(cfg: dict, buf, model, state=None) -> bool:
+    """WLAN + MQTT hochfahren, Puffer als ein Batch publizieren, wieder trennen."""
+    t0 = time.monotonic()
+    net = NetworkManager(cfg.get("CIRCUITPY_WIFI_SSID", ""), cfg.get("CIRCUITPY_WIFI_PASSWORD", ""))
+    if not net.connect():
+        return False
+    try:
+        import adafruit_ntp
+        ntp = adafruit_ntp.NTP(net.pool, server="pool.ntp.org", tz_offset=0, socket_timeout=2)
+        rtc.RTC().datetime = ntp.datetime
+    except Exception as e:
+        print("NTP-Fehler:", e)
+
+    mqtt = MqttClient(cfg.get("MQTT_BROKER", ""), int(cfg.get("MQTT_PORT", 1883)),
+                      cfg.get("MQTT_USER", ""), cfg.get("MQTT_PASSWORD", ""),
+                      cfg.get("MQTT_CLIENT_ID", "sensor"), cfg.get("MQTT_BASE_TOPIC", "iiot/test"),
+                      net.pool, state=state, policy=load_publish_policy(cfg),
+                      loop_timeout=float(cfg.get("MQTT_LOOP_TIMEOUT", 0.1)))
+    mqtt.connect()
+
+    now = time.time()
+    samples = buf.samples()
+    ages = [now - ts for ts, _, _ in samples]
+    awake_ms, sleep_ms, upload_ms = buf.times_ms()
+    # Upload-Zeit dieses Zyklus bis hierher mitzaehlen
+    upload_ms += int((time.monotonic() - t0) * 1000)
+    mqtt.publish_batch({
+        "samples": [{"temperature": t, "humidity": h, "timestamp": iso_utc(ts)} for ts, t, h in samples],
+        "latency_s": {"max": int(max(ages)), "mean": int(sum(ages) / len(ages))} if ages else None,
+        "energy": model.report(len(samples), awake_ms, sleep_ms, upload_ms,
+                               battery_mah=cfg.get("BATTERY_MAH")),
+    })
+    mqtt.flush(budget_s=5.0)
+    ok = mqtt.outbox.depth() == 0
+    mqtt.disconnect_clean()
+    return ok
+
+def run_duty_cycle(cfg: dict, mode: str):
+    """
+    POWER_MODE = "light" | "deep": aufwachen, messen, in alarm.sleep_memory
+    puffern, jede UPLOAD_EVERY_N-te Messung hochladen, wieder schlafen.
+    Bei "deep" startet code.py nach jedem Aufwachen neu; der Puffer ueberlebt.
+    """
+    import alarm
+    from dutycycle import SampleBuffer, EnergyModel
+
+    interval_s = max(3, int(cfg.get("READING_INTERVAL_SECONDS", 30)))  # DHT11 >= 3s
+    upload_every = max(1, int(cfg.get("UPLOAD_EVERY_N", 10)))
+    buf = SampleBuffer(alarm.sleep_memory)
+    model = EnergyModel(active_ma=float(cfg.get("POWER_ACTIVE_MA", 25)),
+                        wifi_ma=float(cfg.get("POWER_WIFI_MA", 60)),
+                        sleep_ma=float(cfg.get("POWER_SLEEP_MA", 1.5)))
+    calibration = Calibration.from_settings(cfg)
+    sensor = Sensor(22, calibration=calibration)
+    state = {"calibration": calibration.metadata()}
+
+    while True:
+        t_wake = time.monotonic()
+        # CircuitPython verbindet beim Start ggf. selbst mit dem WLAN: aus bis zum Upload
+        wifi.radio.enabled = False
+        # Nach Deep Sleep laeuft die RTC nicht weiter: Uhr aus dem Puffer schaetzen,
+        # der naechste Upload korrigiert sie per NTP
+        if time.time() < CLOCK_VALID_AFTER and buf.clock:
+            rtc.RTC().datetime = time.localtime(buf.clock)
+
+        data = sensor.read_data()
+        if not data:
+            time.sleep(2)  # DHT11 braucht nach dem Aufwachen ggf. etwas laenger
+            data = sensor.read_data()
+        if data:
+            buf.append(time.time(), data["temperature"], data["humidity"])
+        else:
+            print("Sensorfehler/ungültige Messung")
+        buf.add_time(awake_ms=(time.monotonic() - t_wake) * 1000)
+
+        if len(buf) >= upload_every:
+            t_up = time.monotonic()
+            wifi.radio.enabled = True
+            try:
+                ok = upload_batch(cfg, buf, model, state=state)
+            except Exception as e:
+                print("Upload-Fehler:", e)
+                ok = False
+            wifi.radio.enabled = False
+            if ok:
+                buf.reset(clock=time.time())
+            else:
+                # Puffer behalten, naechster Versuch beim naechsten Wake
+                buf.add_time(upload_ms=(time.monotonic() - t_up) * 1000)
+
+        sleep_s = max(0.5, interval_s - (time.monotonic() - t_wake))
+        buf.add_time(sleep_ms=sleep_s * 1000)
+        buf.clock = time.time() + sleep_s
+        wake = alarm.time.TimeAlarm(monotonic_time=time.monotonic() + sleep_s)
+        if mode == "deep":
+            alarm.exit_and_deep_sleep_until_alarms(wake)
+        alarm.light_sleep_until_alarms(wake)
+
 # ============================== MAIN =================================
 
+# Breadcrumbs im NVM ueberleben Watchdog- und Software-Resets
+breadcrumbs = Breadcrumbs(getattr(microcontroller, "nvm", None))
+loop_health = None
+
 def main():
+    global loop_health
+    boot = BootTimer()
+    reset_info = boot_report(getattr(microcontroller.cpu, "reset_reason", None), breadcrumbs.load())
+
     # LED
     led = digitalio.DigitalInOut(board.LED)
     led.direction = digitalio.Direction.OUTPUT
     led.value = False
+    status_led = LedStatus(led)
 
     cfg = ConfigManager("settings.toml").load_settings()
 
@@ -239,17 +556,47 @@ def main():
     username   = cfg.get("MQTT_USER", "")
     mqtt_pass  = cfg.get("MQTT_PASSWORD", "")
     client_id  = cfg.get("MQTT_CLIENT_ID", "sensor")
+    queue_size = int(cfg.get("MQTT_QUEUE_SIZE", 32))
+    queue_policy = cfg.get("MQTT_QUEUE_POLICY", "drop_oldest")  # oder "coalesce"
+    publish_policy = load_publish_policy(cfg)
+    last_value = bool(cfg.get("MQTT_LAST_VALUE", True))         # retained {base}/{id}/last
+    loop_timeout = float(cfg.get("MQTT_LOOP_TIMEOUT", 0.1))     # max. Blockieren in mqtt.loop
+    coalesce   = bool(cfg.get("MQTT_COALESCE", True))           # Pakete je Durchlauf als ein Write
+    discovery_s = int(cfg.get("DISCOVERY_INTERVAL", 60))        # UDP-Announce; 0 = aus
+    http_conns = int(cfg.get("HTTP_MAX_CONNECTIONS", 4))
+    http_budget = float(cfg.get("HTTP_POLL_BUDGET", 0.05))      # max. HTTP-Zeit pro Tick
+    http_compress_min = int(cfg.get("HTTP_COMPRESS_MIN", 1024))  # gzip/deflate ab n Bytes; 0 = aus
+    sample_reserve = float(cfg.get("SAMPLE_RESERVE", 0.2))      # vor faelliger Messung frei halten
     base_topic = cfg.get("MQTT_BASE_TOPIC", "iiot/test")
     interval_s = max(3, int(cfg.get("READING_INTERVAL_SECONDS", 30)))  # DHT11 >= 3s
+    window_s   = int(cfg.get("AGGREGATION_WINDOW_SECONDS", 0))  # 0 = jede Messung publizieren
+    history_n  = int(cfg.get("HISTORY_SIZE", 0))                # 0 = keine lokale Historie
+    wd_timeout = float(cfg.get("WATCHDOG_TIMEOUT", 8))          # 0 = aus; RP2040 max. ~8.3 s
+    mqtt_budget = int(cfg.get("HEALTH_MQTT_BUDGET", 120))       # s ohne erfolgreichen mqtt.loop
+
+    # Batteriebetrieb: messen, puffern, schlafen; WLAN nur fuer Batch-Uploads
+    power_mode = cfg.get("POWER_MODE", "continuous")            # oder "light" / "deep"
+    if power_mode in ("light", "deep"):
+        run_duty_cycle(cfg, power_mode)
+        return
 
     # physikalisch Pin 29 = GPIO22 (= board.GP22)
     pin = 22
 
+    # Sensor zuerst anlegen: der DHT11 braucht nach dem Einschalten ca. 1 s,
+    # diese Aufwaermzeit laeuft parallel zum WLAN-Aufbau.
+    calibration = Calibration.from_settings(cfg)
+    if calibration.errors:
+        print("Kalibrierung fehlerhaft (Rohwerte):", calibration.errors)
+    sensor = Sensor(pin, calibration=calibration)
+    boot.mark("sensor_init")
+
     # WLAN
     net = NetworkManager(ssid, password)
     if not net.connect():
-        print("Keine WLAN-Verbindung.")
-        return
+        # Watchdog ist noch nicht scharf: Exception -> Breadcrumb + Reset (unten)
+        raise RuntimeError("Keine WLAN-Verbindung")
+    boot.mark("wifi")
 
     # Uptime Start
     boot_monotonic = time.monotonic()
@@ -262,41 +609,145 @@ def main():
         "mqtt_connected": False,
         "wifi_connected": True,
         "ip": net.get_ip(),
+        "http_port": 8080,
+        "boot": None,
+        "reset": reset_info,
+        "calibration": calibration.metadata(),
     }
 
-    # NTP
+    # Remote-Config ueber retained MQTT-Topics; angewendete Versionen ueberleben den Neustart
+    config_sync = ConfigSync({
+        "group": int(cfg.get("CONFIG_VERSION_GROUP", 0)),
+        "device": int(cfg.get("CONFIG_VERSION_DEVICE", 0)),
+    })
+    state["config_version"] = config_sync.status()
+
+    # NTP (kurzer Timeout, damit ein nicht erreichbarer Server den Start nicht aufhaelt)
     try:
-        ntp = adafruit_ntp.NTP(net.pool, server="pool.ntp.org", tz_offset=0)
+        import adafruit_ntp
+        ntp = adafruit_ntp.NTP(net.pool, server="pool.ntp.org", tz_offset=0, socket_timeout=2)
         rtc.RTC().datetime = ntp.datetime
         print("Zeit synchronisiert:", iso_utc())
     except Exception as e:
         print("NTP-Fehler:", e)
+    boot.mark("ntp")
 
-    # Sensor
-    sensor = Sensor(pin)
+    # Aggregation (eine Zusammenfassung pro Fenster) + optionale Rohwert-Historie
+    aggregator = WindowAggregator(window_s) if window_s > 0 else None
+    history = History(history_n)
 
     mqtt = None
     try:
         # MQTT
-        mqtt = MqttClient(broker, port, username, mqtt_pass, client_id, base_topic, net.pool, state=state)
-
-        # Verbindungsaufbau + einfacher Reconnect-Versuch
+        # MQTT-Client anlegen (noch ohne Verbindung; die Outbox nimmt schon Nachrichten an)
+        mqtt = MqttClient(broker, port, username, mqtt_pass, client_id, base_topic, net.pool, state=state,
+                          queue_size=queue_size, queue_policy=queue_policy, policy=publish_policy,
+                          loop_timeout=loop_timeout, coalesce=coalesce)
+
+        sensor_stats = {"errors": 0, "consecutive": 0}
+        state["sensor"] = sensor_stats
+
+        def sample(now: float) -> bool:
+            data = sensor.read_data()
+            if not data:
+                print("Sensorfehler/ungültige Messung")
+                status_led.set("sensor_error", True)
+                sensor_stats["errors"] += 1
+                sensor_stats["consecutive"] += 1
+                return False
+            status_led.set("sensor_error", False)
+            sensor_stats["consecutive"] = 0
+            reading = {
+                "temperature": data["temperature"],
+                "humidity": data["humidity"],
+                "timestamp": iso_utc(),
+            }
+            state["last_sensor"] = reading
+            history.append(reading)
+            try:
+                if last_value:
+                    mqtt.publish_last(reading)
+                if aggregator is None:
+                    mqtt.publish_telemetry(data["temperature"], data["humidity"])
+                    state["last_published"] = reading
+                else:
+                    summary = aggregator.add(data, now)
+                    if summary:
+                        mqtt.publish_summary(summary)
+                        state["last_published"] = {
+                            "temperature": summary["temperature"]["mean"],
+                            "humidity": summary["humidity"]["mean"],
+                            "timestamp": iso_utc(),
+                        }
+            except Exception as e:
+                print("Publish-Fehler:", e)
+            return True
+
+        # Erste Messung noch vor dem MQTT-Connect; sie wartet in der Outbox
+        # und geht direkt nach dem Connect raus. Klappt sie nicht (Sensor noch
+        # nicht bereit), in 2 s erneut statt erst nach einem vollen Intervall.
+        last = time.monotonic()
+        if not sample(last):
+            last = last - interval_s + 2
+        boot.mark("first_sample")
+        first_sample_s = boot.since_start()
+
+        # Verbindungsaufbau + Reconnect-Versuche mit Backoff
         for attempt in range(3):
             try:
                 mqtt.connect()
                 break
             except Exception as e:
                 print(f"MQTT-Verbindungsfehler (Versuch {attempt+1}/3):", e)
-                time.sleep(2)
+                time.sleep(backoff_s(attempt))
         else:
-            print("MQTT konnte nicht verbunden werden.")
-            return
+            raise RuntimeError("MQTT konnte nicht verbunden werden")
+        boot.mark("mqtt")
+        # Reset-Info steckt jetzt in der Status-Nachricht (und in state)
+        breadcrumbs.clear()
 
         # Commands über MQTT abonnieren (als Alternative zu HTTP)
+        def apply_remote_config(source: str, message: str):
+            # Versionierte Konfiguration aus {base}/_config bzw. {base}/{id}/config
+            nonlocal interval_s, last
+            try:
+                result = config_sync.offer(source, json.loads(message) if message else None)
+            except ValueError as e:
+                print("Config-Fehler:", e)
+                mqtt.publish_reply({"ok": False, "source": source, "error": str(e)})
+                return
+            if result is None:
+                # aeltere Version oder erneute Zustellung nach Reconnect
+                print("Config veraltet/unveraendert, ignoriert:", source)
+                return
+            effective, newer = result
+            new_i = effective.get("interval", interval_s)
+            if new_i != interval_s:
+                interval_s = new_i
+                state["interval_s"] = new_i
+                last = 0.0
+                print("Intervall via Remote-Config gesetzt auf:", new_i)
+            if newer:
+                # Versionen + Werte persistieren, damit ein Neustart nichts Aelteres anwendet
+                versions = config_sync.status()
+                update_settings_in_file("settings.toml", {
+                    "READING_INTERVAL_SECONDS": interval_s,
+                    "CONFIG_VERSION_GROUP": versions["group"],
+                    "CONFIG_VERSION_DEVICE": versions["device"],
+                })
+                state["config_version"] = versions
+                mqtt.publish_status()   # Quittung
+
         def setup_cmd_subscription():
             cmd_topic = f"{mqtt.base}/{mqtt.client_id}/cmd"
 
             def _on_message(client, topic, message):
+                if topic == mqtt.topic_group_config:
+                    apply_remote_config("group", message)
+                    return
+                if topic == mqtt.topic_config:
+                    apply_remote_config("device", message)
+                    return
                 try:
                     msg = json.loads(message)
                     if "interval" in msg:
@@ -307,27 +758,43 @@ def main():
                         if msg.get("persist"):
                             update_interval_in_file("settings.toml", new_i)
                         print("Intervall via MQTT gesetzt auf:", new_i)
+                        mqtt.publish_reply({"ok": True, "interval": new_i})
                         # optional: sofortiger Tick
                         last = 0.0
                 except Exception as e:
                     print("CMD-Fehler:", e)
+                    mqtt.publish_reply({"ok": False, "error": str(e)})
 
             mqtt.client.on_message = _on_message
             mqtt.client.subscribe(cmd_topic, qos=1)
-            print("Höre auf Commands:", cmd_topic)
+            # Gruppe zuerst, damit der Geraete-Override danach gewinnt
+            mqtt.client.subscribe(mqtt.topic_group_config, qos=1)
+            mqtt.client.subscribe(mqtt.topic_config, qos=1)
+            print("Höre auf Commands:", cmd_topic, "+ Config:", mqtt.topic_group_config, mqtt.topic_config)
 
         setup_cmd_subscription()
 
-        # --- HTTP-Server mit adafruit_httpserver ---
+        # --- HTTP-Server (httpd: mehrere Verbindungen pro Tick, Keep-Alive) ---
+        from httpd import Server, Request, Response, JSONResponse, GET, POST, RateLimiter
+
         api_key = cfg.get("API_KEY", "") or None
         SETTINGS_PATH = "settings.toml"
 
-        server = Server(net.pool, debug=False)
+        # Token-Buckets je Client-IP und je Route; den Route-Bucket teilen sich alle
+        # Clients und ist deshalb 4x so gross. Die schreibenden Config-Routen
+        # landen im Flash und bekommen bewusst ein engeres, gemeinsames Limit
+        limiter = RateLimiter(
+            ip_rate=float(cfg.get("HTTP_RATE_PER_IP", 5)),
+            ip_burst=float(cfg.get("HTTP_BURST_PER_IP", 10)),
+            route_rate=float(cfg.get("HTTP_RATE_PER_ROUTE", 20)),
+            route_burst=float(cfg.get("HTTP_BURST_PER_ROUTE", 40)),
+            route_limits={"POST /config": (0.2, 2), "GET /config/set": (0.2, 2)},
+        )
+        server = Server(net.pool, debug=False, max_connections=http_conns,
+                        read_timeout_s=2.0, write_timeout_s=2.0, limiter=limiter,
+                        compress_min=http_compress_min)
         server.headers = {"Access-Control-Allow-Origin": "*"}
 
-        # Für optionalen Sofort-Tick nach Änderung:
-        last = 0.0
-
         @server.route("/", GET)
         def root(request: Request):
             return Response(request, "OK", content_type="text/plain")
@@ -444,66 +911,156 @@ def main():
                 },
                 "config": {
                     "interval_s": state["interval_s"],
+                    "aggregation_window_s": window_s,
+                    "version": state.get("config_version"),
                 },
                 "last_sensor": state.get("last_sensor"),
                 "last_published": state.get("last_published"),
+                "queue": mqtt.outbox.metrics(),
+                "mqtt_writes": mqtt.write_stats,
+                "boot": state.get("boot"),
+                "http": server.stats,
+                "http_compression": server.compression,
+                "rate_limit": limiter.metrics(),
+                "health": loop_health.metrics(),
+                "sensor": state.get("sensor"),
+                "reset": state.get("reset"),
+                "led": status_led.current,
+                "calibration": state.get("calibration"),
             })
 
+        # /history (GET): lokal gepufferte Rohmessungen, optional ?limit=N
+        @server.route("/history", GET)
+        def get_history(request: Request):
+            qp = request.query_params or {}
+            try:
+                limit = int(qp.get("limit")) if "limit" in qp else None
+            except Exception:
+                return JSONResponse(request, {"error": "invalid 'limit'"}, status=400)
+            return JSONResponse(request, history.items(limit))
+
         try:
             server.start(str(wifi.radio.ipv4_address), 8080)
             print("REST-API lauscht auf :8080")
         except Exception as e:
             print("HTTP-Server Start fehlgeschlagen:", e)
+        boot.mark("http")
+
+        # UDP-Discovery: periodisches Announce + Antwort auf Suchanfragen
+        announcer = None
+        if discovery_s > 0:
+            from announce import Announcer, DISCOVERY_PORT
+            udp_port = int(cfg.get("DISCOVERY_PORT", DISCOVERY_PORT))
+            info = {
+                "device_id": client_id,
+                "ip": state["ip"],
+                "port": state["http_port"],
+                "base_topic": base_topic,
+            }
+            announcer = Announcer(net.pool, info, interval_s=discovery_s,
+                                  listen_port=udp_port, announce_port=udp_port)
+            try:
+                announcer.start()
+            except Exception as e:
+                print("Discovery-Start fehlgeschlagen:", e)
+                announcer = None
+
+        # Boot-Report einmalig publizieren (geht ueber die Outbox raus)
+        report = boot.report()
+        report["first_sample_s"] = first_sample_s
+        state["boot"] = report
+        mqtt.publish_boot(report)
+        print("Boot-Phasen:", report)
+
+        # Watchdog: wird nur gefuettert, solange Messung, MQTT und HTTP
+        # innerhalb ihres Budgets vorankommen (siehe health.py)
+        loop_health = LoopHealth({"sample": max(60, 6 * interval_s), "mqtt": mqtt_budget, "http": 10})
+        watchdog = None
+        if wd_timeout > 0:
+            from watchdog import WatchDogMode
+            watchdog = microcontroller.watchdog
+            watchdog.timeout = wd_timeout
+            watchdog.mode = WatchDogMode.RESET
 
         print("Starte Hauptschleife… (Intervall:", interval_s, "s)")
-        led.value = True
+        status_led.update()
+        reconnect_at = 0.0      # naechster MQTT-Reconnect-Versuch (monotonic)
+        reconnect_attempt = 0
 
         while True:
             # State housekeeping
             state["ip"] = net.get_ip()
+            if announcer is not None:
+                announcer.info["ip"] = state["ip"]
+                try:
+                    announcer.poll()
+                except Exception:
+                    pass
+            loop_health.budgets["sample"] = max(60, 6 * interval_s)
 
-            # MQTT am Leben halten
+            # MQTT am Leben halten (blockiert hoechstens loop_timeout)
+            loop_health.enter("mqtt")
             try:
-                mqtt.loop(1.0)
+                mqtt.loop()
+                loop_health.progress("mqtt")
             except Exception as e:
                 print("MQTT loop Fehler:", e)
-                time.sleep(2)
-                try:
-                    mqtt.connect()
-                    setup_cmd_subscription()  # nach Reconnect erneut abonnieren
-                except Exception as e2:
-                    print("MQTT Reconnect fehlgeschlagen:", e2)
-
-            # HTTP-Server poll (non-blocking)
+                # Reconnect nicht blockierend: Backoff per Deadline statt sleep,
+                # Watchdog direkt vor dem (kurzen) Verbindungsversuch fuettern
+                if time.monotonic() >= reconnect_at:
+                    loop_health.feed(watchdog, breadcrumbs)
+                    try:
+                        mqtt.connect()
+                        setup_cmd_subscription()  # nach Reconnect erneut abonnieren
+                        loop_health.progress("mqtt")
+                        reconnect_attempt = 0
+                    except Exception as e2:
+                        print("MQTT Reconnect fehlgeschlagen:", e2)
+                        reconnect_at = time.monotonic() + backoff_s(reconnect_attempt)
+                        reconnect_attempt += 1
+                    loop_health.feed(watchdog, breadcrumbs)
+
+            # HTTP-Server poll (non-blocking); das Zeitbudget endet rechtzeitig
+            # vor der naechsten Messung, damit Anfragen das Sampling nicht verschieben
+            now = time.monotonic()
+            budget = min(http_budget, max(0.0, last + interval_s - now - sample_reserve))
+            loop_health.enter("http")
             try:
-                server.poll()
-            except Exception:
-                pass
+                server.poll(budget_s=budget)
+            except Exception as e:
+                # Fehler zaehlen; die Schleife laeuft weiter und gilt nicht als haengend
+                server.stats["errors"] += 1
+                print("HTTP-Fehler:", e)
+            loop_health.progress("http")
 
             now = time.monotonic()
             if now - last >= interval_s:
                 last = now
-                data = sensor.read_data()
-                if data:
-                    state["last_sensor"] = {
-                        "temperature": data["temperature"],
-                        "humidity": data["humidity"],
-                        "timestamp": iso_utc(),
-                    }
-                    try:
-                        mqtt.publish_telemetry(data["temperature"], data["humidity"])
-                        state["last_published"] = {
-                            "temperature": data["temperature"],
-                            "humidity": data["humidity"],
-                            "timestamp": iso_utc(),
-                        }
-                    except Exception as e:
-                        print("Publish-Fehler:", e)
-                else:
-                    print("Sensorfehler/ungültige Messung")
-                    led.value = not led.value
+                loop_health.enter("sample")
+                # Fortschritt auch bei Sensorfehlern: ein defekter DHT11 soll
+                # nicht zu Watchdog-Resets fuehren (Fehler zaehlt state["sensor"])
+                sample(now)
+                loop_health.progress("sample")
+
+            # Outbox abarbeiten (entkoppelt Messung von Broker-Latenz)
+            if mqtt.outbox.depth():
+                try:
+                    mqtt.flush()
+                except Exception as e:
+                    print("Publish-Fehler:", e)
 
-            time.sleep(0.1)
+            # LED-Blinkcode aus dem aktuellen Zustand (schaltet nur an Deadlines)
+            try:
+                status_led.set("wifi_down", not wifi.radio.connected)
+            except Exception:
+                pass
+            status_led.set("mqtt_down", not state.get("mqtt_connected", False))
+            status_led.set("backlog", mqtt.outbox.depth() > queue_size // 2)
+            status_led.set("clock_unsynced", time.time() < CLOCK_VALID_AFTER)
+            status_led.update()
+
+            loop_health.feed(watchdog, breadcrumbs)
+            time.sleep(0.01)
 
     finally:
         # „sauberes“ Offline beim geordneten Beenden
@@ -518,3 +1075,11 @@ try:
     main()
 except Exception as e:
     print("Fehler:", e)
+    # Breadcrumb festhalten und neu starten, statt im REPL stehen zu bleiben
+    try:
+        breadcrumbs.record("crash", stage=loop_health.stage if loop_health else None,
+                           detail=repr(e)[:80])
+    except Exception:
+        pass
+    time.sleep(1)
+    microcontroller.reset()
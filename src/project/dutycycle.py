@@ -0,0 +1,129 @@
+# dutycycle.py - Messpuffer im alarm.sleep_memory + Energiemodell fuer CircuitPython
+#
+# Im Duty-Cycle-Betrieb wacht der Pico nur zum Messen auf, legt die Messung
+# in den Speicher, der Deep Sleep ueberlebt (alarm.sleep_memory), und schlaeft
+# wieder. Nur jede N-te Messung wird WLAN/MQTT hochgefahren und der Puffer als
+# Batch hochgeladen. Dieses Modul kapselt das Speicherlayout und die
+# Abschaetzung der Energie pro Messung; der Ablauf selbst steht in code.py.
+
+import struct
+
+MAGIC = b"DC1"
+# Header: magic | count | Uhr (Unix-s, Schaetzung fuer den naechsten Wake) |
+#         Wachzeit ms | Schlafzeit ms | Upload ms (jeweils seit dem letzten Upload)
+HEADER = "<3sBIIII"
+HEADER_SIZE = struct.calcsize(HEADER)
+# Messung: Unix-Zeit | Temperatur*10 | Feuchte*10
+SAMPLE = "<Ihh"
+SAMPLE_SIZE = struct.calcsize(SAMPLE)
+
+
+class SampleBuffer:
+    """
+    Fester Ringpuffer in einem bytearray-artigen Speicher (alarm.sleep_memory).
+    Ist er voll, wird die aelteste Messung verworfen (Upload klappt gerade nicht).
+    """
+
+    def __init__(self, mem, offset=0, capacity=None):
+        self.mem = mem
+        self.offset = offset
+        room = min(255, (len(mem) - offset - HEADER_SIZE) // SAMPLE_SIZE)  # count ist 1 Byte
+        self.capacity = room if capacity is None else min(capacity, room)
+        if bytes(mem[offset:offset + 3]) != MAGIC:
+            self.reset()
+
+    # sleep_memory kann Slices, aber nicht zwingend das Buffer-Protokoll:
+    # darum immer ueber bytes()/Slice-Zuweisung statt pack_into/unpack_from
+    def _header(self):
+        o = self.offset
+        return list(struct.unpack(HEADER, bytes(self.mem[o:o + HEADER_SIZE])))
+
+    def _set_header(self, h):
+        self.mem[self.offset:self.offset + HEADER_SIZE] = struct.pack(HEADER, *h)
+
+    def reset(self, clock=None):
+        """Leert den Puffer und die Zeitzaehler (die Uhr bleibt erhalten)."""
+        if clock is None and bytes(self.mem[self.offset:self.offset + 3]) == MAGIC:
+            clock = self._header()[2]
+        self._set_header([MAGIC, 0, int(clock or 0), 0, 0, 0])
+
+    def __len__(self):
+        return self._header()[1]
+
+    @property
+    def clock(self) -> int:
+        return self._header()[2]
+
+    @clock.setter
+    def clock(self, value):
+        h = self._header()
+        h[2] = int(value)
+        self._set_header(h)
+
+    def add_time(self, awake_ms=0, sleep_ms=0, upload_ms=0):
+        h = self._header()
+        h[3] += int(awake_ms)
+        h[4] += int(sleep_ms)
+        h[5] += int(upload_ms)
+        self._set_header(h)
+
+    def times_ms(self) -> tuple:
+        """(wach, schlafend, upload) in ms seit dem letzten Upload."""
+        h = self._header()
+        return h[3], h[4], h[5]
+
+    def append(self, ts: int, temperature: float, humidity: float):
+        h = self._header()
+        n = h[1]
+        base = self.offset + HEADER_SIZE
+        if n >= self.capacity:
+            end = base + n * SAMPLE_SIZE
+            self.mem[base:end - SAMPLE_SIZE] = self.mem[base + SAMPLE_SIZE:end]
+            n -= 1
+        pos = base + n * SAMPLE_SIZE
+        self.mem[pos:pos + SAMPLE_SIZE] = struct.pack(
+            SAMPLE, int(ts), int(round(temperature * 10)), int(round(humidity * 10)))
+        h[1] = n + 1
+        self._set_header(h)
+
+    def samples(self) -> list:
+        """Alle Messungen, aelteste zuerst: [(ts, temperature, humidity), ...]."""
+        out = []
+        base = self.offset + HEADER_SIZE
+        raw = bytes(self.mem[base:base + len(self) * SAMPLE_SIZE])
+        for i in range(0, len(raw), SAMPLE_SIZE):
+            ts, t, hum = struct.unpack(SAMPLE, raw[i:i + SAMPLE_SIZE])
+            out.append((ts, t / 10, hum / 10))
+        return out
+
+
+class EnergyModel:
+    """
+    Grobe Stromaufnahme des Pico W je Zustand (mA, an der Versorgung gemessen;
+    per settings.toml anpassbar). Aus den gemessenen Zeiten je Zustand ergibt
+    sich die Energie pro Messung.
+    """
+
+    def __init__(self, active_ma=25.0, wifi_ma=60.0, sleep_ma=1.5, voltage=3.3):
+        self.active_ma = active_ma    # CPU laeuft, WLAN aus (Messung)
+        self.wifi_ma = wifi_ma        # WLAN/MQTT aktiv (Upload)
+        self.sleep_ma = sleep_ma      # Deep Sleep
+        self.voltage = voltage
+
+    def report(self, samples: int, awake_ms: int, sleep_ms: int, upload_ms: int,
+               battery_mah=None) -> dict:
+        """Energie pro Messung (mJ), mittlerer Strom (mA), optional Laufzeit (Tage)."""
+        charge_mas = (awake_ms * self.active_ma + sleep_ms * self.sleep_ma
+                      + upload_ms * self.wifi_ma) / 1000.0
+        total_s = (awake_ms + sleep_ms + upload_ms) / 1000.0
+        out = {
+            "samples": samples,
+            "awake_s": round(awake_ms / 1000.0, 2),
+            "sleep_s": round(sleep_ms / 1000.0, 2),
+            "upload_s": round(upload_ms / 1000.0, 2),
+            "mj_per_sample": round(charge_mas * self.voltage / max(1, samples), 2),
+            "avg_ma": round(charge_mas / total_s, 3) if total_s else None,
+        }
+        if battery_mah and out["avg_ma"]:
+            out["battery_days"] = round(battery_mah / out["avg_ma"] / 24.0, 1)
+        return out
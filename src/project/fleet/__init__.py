@@ -0,0 +1 @@
+"""Host-Werkzeuge fuer die Sensor-Flotte (Discovery, Abfragen, Rollouts)."""
@@ -0,0 +1,275 @@
+"""Discovery der Geraete: device_id -> HTTP-Endpoint mit TTL und Cache-Datei.
+
+Quellen:
+  * UDP-Announcements der Geraete (announce.py, Broadcast auf Port 5354)
+  * Antworten auf eine Broadcast-Suchanfrage (`Listener.query()`)
+  * retained MQTT-Status-Nachrichten, die IP und HTTP-Port enthalten
+    (`DeviceIndex.ingest_status()`, z.B. aus einem paho-Callback)
+
+Der Index haelt jeden Eintrag `ttl` Sekunden (vom Geraet vorgegeben, sonst
+`default_ttl_s`) und kann als JSON-Datei zwischengespeichert werden, damit
+Werkzeuge auch ohne frische Announcements sofort adressieren koennen;
+`resolve()` sucht nur, wenn der Cache-Eintrag fehlt oder abgelaufen ist.
+
+Aufruf:  python -m fleet.discovery [--wait 2] [--cache ~/.cache/iiot-devices.json]
+"""
+
+import argparse
+import copy
+import json
+import os
+import socket
+import threading
+import time
+
+DISCOVERY_PORT = 5354
+
+
+class DeviceIndex:
+    def __init__(self, default_ttl_s=180.0, cache_path=None, clock=time.time):
+        # Wanduhr statt monotonic: die Cache-Datei ueberlebt den Prozess
+        self.default_ttl_s = default_ttl_s
+        self.cache_path = cache_path
+        self.clock = clock
+        self._records = {}
+        self._lock = threading.Lock()
+        if cache_path and os.path.exists(cache_path):
+            self.load()
+
+    def update(self, info: dict, addr=None, source="udp", now=None) -> dict:
+        """Eintrag aus einer Announcement-/Status-Nachricht uebernehmen."""
+        device_id = info.get("device_id")
+        if not device_id:
+            raise ValueError("Announcement ohne device_id")
+        ip = info.get("ip") or (addr[0] if addr else None)
+        if not ip or ip == "0.0.0.0":
+            raise ValueError("Announcement ohne IP: " + device_id)
+        now = self.clock() if now is None else now
+        record = {
+            "device_id": device_id,
+            "ip": ip,
+            "port": int(info.get("port") or info.get("http_port") or 8080),
+            "base_topic": info.get("base_topic"),
+            "source": source,
+            "seen": now,
+            "expires": now + float(info.get("ttl") or self.default_ttl_s),
+        }
+        with self._lock:
+            self._records[device_id] = record
+        return record
+
+    def ingest_status(self, topic: str, payload, now=None):
+        """Retained `{base}/{id}/status` mit `ip` verwerten; sonst None."""
+        try:
+            msg = json.loads(payload)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(msg, dict) or msg.get("status") != "ok" or not msg.get("ip"):
+            return None
+        info = dict(msg)
+        info.setdefault("base_topic", topic.rsplit("/", 2)[0] if topic.count("/") >= 2 else None)
+        return self.update(info, source="mqtt", now=now)
+
+    def get(self, device_id: str, now=None):
+        now = self.clock() if now is None else now
+        with self._lock:
+            record = self._records.get(device_id)
+        if record is None or record["expires"] < now:
+            return None
+        return record
+
+    def endpoint(self, device_id: str) -> str:
+        """Basis-URL fuer den swagger-Client; KeyError, wenn unbekannt/abgelaufen."""
+        record = self.get(device_id)
+        if record is None:
+            raise KeyError("Geraet nicht gefunden oder abgelaufen: " + device_id)
+        return "http://%s:%d" % (record["ip"], record["port"])
+
+    def devices(self, now=None) -> list:
+        now = self.clock() if now is None else now
+        with self._lock:
+            records = list(self._records.values())
+        return sorted((r for r in records if r["expires"] >= now), key=lambda r: r["device_id"])
+
+    def prune(self, now=None) -> int:
+        now = self.clock() if now is None else now
+        with self._lock:
+            dead = [k for k, r in self._records.items() if r["expires"] < now]
+            for k in dead:
+                del self._records[k]
+        return len(dead)
+
+    def __len__(self):
+        return len(self.devices())
+
+    def save(self, path=None):
+        path = path or self.cache_path
+        self.prune()
+        with self._lock:
+            data = list(self._records.values())
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, path)
+
+    def load(self, path=None):
+        path = path or self.cache_path
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = self.clock()
+        with self._lock:
+            for r in data:
+                if r.get("expires", 0) >= now:
+                    self._records[r["device_id"]] = r
+
+
+class Listener:
+    """Empfaengt Announcements (und Antworten auf query()) und pflegt den Index."""
+
+    def __init__(self, index: DeviceIndex, port=DISCOVERY_PORT, host="0.0.0.0"):
+        self.index = index
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.sock.bind((host, port))
+        self.port = self.sock.getsockname()[1]
+        self.received = 0
+        self._thread = None
+        self._running = False
+
+    def poll(self, timeout=0.5) -> int:
+        """Alle bis `timeout` eintreffenden Pakete verarbeiten."""
+        deadline = time.monotonic() + timeout
+        n = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return n
+            self.sock.settimeout(remaining)
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except (socket.timeout, BlockingIOError):
+                return n
+            except OSError:
+                if not self._running and self._thread is not None:
+                    return n  # Socket beim Stoppen geschlossen
+                raise
+            if self._handle(data, addr):
+                n += 1
+
+    def _handle(self, data, addr) -> bool:
+        try:
+            msg = json.loads(data.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            return False
+        if not isinstance(msg, dict) or msg.get("type") != "announce":
+            return False
+        try:
+            self.index.update(msg, addr=addr)
+        except ValueError:
+            return False
+        self.received += 1
+        return True
+
+    def query(self, address="255.255.255.255", port=DISCOVERY_PORT, device_id=None,
+              wait_s=1.0) -> int:
+        """Suchanfrage per Broadcast; Antworten kommen unicast auf diesen Socket."""
+        q = {"type": "discover"}
+        if device_id:
+            q["device_id"] = device_id
+        self.sock.sendto(json.dumps(q).encode("utf-8"), (address, port))
+        return self.poll(wait_s)
+
+    def start(self):
+        """Im Hintergrund-Thread dauerhaft mithoeren."""
+        self._running = True
+
+        def _run():
+            while self._running:
+                try:
+                    self.poll(0.5)
+                except OSError:
+                    return
+
+        self._thread = threading.Thread(target=_run, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._running = False
+        self.sock.close()
+        if self._thread is not None:
+            self._thread.join(2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def discover(wait_s=1.0, address="255.255.255.255", port=DISCOVERY_PORT, index=None,
+             cache_path=None) -> DeviceIndex:
+    """Einmal suchen und den (ggf. aus dem Cache vorbefuellten) Index liefern."""
+    index = index or DeviceIndex(cache_path=cache_path)
+    with Listener(index, port=0) as listener:
+        listener.query(address=address, port=port, wait_s=wait_s)
+    if index.cache_path:
+        index.save()
+    return index
+
+
+def resolve(device_id: str, cache_path=None, wait_s=1.0, address="255.255.255.255",
+            port=DISCOVERY_PORT, index=None) -> str:
+    """Basis-URL fuer `device_id`: aus dem Cache, solange der Eintrag gilt.
+
+    Nur bei unbekanntem oder abgelaufenem Eintrag wird gezielt nach diesem
+    Geraet gefragt (und der Cache aktualisiert). KeyError, wenn es nicht antwortet.
+    """
+    index = index or DeviceIndex(cache_path=cache_path)
+    if index.get(device_id) is None:
+        with Listener(index, port=0) as listener:
+            listener.query(address=address, port=port, device_id=device_id, wait_s=wait_s)
+        if index.cache_path:
+            index.save()
+    return index.endpoint(device_id)
+
+
+def make_api(device_id: str, index: DeviceIndex, api_key=None, configuration=None):
+    """swagger-Client fuer ein Geraet, adressiert ueber die device_id.
+
+    `configuration` wird kopiert, nicht veraendert: ApiClient liest `host`
+    bei jedem Aufruf, eine geteilte Konfiguration wuerde sonst alle Clients
+    auf das zuletzt aufgeloeste Geraet umlenken.
+    """
+    from swagger_client import ApiClient, Configuration
+    from swagger_client.api.default_api import DefaultApi
+
+    cfg = copy.copy(configuration) if configuration is not None else Configuration()
+    cfg.host = index.endpoint(device_id)
+    client = ApiClient(configuration=cfg)
+    if api_key:
+        client.default_headers["x-api-key"] = api_key
+    return DefaultApi(api_client=client)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--wait", type=float, default=2.0)
+    ap.add_argument("--address", default="255.255.255.255")
+    ap.add_argument("--port", type=int, default=DISCOVERY_PORT)
+    ap.add_argument("--cache", default=None, help="JSON-Cache-Datei fuer den Index")
+    args = ap.parse_args(argv)
+
+    index = discover(args.wait, args.address, args.port, cache_path=args.cache)
+    print(f"{'device_id':<32} {'endpoint':<24} {'Quelle':<6} {'TTL [s]':>8}")
+    now = time.time()
+    for r in index.devices():
+        print(f"{r['device_id']:<32} {'%s:%d' % (r['ip'], r['port']):<24} {r['source']:<6} "
+              f"{r['expires'] - now:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
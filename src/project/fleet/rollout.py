@@ -0,0 +1,216 @@
+"""Konfiguration flottenweit ausrollen: erst Kanarienvoegel, dann Wellen.
+
+Ein ConfigSetRequest (Intervall, optional persistieren) geht per
+POST /config an alle Geraete des Inventars (Formate wie fleet/scraper.py),
+aufgeteilt in Wellen: zuerst `--canary` Geraete, dann kumulativ die
+Prozentstufen aus `--steps` (z.B. 10,50,100). Innerhalb einer Welle laufen
+die Geraete parallel ueber den asyncio-Client (hoechstens `--concurrency`
+gleichzeitig, `--deadline` Sekunden je Geraet). Jede Aenderung wird per
+GET /config geprueft. Liegt die Fehlerquote nach einer Welle ueber
+`--max-error-rate` (in der Kanarienwelle: bei jedem Fehler), bricht der
+Rollout ab; die restlichen Geraete bleiben unveraendert ("skipped").
+
+Aufruf:  python -m fleet.rollout --inventory devices.json --interval 20 [--persist]
+                                 [--canary 1] [--steps 10,50,100] [--max-error-rate 0.05]
+                                 [--concurrency 64] [--deadline 5] [--api-key KEY] [--json]
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import sys
+import time
+
+from fleet.scraper import load_inventory
+
+# kleinstes Intervall, das die Geraete annehmen (DHT11, remoteconfig.KEYS)
+MIN_INTERVAL_S = 3
+
+
+def interval_arg(text) -> int:
+    """argparse-Typ fuer --interval: ganze Sekunden >= MIN_INTERVAL_S."""
+    value = int(text)
+    if value < MIN_INTERVAL_S:
+        raise argparse.ArgumentTypeError("Intervall muss >= %d s sein" % MIN_INTERVAL_S)
+    return value
+
+
+def plan_waves(targets, canary=1, steps=(10, 50, 100)) -> list:
+    """Teilt `targets` in Wellen: `canary` Geraete, dann kumulative Prozentstufen."""
+    targets = list(targets)
+    bounds = [min(canary, len(targets))]
+    for pct in steps:
+        bounds.append(max(bounds[-1], min(len(targets), -(-len(targets) * pct // 100))))
+    if bounds[-1] < len(targets):
+        bounds.append(len(targets))
+    waves, start = [], 0
+    for end in bounds:
+        if end > start:
+            waves.append(targets[start:end])
+            start = end
+    return waves
+
+
+async def push_config(device_id, url, body, api_key=None, transport=None, deadline_s=5.0,
+                      configuration=None) -> dict:
+    """POST /config, dann GET /config zur Kontrolle; Ergebnis-Dict je Geraet.
+
+    `configuration` dient als Vorlage und wird kopiert (host je Geraet).
+    """
+    from swagger_client import AsyncApiClient, Configuration, DefaultApi
+
+    cfg = copy.copy(configuration) if configuration is not None else Configuration()
+    cfg.host = url
+    if api_key:
+        cfg.api_key = dict(cfg.api_key, **{"x-api-key": api_key})
+    api = DefaultApi(AsyncApiClient(cfg, transport=transport))
+    result = {"device_id": device_id, "url": url, "ok": False, "state": "failed",
+              "interval": None, "persisted": None, "error": None, "elapsed_ms": None}
+    t0 = time.perf_counter()
+    try:
+        answer = await asyncio.wait_for(api.config_post(body), deadline_s)
+        result["persisted"] = answer.persisted
+        check = await asyncio.wait_for(api.config_get(), deadline_s)
+        result["interval"] = check.interval
+        if check.interval != body.interval:
+            result["error"] = "verify: interval %s statt %s" % (check.interval, body.interval)
+        else:
+            result["ok"], result["state"] = True, "applied"
+    except asyncio.TimeoutError:
+        result["error"] = "timeout"
+    except Exception as e:   # offline, 4xx/5xx (z.B. 401 ohne API-Key), kaputtes JSON
+        status = getattr(e, "status", None)
+        result["error"] = ("HTTP %s" % status) if status else (type(e).__name__ + ": " + str(e))
+    result["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return result
+
+
+async def rollout(targets, body, canary=1, steps=(10, 50, 100), max_error_rate=0.05,
+                  concurrency=64, deadline_s=5.0, api_key=None, transport=None,
+                  on_result=None, on_wave=None) -> dict:
+    """Rollt `body` (ConfigSetRequest) in Wellen aus; Zusammenfassung als Dict.
+
+    ValueError vor dem ersten Request, wenn das Intervall unter MIN_INTERVAL_S
+    liegt: das Geraet wuerde es anpassen und die Pruefung schluege fehl.
+    """
+    if body.interval < MIN_INTERVAL_S:
+        raise ValueError("interval %s < %d" % (body.interval, MIN_INTERVAL_S))
+    from swagger_client import Configuration
+    from swagger_client.asyncio_client import AsyncHTTPTransport
+
+    base = Configuration()
+    own_transport = transport is None
+    transport = transport or AsyncHTTPTransport(base)
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(device_id, url):
+        async with limit:
+            return await push_config(device_id, url, body, api_key, transport, deadline_s,
+                                     configuration=base)
+
+    waves = plan_waves(targets, canary, steps)
+    results, done, failed, aborted = [], 0, 0, None
+    t0 = time.perf_counter()
+    try:
+        for n, wave in enumerate(waves):
+            for next_done in asyncio.as_completed([one(d, u) for d, u in wave]):
+                result = await next_done
+                result["wave"] = n
+                results.append(result)
+                done += 1
+                failed += not result["ok"]
+                if on_result is not None:
+                    on_result(result)
+            rate = failed / done
+            if on_wave is not None:
+                on_wave(n, len(wave), rate)
+            # Kanarienwelle: jeder Fehler stoppt; danach die Schwelle
+            if (n == 0 and canary and failed) or rate > max_error_rate:
+                aborted = "wave %d: error rate %.1f%% > %.1f%%" % (
+                    n, 100 * rate, 100 * (0 if n == 0 and canary else max_error_rate))
+                for wave_rest in waves[n + 1:]:
+                    for device_id, url in wave_rest:
+                        results.append({"device_id": device_id, "url": url, "ok": False,
+                                        "state": "skipped", "wave": None, "error": None})
+                break
+    finally:
+        if own_transport:
+            await transport.close()
+
+    return {
+        "interval": body.interval,
+        "persist": body.persist,
+        "devices": len(results),
+        "waves": [len(w) for w in waves],
+        "applied": sum(r["state"] == "applied" for r in results),
+        "failed": sum(r["state"] == "failed" for r in results),
+        "skipped": sum(r["state"] == "skipped" for r in results),
+        "aborted": aborted,
+        "elapsed_s": round(time.perf_counter() - t0, 2),
+        "results": results,
+    }
+
+
+def print_table(results, out=sys.stdout):
+    out.write("%-28s %-5s %-8s %8s %-10s %9s  %s\n" % (
+        "device_id", "Welle", "Status", "Intervall", "persist.", "ms", "Fehler"))
+    for r in sorted(results, key=lambda r: (r["wave"] is None, r["wave"] or 0, r["device_id"])):
+        out.write("%-28s %-5s %-8s %8s %-10s %9s  %s\n" % (
+            r["device_id"], "-" if r["wave"] is None else r["wave"], r["state"],
+            "" if r.get("interval") is None else r["interval"],
+            "" if r.get("persisted") is None else ("ja" if r["persisted"] else "nein"),
+            "" if r.get("elapsed_ms") is None else "%.0f" % r["elapsed_ms"], r.get("error") or ""))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--inventory", help="JSON-/Textdatei mit device_id + URL; sonst Discovery")
+    ap.add_argument("--interval", type=interval_arg, required=True,
+                    help="neues Messintervall [s], mindestens %d" % MIN_INTERVAL_S)
+    ap.add_argument("--persist", action="store_true", help="in settings.toml speichern")
+    ap.add_argument("--canary", type=int, default=1, help="Geraete in der ersten Welle")
+    ap.add_argument("--steps", default="10,50,100", help="kumulative Prozentstufen")
+    ap.add_argument("--max-error-rate", type=float, default=0.05)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--deadline", type=float, default=5.0, help="Sekunden je Geraet und Anfrage")
+    ap.add_argument("--api-key", default=None)
+    ap.add_argument("--json", action="store_true", help="JSON statt Tabelle")
+    args = ap.parse_args(argv)
+
+    from swagger_client import ConfigSetRequest
+
+    if args.inventory:
+        targets = load_inventory(args.inventory)
+    else:
+        from fleet.discovery import discover
+        index = discover(wait_s=2.0)
+        targets = [(r["device_id"], "http://%s:%d" % (r["ip"], r["port"])) for r in index.devices()]
+
+    def on_wave(n, size, rate):
+        if not args.json:
+            print("Welle %d: %d Geraete, Fehlerquote bisher %.1f%%" % (n, size, 100 * rate), flush=True)
+
+    body = ConfigSetRequest(interval=args.interval, persist=args.persist)
+    steps = [int(s) for s in args.steps.split(",") if s.strip()]
+    summary = asyncio.run(rollout(targets, body, canary=args.canary, steps=steps,
+                                  max_error_rate=args.max_error_rate,
+                                  concurrency=args.concurrency, deadline_s=args.deadline,
+                                  api_key=args.api_key, on_wave=on_wave))
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print()
+        print_table(summary["results"])
+        print()
+        print("Intervall %(interval)s s: %(applied)d uebernommen, %(failed)d fehlgeschlagen, "
+              "%(skipped)d uebersprungen (%(elapsed_s).1f s)" % summary)
+        if summary["aborted"]:
+            print("ABGEBROCHEN: " + summary["aborted"])
+    if summary["aborted"]:
+        return 2
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""Flottenweiter /status-Abruf: alle Geraete parallel, mit Deadline je Geraet.
+
+Das Inventar ist eine JSON-Datei (Liste mit device_id + url bzw. ip/port -
+also auch der Cache von fleet/discovery.py - oder ein Dict device_id -> url)
+oder eine Textdatei mit Zeilen "device_id url". Ohne Inventar wird per
+Discovery gesucht.
+
+Die Abfragen laufen ueber den asyncio-Client (swagger_client.AsyncApiClient)
+mit hoechstens `concurrency` gleichzeitigen Verbindungen; ein Geraet, das
+nicht innerhalb von `deadline` Sekunden antwortet, gilt als offline und
+haelt den Rest nicht auf. Ergebnisse werden ausgegeben, sobald sie
+eintreffen; am Ende folgt ein Flotten-Snapshot (online/offline, MQTT
+getrennt, veraltete Messwerte, min/max von Temperatur und Feuchte).
+
+Aufruf:  python -m fleet.scraper [--inventory devices.json] [--concurrency 64]
+                                 [--deadline 3] [--stale 120] [--json]
+"""
+
+import argparse
+import asyncio
+import copy
+import datetime
+import json
+import sys
+import time
+
+
+def load_inventory(path: str) -> list:
+    """[(device_id, base_url), ...] aus JSON (Liste/Dict) oder Textzeilen."""
+    with open(path) as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    targets = []
+    if isinstance(data, dict):
+        targets = [(k, v) for k, v in data.items()]
+    elif isinstance(data, list):
+        for r in data:
+            url = r.get("url") or "http://%s:%d" % (r["ip"], int(r.get("port") or 8080))
+            targets.append((r["device_id"], url))
+    else:
+        for line in text.splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                device_id, url = line.split(None, 1)
+                targets.append((device_id, url.strip()))
+    return [(d, u if "://" in u else "http://" + u) for d, u in targets]
+
+
+def _age_s(timestamp, now: datetime.datetime):
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(timestamp, datetime.datetime):
+        return None
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+    return (now - timestamp).total_seconds()
+
+
+class FleetSnapshot:
+    """Sammelt die Einzelergebnisse zu einer Flotten-Uebersicht."""
+
+    def __init__(self, stale_after_s=120.0, now=None):
+        self.stale_after_s = stale_after_s
+        self.now = now or datetime.datetime.now(datetime.timezone.utc)
+        self.results = []
+        self.extremes = {"temperature": {}, "humidity": {}}
+
+    def add(self, result: dict):
+        self.results.append(result)
+        status = result.get("status")
+        if not result["ok"] or not status:
+            return
+        reading = status.get("last_sensor") or {}
+        age = _age_s(reading.get("timestamp"), self.now)
+        result["age_s"] = None if age is None else round(age, 1)
+        result["stale"] = age is None or age > self.stale_after_s
+        if result["stale"]:
+            return   # veraltete Werte gehen nicht in min/max ein
+        for field, ext in self.extremes.items():
+            value = reading.get(field)
+            if value is None:
+                continue
+            if not ext or value < ext["min"]:
+                ext.update({"min": value, "min_device": result["device_id"]})
+            if "max" not in ext or value > ext["max"]:
+                ext.update({"max": value, "max_device": result["device_id"]})
+
+    def as_dict(self) -> dict:
+        online = [r for r in self.results if r["ok"]]
+        return {
+            "timestamp": self.now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "devices": len(self.results),
+            "online": len(online),
+            "offline": len(self.results) - len(online),
+            "mqtt_disconnected": sorted(
+                r["device_id"] for r in online
+                if not ((r["status"] or {}).get("mqtt") or {}).get("connected")),
+            "stale": sorted(r["device_id"] for r in online if r.get("stale")),
+            "errors": {r["device_id"]: r["error"] for r in self.results if not r["ok"]},
+            "temperature": self.extremes["temperature"] or None,
+            "humidity": self.extremes["humidity"] or None,
+        }
+
+
+async def scrape(targets, concurrency=64, deadline_s=3.0, transport=None):
+    """Async-Generator: ein Ergebnis-Dict je Geraet, in Eintreffreihenfolge.
+
+    Ohne API-Key: GET /status ist auf dem Geraet offen (nur die schreibenden
+    Config-Routen pruefen x-api-key).
+    """
+    from swagger_client import AsyncApiClient, Configuration, DefaultApi
+    from swagger_client.asyncio_client import AsyncHTTPTransport
+
+    # eine Basis-Konfiguration; je Geraet nur eine flache Kopie mit eigenem host
+    base = Configuration()
+    own_transport = transport is None
+    transport = transport or AsyncHTTPTransport(base)
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(device_id, url):
+        cfg = copy.copy(base)
+        cfg.host = url
+        client = AsyncApiClient(cfg, transport=transport)
+        result = {"device_id": device_id, "url": url, "ok": False, "status": None,
+                  "error": None, "elapsed_ms": None}
+        async with limit:
+            t0 = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(DefaultApi(client).status_get(), deadline_s)
+                result["status"] = client.sanitize_for_serialization(status)
+                result["ok"] = True
+            except asyncio.TimeoutError:
+                result["error"] = "timeout"
+            except Exception as e:   # offline, 4xx/5xx, kaputtes JSON: Geraet zaehlt als offline
+                status = getattr(e, "status", None)
+                result["error"] = ("HTTP %s" % status) if status else (type(e).__name__ + ": " + str(e))
+            result["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        return result
+
+    tasks = [asyncio.ensure_future(one(d, u)) for d, u in targets]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for t in tasks:
+            t.cancel()
+        if own_transport:
+            await transport.close()
+
+
+async def scrape_fleet(targets, stale_after_s=120.0, on_result=None, **kw) -> dict:
+    snapshot = FleetSnapshot(stale_after_s)
+    async for result in scrape(targets, **kw):
+        snapshot.add(result)
+        if on_result is not None:
+            on_result(result)
+    return snapshot.as_dict()
+
+
+def _print_row(result, out=sys.stdout):
+    status = result.get("status") or {}
+    reading = status.get("last_sensor") or {}
+    if result["ok"]:
+        mqtt = "ja" if (status.get("mqtt") or {}).get("connected") else "NEIN"
+        line = "%-28s online  %7.0f ms  MQTT %-4s  %5s °C  %5s %%%s" % (
+            result["device_id"], result["elapsed_ms"], mqtt, reading.get("temperature"),
+            reading.get("humidity"), "  (veraltet)" if result.get("stale") else "")
+    else:
+        line = "%-28s OFFLINE %7.0f ms  %s" % (result["device_id"], result["elapsed_ms"],
+                                               result["error"])
+    out.write(line + "\n")
+    out.flush()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--inventory", help="JSON-/Textdatei mit device_id + URL; sonst Discovery")
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--deadline", type=float, default=3.0, help="Sekunden je Geraet")
+    ap.add_argument("--stale", type=float, default=120.0, help="Messwert veraltet nach n Sekunden")
+    ap.add_argument("--json", action="store_true", help="JSON-Zeilen statt Tabelle")
+    args = ap.parse_args(argv)
+
+    if args.inventory:
+        targets = load_inventory(args.inventory)
+    else:
+        from fleet.discovery import discover
+        index = discover(wait_s=2.0)
+        targets = [(r["device_id"], "http://%s:%d" % (r["ip"], r["port"])) for r in index.devices()]
+
+    def on_result(result):
+        if args.json:
+            print(json.dumps(result, default=str), flush=True)
+        else:
+            _print_row(result)
+
+    t0 = time.perf_counter()
+    snapshot = asyncio.run(scrape_fleet(targets, stale_after_s=args.stale, on_result=on_result,
+                                        concurrency=args.concurrency, deadline_s=args.deadline))
+    snapshot["elapsed_s"] = round(time.perf_counter() - t0, 2)
+    if args.json:
+        print(json.dumps({"snapshot": snapshot}))
+    else:
+        print()
+        print("Geraete %(devices)d  online %(online)d  offline %(offline)d  (%(elapsed_s).1f s)" % snapshot)
+        for key in ("mqtt_disconnected", "stale"):
+            if snapshot[key]:
+                print("%-18s %s" % (key + ":", ", ".join(snapshot[key])))
+        for field, unit in (("temperature", "°C"), ("humidity", "%")):
+            ext = snapshot[field]
+            if ext:
+                print("%-18s min %s %s (%s)  max %s %s (%s)" % (
+                    field + ":", ext["min"], unit, ext["min_device"], ext["max"], unit,
+                    ext["max_device"]))
+    return 0 if snapshot["offline"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Vollstaendigkeit der Telemetrie: Luecken, Duplikate und Umordnungen je Stream.
+
+Jede Telemetrie-Nachricht traegt `epoch` (zufaellig pro Boot) und `seq`
+(1, 2, 3, ... je Messung). Der SequenceTracker fuehrt pro Stream (Standard:
+MQTT-Topic, also Geraet + Messgroesse) nur die hoechste Sequenz und eine
+Bitmaske der letzten `window` Nummern - konstanter Speicher, egal wie lange
+der Stream laeuft:
+
+  seq > hoechste        neu; uebersprungene Nummern zaehlen als fehlend
+  seq in der Maske      Duplikat (z.B. QoS1-Wiederholung nach Reconnect)
+  seq < hoechste, neu   Umordnung; die Nummer gilt nicht mehr als fehlend
+  seq aelter als Maske  zu spaet, nicht mehr zuzuordnen
+  neue epoch            Neustart des Geraets; Nummern vor der ersten
+                        empfangenen zaehlen als fehlend
+
+Aufruf:  mosquitto_sub -h BROKER -t 'iiot/group/+/+/temperature' -v | python -m fleet.sequence
+"""
+
+import argparse
+import json
+import sys
+import time
+
+OK = "ok"
+GAP = "gap"
+DUPLICATE = "duplicate"
+REORDERED = "reordered"
+LATE = "late"
+RESTART = "restart"
+STALE = "stale"
+
+
+class StreamState:
+    __slots__ = ("epoch", "prev_epoch", "first", "highest", "mask", "expected_before",
+                 "received", "missing", "duplicates", "reordered", "late", "restarts", "stale")
+
+    def __init__(self):
+        self.epoch = None
+        self.prev_epoch = None
+        self.first = 0
+        self.highest = 0
+        self.mask = 0                # Bit i = highest - i empfangen
+        self.expected_before = 0     # erwartete Nummern frueherer Epochen
+        self.received = 0
+        self.missing = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.late = 0
+        self.restarts = 0
+        self.stale = 0
+
+    @property
+    def expected(self) -> int:
+        if self.epoch is None:
+            return 0
+        return self.expected_before + self.highest - self.first + 1
+
+    def loss_rate(self) -> float:
+        expected = self.expected
+        return self.missing / expected if expected else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "epoch": self.epoch, "highest": self.highest, "expected": self.expected,
+            "received": self.received, "missing": self.missing,
+            "duplicates": self.duplicates, "reordered": self.reordered, "late": self.late,
+            "restarts": self.restarts, "stale": self.stale,
+            "loss_rate": round(self.loss_rate(), 6),
+        }
+
+
+class SequenceTracker:
+    def __init__(self, window=64):
+        self.window = window
+        self._full = (1 << window) - 1
+        self.streams = {}
+
+    def observe(self, key, epoch: int, seq: int) -> str:
+        """Eine Nachricht einordnen; liefert OK/GAP/DUPLICATE/REORDERED/LATE/RESTART/STALE."""
+        st = self.streams.get(key)
+        if st is None:
+            st = self.streams[key] = StreamState()
+        if epoch != st.epoch:
+            if epoch == st.prev_epoch:
+                st.stale += 1        # Nachzuegler aus dem vorigen Boot
+                return STALE
+            kind = OK
+            if st.epoch is not None:
+                st.restarts += 1
+                st.expected_before = st.expected
+                # nach einem Neustart beginnt die Zaehlung bei 1
+                st.missing += seq - 1
+                st.first = 1
+                kind = RESTART
+            else:
+                st.first = seq       # Einstieg mitten im Stream: davor nicht bewerten
+            st.prev_epoch = st.epoch
+            st.epoch = epoch
+            st.highest = seq
+            st.mask = 1
+            st.received += 1
+            return kind
+
+        if seq > st.highest:
+            shift = seq - st.highest
+            gap = shift - 1
+            st.missing += gap
+            st.mask = ((st.mask << shift) | 1) & self._full if shift < self.window else 1
+            st.highest = seq
+            st.received += 1
+            return GAP if gap else OK
+        age = st.highest - seq
+        if seq < st.first or age >= self.window:
+            st.late += 1
+            return LATE
+        bit = 1 << age
+        if st.mask & bit:
+            st.duplicates += 1
+            return DUPLICATE
+        st.mask |= bit
+        st.missing -= 1
+        st.reordered += 1
+        st.received += 1
+        return REORDERED
+
+    def ingest(self, topic: str, payload):
+        """Telemetrie-Nachricht (JSON mit epoch/seq) einordnen; None ohne Sequenzfelder."""
+        try:
+            msg = json.loads(payload)
+            epoch, seq = int(msg["epoch"]), int(msg["seq"])
+        except (TypeError, ValueError, KeyError):
+            return None
+        return self.observe(topic, epoch, seq)
+
+    def stats(self, key) -> dict:
+        return self.streams[key].as_dict()
+
+    def loss_rates(self) -> dict:
+        return {key: st.loss_rate() for key, st in self.streams.items()}
+
+    def export(self) -> list:
+        """Eine Zeile je Stream, z.B. fuer einen periodischen Report oder InfluxDB."""
+        rows = []
+        for key in sorted(self.streams):
+            row = {"stream": key}
+            row.update(self.streams[key].as_dict())
+            rows.append(row)
+        return rows
+
+
+def print_report(tracker, out=sys.stdout):
+    out.write(f"{'Stream':<48} {'erwartet':>8} {'fehlt':>6} {'dup':>5} {'umgeord':>7} "
+              f"{'Neustarts':>9} {'Verlust':>8}\n")
+    for row in tracker.export():
+        out.write(f"{row['stream']:<48} {row['expected']:>8} {row['missing']:>6} "
+                  f"{row['duplicates']:>5} {row['reordered']:>7} {row['restarts']:>9} "
+                  f"{row['loss_rate']:>8.2%}\n")
+    out.flush()
+
+
+def main(argv=None, stdin=sys.stdin):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--window", type=int, default=64, help="Umordnungsfenster in Nachrichten")
+    ap.add_argument("--report", type=float, default=60.0, help="Report alle n Sekunden")
+    ap.add_argument("--json", action="store_true", help="Report als JSON-Zeilen")
+    args = ap.parse_args(argv)
+
+    tracker = SequenceTracker(window=args.window)
+    next_report = time.monotonic() + args.report
+
+    def report():
+        if args.json:
+            for row in tracker.export():
+                print(json.dumps(row))
+        else:
+            print_report(tracker)
+
+    # Zeilen im Format von `mosquitto_sub -v`: "<topic> <payload>"
+    for line in stdin:
+        topic, _, payload = line.strip().partition(" ")
+        if payload:
+            tracker.ingest(topic, payload)
+        if time.monotonic() >= next_report:
+            next_report += args.report
+            report()
+    report()
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,7 @@ from swagger_client.api.default_api import DefaultApi
 
 # import ApiClient
 from swagger_client.api_client import ApiClient
+from swagger_client.asyncio_client import AsyncApiClient
 from swagger_client.configuration import Configuration
 # import models into sdk package
 from swagger_client.models.config_response import ConfigResponse
@@ -302,6 +302,101 @@ class DefaultApi(object):
             _request_timeout=params.get('_request_timeout'),
             collection_formats=collection_formats)
 
+    def history_get(self, **kwargs):  # noqa: E501
+        """Get locally buffered raw readings  # noqa: E501
+
+        Returns the most recent raw readings (oldest first) kept in the on-device ring buffer.  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.history_get(async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :param int limit:
+        :param bool _columnar: return a `columnar.Columns` (one array per
+                               field) instead of a list of models
+        :return: list[ReadingSnapshot]
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+        kwargs['_return_http_data_only'] = True
+        if kwargs.get('async_req'):
+            return self.history_get_with_http_info(**kwargs)  # noqa: E501
+        else:
+            (data) = self.history_get_with_http_info(**kwargs)  # noqa: E501
+            return data
+
+    def history_get_with_http_info(self, **kwargs):  # noqa: E501
+        """Get locally buffered raw readings  # noqa: E501
+
+        Returns the most recent raw readings (oldest first) kept in the on-device ring buffer.  # noqa: E501
+        This method makes a synchronous HTTP request by default. To make an
+        asynchronous HTTP request, please pass async_req=True
+        >>> thread = api.history_get_with_http_info(async_req=True)
+        >>> result = thread.get()
+
+        :param async_req bool
+        :param int limit:
+        :param bool _columnar: return a `columnar.Columns` (one array per
+                               field) instead of a list of models
+        :return: list[ReadingSnapshot]
+                 If the method is called asynchronously,
+                 returns the request thread.
+        """
+
+        all_params = ['limit']  # noqa: E501
+        all_params.append('async_req')
+        all_params.append('_return_http_data_only')
+        all_params.append('_preload_content')
+        all_params.append('_request_timeout')
+        all_params.append('_columnar')
+
+        params = locals()
+        for key, val in six.iteritems(params['kwargs']):
+            if key not in all_params:
+                raise TypeError(
+                    "Got an unexpected keyword argument '%s'"
+                    " to method history_get" % key
+                )
+            params[key] = val
+        del params['kwargs']
+
+        if self.api_client.client_side_validation and ('limit' in params and params['limit'] < 0):  # noqa: E501
+            raise ValueError("Invalid value for parameter `limit` when calling `history_get`, must be a value greater than or equal to `0`")  # noqa: E501
+        collection_formats = {}
+
+        path_params = {}
+
+        query_params = []
+        if 'limit' in params:
+            query_params.append(('limit', params['limit']))  # noqa: E501
+
+        header_params = {}
+
+        form_params = []
+        local_var_files = {}
+
+        body_params = None
+        # Authentication setting
+        auth_settings = []  # noqa: E501
+
+        return self.api_client.call_api(
+            '/history', 'GET',
+            path_params,
+            query_params,
+            header_params,
+            body=body_params,
+            post_params=form_params,
+            files=local_var_files,
+            response_type=('columns[ReadingSnapshot]' if params.get('_columnar')
+                           else 'list[ReadingSnapshot]'),  # noqa: E501
+            auth_settings=auth_settings,
+            async_req=params.get('async_req'),
+            _return_http_data_only=params.get('_return_http_data_only'),
+            _preload_content=params.get('_preload_content', True),
+            _request_timeout=params.get('_request_timeout'),
+            collection_formats=collection_formats)
+
     def root_get(self, **kwargs):  # noqa: E501
         """Health check  # noqa: E501
 
@@ -18,6 +18,7 @@ from multiprocessing.pool import ThreadPool
 import os
 import re
 import tempfile
+import threading
 
 # python 2 and python 3 compatibility library
 import six
@@ -25,8 +26,42 @@ from six.moves.urllib.parse import quote
 
 from swagger_client.configuration import Configuration
 import swagger_client.models
+from swagger_client import columnar
 from swagger_client import rest
 
+try:
+    from dateutil.parser import parse as _dateutil_parse
+except ImportError:
+    _dateutil_parse = None
+
+_UTC = datetime.timezone.utc
+
+
+def _parse_rfc3339(string):
+    """Fast path for RFC 3339 timestamps; None if `string` has another shape.
+
+    The device always sends `YYYY-MM-DDTHH:MM:SSZ` (iso_utc()); that exact
+    shape is sliced directly. Other RFC 3339 variants (fractional seconds,
+    numeric offsets, lowercase `t`/`z`, space separator) go through
+    `datetime.fromisoformat`.
+    """
+    if (len(string) < 19 or string[4] != '-' or string[7] != '-' or
+            string[10] not in 'Tt ' or string[13] != ':'):
+        return None
+    try:
+        if len(string) == 20 and string[19] in 'Zz':
+            return datetime.datetime(
+                int(string[0:4]), int(string[5:7]), int(string[8:10]),
+                int(string[11:13]), int(string[14:16]), int(string[17:19]),
+                tzinfo=_UTC)
+        tail = string[19:]
+        if tail[-1:] in ('Z', 'z'):
+            tail = tail[:-1] + '+00:00'
+        return datetime.datetime.fromisoformat(
+            string[:10] + 'T' + string[11:19] + tail)
+    except ValueError:
+        return None
+
 
 class ApiClient(object):
     """Generic API client for Swagger client library builds.
@@ -60,6 +95,15 @@ class ApiClient(object):
         'object': object,
     }
 
+    # Compiled deserializers keyed by response type (type string or class).
+    # Shared by all clients: type strings are parsed and model classes are
+    # resolved once, later responses only walk the data.
+    _deserializer_plans = {}
+    # Plans under construction, per thread. A plan is only published to
+    # `_deserializer_plans` once it and everything it references is
+    # complete, so other threads never see a half-built plan.
+    _compiling = threading.local()
+
     def __init__(self, configuration=None, header_name=None, header_value=None,
                  cookie=None):
         if configuration is None:
@@ -68,7 +112,7 @@ class ApiClient(object):
 
         # Use the pool property to lazily initialize the ThreadPool.
         self._pool = None
-        self.rest_client = rest.RESTClientObject(configuration)
+        self.rest_client = self._new_rest_client(configuration)
         self.default_headers = {}
         if header_name is not None:
             self.default_headers[header_name] = header_value
@@ -77,6 +121,11 @@ class ApiClient(object):
         self.user_agent = 'Swagger-Codegen/1.0.0/python'
         self.client_side_validation = configuration.client_side_validation
 
+    def _new_rest_client(self, configuration):
+        """Synchronous HTTP client; subclasses with their own transport
+        return None to skip building the urllib3 pool manager."""
+        return rest.RESTClientObject(configuration)
+
     def __del__(self):
         if self._pool is not None:
             self._pool.close()
@@ -107,6 +156,40 @@ class ApiClient(object):
             _return_http_data_only=None, collection_formats=None,
             _preload_content=True, _request_timeout=None):
 
+        url, query_params, header_params, post_params, body = \
+            self._prepare_request(resource_path, path_params, query_params,
+                                  header_params, body, post_params, files,
+                                  auth_settings, collection_formats)
+
+        # perform request (or answer it from the response cache)
+        cache = self.configuration.response_cache
+        mutates = cache is not None and cache.mutates(method, resource_path)
+        if cache is not None and not mutates and _preload_content:
+            response_data = cache.fetch(
+                lambda headers: self.request(
+                    method, url, query_params=query_params, headers=headers,
+                    _request_timeout=_request_timeout),
+                resource_path, url, query_params, header_params)
+        else:
+            response_data = self.request(
+                method, url, query_params=query_params, headers=header_params,
+                post_params=post_params, body=body,
+                _preload_content=_preload_content,
+                _request_timeout=_request_timeout)
+            if mutates:
+                cache.invalidate(url)
+
+        return self._handle_response(response_data, response_type,
+                                     _return_http_data_only,
+                                     _preload_content)
+
+    def _prepare_request(self, resource_path, path_params, query_params,
+                         header_params, body, post_params, files,
+                         auth_settings, collection_formats):
+        """Serializes all parameters of a call; shared with the asyncio client.
+
+        :return: (url, query_params, header_params, post_params, body)
+        """
         config = self.configuration
 
         # header parameters
@@ -154,13 +237,11 @@ class ApiClient(object):
         # request url
         url = self.configuration.host + resource_path
 
-        # perform request and return response
-        response_data = self.request(
-            method, url, query_params=query_params, headers=header_params,
-            post_params=post_params, body=body,
-            _preload_content=_preload_content,
-            _request_timeout=_request_timeout)
+        return url, query_params, header_params, post_params, body
 
+    def _handle_response(self, response_data, response_type,
+                         _return_http_data_only, _preload_content):
+        """Deserializes a response; shared with the asyncio client."""
         self.last_response = response_data
 
         return_data = response_data
@@ -249,36 +330,162 @@ class ApiClient(object):
 
         :return: object.
         """
-        if data is None:
-            return None
+        return self.__deserializer(klass)(data)
+
+    @classmethod
+    def __deserializer(cls, klass):
+        """Returns the cached deserialization plan for `klass`.
+
+        :param klass: class literal, or string of class name.
+        :return: function data -> object.
+        """
+        plan = cls._deserializer_plans.get(klass)
+        if plan is None:
+            pending = getattr(cls._compiling, 'plans', None)
+            if pending is not None:
+                plan = pending.get(klass)
+            if plan is None:
+                plan = cls.__compile(klass)
+        return plan
+
+    @classmethod
+    def __compile(cls, klass):
+        """Builds the deserialization plan for `klass` and publishes it.
+
+        Nested plans are collected in the thread's pending dict and added
+        to the shared cache together when the outermost compile is done.
+        """
+        if getattr(cls._compiling, 'plans', None) is not None:
+            return cls.__build(klass)
+        cls._compiling.plans = pending = {}
+        try:
+            plan = cls.__build(klass)
+        finally:
+            cls._compiling.plans = None
+        cls._deserializer_plans.update(pending)
+        return plan
+
+    @classmethod
+    def __build(cls, klass):
+        """Builds the deserialization plan (a tree of closures) for `klass`.
+
+        Plans only reference the class, never a client instance.
+        """
+        plans = cls._compiling.plans
+        key = klass
 
         if type(klass) == str:
             if klass.startswith('list['):
-                sub_kls = re.match(r'list\[(.*)\]', klass).group(1)
-                return [self.__deserialize(sub_data, sub_kls)
-                        for sub_data in data]
+                sub = cls.__deserializer(
+                    re.match(r'list\[(.*)\]', klass).group(1))
+
+                def plan(data):
+                    if data is None:
+                        return None
+                    return [sub(sub_data) for sub_data in data]
+                plans[key] = plan
+                return plan
+
+            if klass.startswith('columns['):
+                sub = re.match(r'columns\[(.*)\]', klass).group(1)
+                plan = columnar.columns_plan(
+                    getattr(swagger_client.models, sub),
+                    cls.__deserialize_datatime)
+                plans[key] = plan
+                return plan
 
             if klass.startswith('dict('):
-                sub_kls = re.match(r'dict\(([^,]*), (.*)\)', klass).group(2)
-                return {k: self.__deserialize(v, sub_kls)
-                        for k, v in six.iteritems(data)}
+                sub = cls.__deserializer(
+                    re.match(r'dict\(([^,]*), (.*)\)', klass).group(2))
+
+                def plan(data):
+                    if data is None:
+                        return None
+                    return {k: sub(v) for k, v in six.iteritems(data)}
+                plans[key] = plan
+                return plan
 
             # convert str to class
-            if klass in self.NATIVE_TYPES_MAPPING:
-                klass = self.NATIVE_TYPES_MAPPING[klass]
+            if klass in cls.NATIVE_TYPES_MAPPING:
+                klass = cls.NATIVE_TYPES_MAPPING[klass]
             else:
                 klass = getattr(swagger_client.models, klass)
 
-        if klass in self.PRIMITIVE_TYPES:
-            return self.__deserialize_primitive(data, klass)
+        if klass in cls.PRIMITIVE_TYPES:
+            plan = cls.__primitive_plan(klass)
         elif klass == object:
-            return self.__deserialize_object(data)
+            plan = cls.__deserialize_object
         elif klass == datetime.date:
-            return self.__deserialize_date(data)
+            plan = cls.__optional(cls.__deserialize_date)
         elif klass == datetime.datetime:
-            return self.__deserialize_datatime(data)
+            plan = cls.__optional(cls.__deserialize_datatime)
         else:
-            return self.__deserialize_model(data, klass)
+            return cls.__model_plan(key, klass)
+        plans[key] = plan
+        return plan
+
+    @staticmethod
+    def __optional(func):
+        def plan(data):
+            if data is None:
+                return None
+            return func(data)
+        return plan
+
+    @staticmethod
+    def __primitive_plan(klass):
+        def plan(data):
+            if data is None:
+                return None
+            try:
+                return klass(data)
+            except UnicodeEncodeError:
+                return six.text_type(data)
+            except TypeError:
+                return data
+        return plan
+
+    @classmethod
+    def __model_plan(cls, key, klass):
+        """Deserializes list or dict to model `klass`."""
+        plans = cls._compiling.plans
+        has_child_model = 'get_real_child_model' in klass.__dict__
+        if not klass.swagger_types and not has_child_model:
+            plans[key] = plans[klass] = cls.__deserialize_object
+            return cls.__deserialize_object
+
+        swagger_types = klass.swagger_types or {}
+        fields = []
+        deserializer = cls.__deserializer
+
+        def plan(data):
+            if data is None:
+                return None
+            kwargs = {}
+            if isinstance(data, (list, dict)):
+                for attr, json_key, sub in fields:
+                    if json_key in data:
+                        kwargs[attr] = sub(data[json_key])
+
+            instance = klass(**kwargs)
+
+            if isinstance(instance, dict) and isinstance(data, dict):
+                for k, value in data.items():
+                    if k not in swagger_types:
+                        instance[k] = value
+            if has_child_model:
+                klass_name = instance.get_real_child_model(data)
+                if klass_name:
+                    instance = deserializer(klass_name)(data)
+            return instance
+
+        # register (thread-locally) before compiling the fields, so
+        # self-referencing models terminate
+        plans[key] = plans[klass] = plan
+        for attr, attr_type in six.iteritems(swagger_types):
+            fields.append((attr, klass.attribute_map[attr],
+                           cls.__deserializer(attr_type)))
+        return plan
 
     def call_api(self, resource_path, method,
                  path_params=None, query_params=None, header_params=None,
@@ -343,7 +550,30 @@ class ApiClient(object):
     def request(self, method, url, query_params=None, headers=None,
                 post_params=None, body=None, _preload_content=True,
                 _request_timeout=None):
-        """Makes the HTTP request using RESTClient."""
+        """Makes the HTTP request using RESTClient.
+
+        With `configuration.retry_policy` set, transient failures are
+        retried (see `retry.RetryPolicy`).
+        """
+        policy = self.configuration.retry_policy
+        if policy is None:
+            return self._send(method, url, query_params, headers, post_params,
+                              body, _preload_content, _request_timeout)
+        if _request_timeout is None and (
+                self.configuration.connect_timeout is not None or
+                self.configuration.read_timeout is not None):
+            _request_timeout = (self.configuration.connect_timeout,
+                                self.configuration.read_timeout)
+        return policy.call(
+            method, url,
+            lambda timeout: self._send(method, url, query_params, headers,
+                                       post_params, body, _preload_content,
+                                       timeout),
+            _request_timeout)
+
+    def _send(self, method, url, query_params, headers, post_params, body,
+              _preload_content, _request_timeout):
+        """One HTTP request through the RESTClient."""
         if method == "GET":
             return self.rest_client.GET(url,
                                         query_params=query_params,
@@ -539,58 +769,56 @@ class ApiClient(object):
 
         return path
 
-    def __deserialize_primitive(self, data, klass):
-        """Deserializes string to primitive type.
-
-        :param data: str.
-        :param klass: class literal.
-
-        :return: int, long, float, str, bool.
-        """
-        try:
-            return klass(data)
-        except UnicodeEncodeError:
-            return six.text_type(data)
-        except TypeError:
-            return data
-
-    def __deserialize_object(self, value):
+    @staticmethod
+    def __deserialize_object(value):
         """Return a original value.
 
         :return: object.
         """
         return value
 
-    def __deserialize_date(self, string):
+    @staticmethod
+    def __deserialize_date(string):
         """Deserializes string to date.
 
+        `YYYY-MM-DD` is parsed directly, anything else with dateutil.
+
         :param string: str.
         :return: date.
         """
-        try:
-            from dateutil.parser import parse
-            return parse(string).date()
-        except ImportError:
+        if len(string) == 10 and string[4] == '-' and string[7] == '-':
+            try:
+                return datetime.date(int(string[0:4]), int(string[5:7]),
+                                     int(string[8:10]))
+            except ValueError:
+                pass
+        if _dateutil_parse is None:
             return string
+        try:
+            return _dateutil_parse(string).date()
         except ValueError:
             raise rest.ApiException(
                 status=0,
                 reason="Failed to parse `{0}` as date object".format(string)
             )
 
-    def __deserialize_datatime(self, string):
+    @staticmethod
+    def __deserialize_datatime(string):
         """Deserializes string to datetime.
 
-        The string should be in iso8601 datetime format.
+        The string should be in iso8601 datetime format. RFC 3339
+        timestamps take a fast path; dateutil is the fallback.
 
         :param string: str.
         :return: datetime.
         """
-        try:
-            from dateutil.parser import parse
-            return parse(string)
-        except ImportError:
+        value = _parse_rfc3339(string)
+        if value is not None:
+            return value
+        if _dateutil_parse is None:
             return string
+        try:
+            return _dateutil_parse(string)
         except ValueError:
             raise rest.ApiException(
                 status=0,
@@ -599,41 +827,3 @@ class ApiClient(object):
                     .format(string)
                 )
             )
-
-    def __hasattr(self, object, name):
-        return name in object.__class__.__dict__
-
-    def __deserialize_model(self, data, klass):
-        """Deserializes list or dict to model.
-
-        :param data: dict, list.
-        :param klass: class literal.
-        :return: model object.
-        """
-
-        if (not klass.swagger_types and
-                not self.__hasattr(klass, 'get_real_child_model')):
-            return data
-
-        kwargs = {}
-        if klass.swagger_types is not None:
-            for attr, attr_type in six.iteritems(klass.swagger_types):
-                if (data is not None and
-                        klass.attribute_map[attr] in data and
-                        isinstance(data, (list, dict))):
-                    value = data[klass.attribute_map[attr]]
-                    kwargs[attr] = self.__deserialize(value, attr_type)
-
-        instance = klass(**kwargs)
-
-        if (isinstance(instance, dict) and
-                klass.swagger_types is not None and
-                isinstance(data, dict)):
-            for key, value in data.items():
-                if key not in klass.swagger_types:
-                    instance[key] = value
-        if self.__hasattr(instance, 'get_real_child_model'):
-            klass_name = instance.get_real_child_model(data)
-            if klass_name:
-                instance = self.__deserialize(data, klass_name)
-        return instance
@@ -0,0 +1,364 @@
+# coding: utf-8
+
+"""
+    Pico W Environmental Monitoring HTTP API
+
+    asyncio transport for the generated client.
+
+    `AsyncApiClient` is a drop-in `ApiClient` for `DefaultApi`: every API
+    method returns a coroutine instead of blocking a (pool) thread, so one
+    event loop can keep hundreds of devices in flight. Parameter handling,
+    models and deserialization are shared with `ApiClient`; only the
+    transport differs. The default transport speaks HTTP/1.1 over
+    `asyncio` streams with a small keep-alive pool per host. Any object with
+    the same `request()` coroutine (e.g. one built on aiohttp or httpx) can
+    be passed as `transport`.
+
+        async with AsyncApiClient(configuration) as client:
+            status = await DefaultApi(client).status_get()
+"""
+
+
+from __future__ import absolute_import
+
+import asyncio
+import json
+import logging
+import ssl
+import zlib
+
+import certifi
+from six.moves.urllib.parse import urlencode, urlsplit
+from urllib3._collections import HTTPHeaderDict
+
+from swagger_client.api_client import ApiClient
+from swagger_client.rest import ApiException
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRESTResponse(object):
+    """Same interface as `rest.RESTResponse` (status, reason, data, headers)."""
+
+    def __init__(self, status, reason, headers, data):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.data = data
+
+    def getheaders(self):
+        """Returns a dictionary of the response headers."""
+        return self.headers
+
+    def getheader(self, name, default=None):
+        """Returns a given response header."""
+        return self.headers.get(name, default)
+
+
+class _StaleConnection(Exception):
+    """A pooled keep-alive connection was closed by the server before use."""
+
+
+class AsyncHTTPTransport(object):
+    """HTTP/1.1 over asyncio streams with per-host keep-alive connections.
+
+    :param configuration: `Configuration` (SSL settings, Accept-Encoding,
+        `connection_pool_maxsize` idle connections kept per host and the
+        `connect_timeout`/`read_timeout` used without `_request_timeout`).
+    """
+
+    def __init__(self, configuration, maxsize=None):
+        self.configuration = configuration
+        if maxsize is None:
+            maxsize = configuration.connection_pool_maxsize or 4
+        self.maxsize = maxsize
+        self.accept_encoding = configuration.accept_encoding
+        self.connect_timeout = configuration.connect_timeout
+        self.read_timeout = configuration.read_timeout
+        self._idle = {}
+        self._ssl = None
+
+    def _ssl_context(self):
+        if self._ssl is None:
+            config = self.configuration
+            ctx = ssl.create_default_context(
+                cafile=config.ssl_ca_cert or certifi.where())
+            if config.cert_file:
+                ctx.load_cert_chain(config.cert_file, config.key_file)
+            if not config.verify_ssl:
+                ctx.check_hostname = False
+                ctx.verify_mode = ssl.CERT_NONE
+            elif config.assert_hostname is False:
+                ctx.check_hostname = False
+            self._ssl = ctx
+        return self._ssl
+
+    async def request(self, method, url, query_params=None, headers=None,
+                      body=None, post_params=None, _preload_content=True,
+                      _request_timeout=None):
+        """Perform a request; same arguments as `RESTClientObject.request`.
+
+        Connection errors and timeouts are raised as `OSError` /
+        `asyncio.TimeoutError`, non-2xx responses as `ApiException`.
+        """
+        method = method.upper()
+        headers = dict(headers or {})
+        parts = urlsplit(url)
+        secure = parts.scheme == 'https'
+        host = parts.hostname
+        port = parts.port or (443 if secure else 80)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        if query_params:
+            target += ('&' if '?' in target else '?') + urlencode(query_params)
+
+        if 'Content-Type' not in headers:
+            headers['Content-Type'] = 'application/json'
+        payload = b''
+        if method in ('POST', 'PUT', 'PATCH', 'OPTIONS', 'DELETE'):
+            if post_params and body:
+                raise ValueError(
+                    "body parameter cannot be used with post_params parameter."
+                )
+            content_type = headers['Content-Type'].lower()
+            if 'json' in content_type:
+                payload = json.dumps(body if body is not None else {})
+            elif content_type == 'application/x-www-form-urlencoded':
+                payload = urlencode(post_params or {})
+            elif isinstance(body, str):
+                payload = body
+            else:
+                raise ApiException(
+                    status=0,
+                    reason="Cannot prepare a request message for provided "
+                           "arguments (multipart is not supported by the "
+                           "asyncio transport).")
+            payload = payload.encode('utf-8')
+        if self.accept_encoding and 'Accept-Encoding' not in headers:
+            headers['Accept-Encoding'] = self.accept_encoding
+        headers['Host'] = parts.netloc
+        headers['Content-Length'] = str(len(payload))
+        head = '%s %s HTTP/1.1\r\n' % (method, target)
+        head += ''.join('%s: %s\r\n' % kv for kv in headers.items())
+        raw = (head + '\r\n').encode('latin-1') + payload
+
+        # like rest.py: without a per-request timeout the configured
+        # defaults apply, so a half-open pooled connection cannot hang
+        connect_timeout, read_timeout = self.connect_timeout, self.read_timeout
+        if isinstance(_request_timeout, (int, float)):
+            connect_timeout = read_timeout = _request_timeout
+        elif isinstance(_request_timeout, tuple) and len(_request_timeout) == 2:
+            connect_timeout, read_timeout = _request_timeout
+
+        key = (host, port, secure)
+        exchange = self._exchange(key, raw, method, connect_timeout)
+        if isinstance(_request_timeout, (int, float)):
+            # a single number is the timeout for the whole request
+            r = await asyncio.wait_for(exchange, _request_timeout)
+        else:
+            r = await asyncio.wait_for(exchange, read_timeout) \
+                if read_timeout else await exchange
+
+        if _preload_content:
+            r.data = r.data.decode('utf8')
+            logger.debug("response body: %s", r.data)
+
+        if not 200 <= r.status <= 299:
+            raise ApiException(http_resp=r)
+
+        return r
+
+    async def _exchange(self, key, raw, method, connect_timeout):
+        while True:
+            conn = self._checkout(key)
+            reused = conn is not None
+            if conn is None:
+                conn = await self._connect(key, connect_timeout)
+            try:
+                resp, keep = await self._roundtrip(conn, raw, method, reused)
+            except _StaleConnection:
+                conn[1].close()
+                continue        # retry once more on a fresh connection
+            except BaseException:
+                conn[1].close()
+                raise
+            if keep:
+                self._checkin(key, conn)
+            else:
+                conn[1].close()
+            return resp
+
+    async def _connect(self, key, timeout):
+        host, port, secure = key
+        opening = asyncio.open_connection(
+            host, port, ssl=self._ssl_context() if secure else None,
+            server_hostname=host if secure else None)
+        if timeout:
+            return await asyncio.wait_for(opening, timeout)
+        return await opening
+
+    def _checkout(self, key):
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return None
+
+    def _checkin(self, key, conn):
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self.maxsize:
+            idle.append(conn)
+        else:
+            conn[1].close()
+
+    async def _roundtrip(self, conn, raw, method, reused):
+        reader, writer = conn
+        try:
+            writer.write(raw)
+            await writer.drain()
+            status_line = await reader.readline()
+        except (ConnectionError, OSError):
+            if reused:
+                raise _StaleConnection()
+            raise
+        if not status_line:
+            if reused:
+                raise _StaleConnection()
+            raise ConnectionResetError("connection closed without response")
+
+        version, _, rest = status_line.decode('latin-1').rstrip('\r\n').partition(' ')
+        code, _, reason = rest.partition(' ')
+        status = int(code)
+        headers = HTTPHeaderDict()
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers.add(name.strip(), value.strip())
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            data = b''
+        elif headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            data = await self._read_chunked(reader)
+        elif 'Content-Length' in headers:
+            data = await reader.readexactly(int(headers['Content-Length']))
+        else:
+            data = await reader.read()
+            headers['Connection'] = 'close'
+
+        encoding = headers.get('Content-Encoding', '').lower()
+        if encoding in ('gzip', 'deflate'):
+            # 47 = auto-detect zlib or gzip header, any window size
+            data = zlib.decompress(data, 47 if encoding == 'gzip' else 15)
+
+        connection = headers.get('Connection', '').lower()
+        keep = connection != 'close' if version == 'HTTP/1.1' \
+            else connection == 'keep-alive'
+        return AsyncRESTResponse(status, reason, headers, data), keep
+
+    @staticmethod
+    async def _read_chunked(reader):
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';', 1)[0], 16)
+            if size == 0:
+                # trailers until the empty line
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    async def close(self):
+        """Close all idle keep-alive connections."""
+        writers = [w for idle in self._idle.values() for _, w in idle]
+        self._idle.clear()
+        for writer in writers:
+            writer.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+
+class AsyncApiClient(ApiClient):
+    """`ApiClient` whose `call_api` returns a coroutine.
+
+    :param configuration: .Configuration object for this client
+    :param transport: object with an `async request(method, url, ...)`
+        coroutine like `AsyncHTTPTransport.request`; defaults to one.
+    """
+
+    def __init__(self, configuration=None, header_name=None,
+                 header_value=None, cookie=None, transport=None):
+        super(AsyncApiClient, self).__init__(configuration, header_name,
+                                             header_value, cookie)
+        self.transport = transport or AsyncHTTPTransport(self.configuration)
+
+    def _new_rest_client(self, configuration):
+        # requests go through `transport`; no urllib3 pool manager needed
+        return None
+
+    def call_api(self, resource_path, method,
+                 path_params=None, query_params=None, header_params=None,
+                 body=None, post_params=None, files=None,
+                 response_type=None, auth_settings=None, async_req=None,
+                 _return_http_data_only=None, collection_formats=None,
+                 _preload_content=True, _request_timeout=None):
+        """Same arguments as `ApiClient.call_api`; returns a coroutine.
+
+        `async_req` is accepted for compatibility and ignored: every call
+        is asynchronous.
+        """
+        url, query_params, header_params, post_params, body = \
+            self._prepare_request(resource_path, path_params, query_params,
+                                  header_params, body, post_params, files,
+                                  auth_settings, collection_formats)
+        return self._call(method, url, query_params, header_params,
+                          post_params, body, response_type,
+                          _return_http_data_only, _preload_content,
+                          _request_timeout)
+
+    async def _call(self, method, url, query_params, header_params,
+                    post_params, body, response_type,
+                    _return_http_data_only, _preload_content,
+                    _request_timeout):
+        response_data = await self.request(
+            method, url, query_params=query_params, headers=header_params,
+            post_params=post_params, body=body,
+            _preload_content=_preload_content,
+            _request_timeout=_request_timeout)
+        return self._handle_response(response_data, response_type,
+                                     _return_http_data_only,
+                                     _preload_content)
+
+    async def request(self, method, url, query_params=None, headers=None,
+                      post_params=None, body=None, _preload_content=True,
+                      _request_timeout=None):
+        """Makes the HTTP request using the async transport."""
+        if method not in ('GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH',
+                          'DELETE'):
+            raise ValueError(
+                "http method must be `GET`, `HEAD`, `OPTIONS`,"
+                " `POST`, `PATCH`, `PUT` or `DELETE`."
+            )
+        return await self.transport.request(
+            method, url, query_params=query_params, headers=headers,
+            body=body, post_params=post_params,
+            _preload_content=_preload_content,
+            _request_timeout=_request_timeout)
+
+    async def close(self):
+        await self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,283 @@
+# coding: utf-8
+
+"""
+    Pico W Environmental Monitoring HTTP API
+
+    GET response cache for `ApiClient`.
+
+    Tools that call `status_get()`/`config_get()` on the same devices within
+    seconds of each other can share responses:
+
+        configuration.response_cache = ResponseCache(
+            DiskCache(), ttls={'/status': 5, '/config': 60})
+
+    Fresh entries (younger than the endpoint TTL) are answered without a
+    request. Stale entries that carry an `ETag` or `Last-Modified` are
+    revalidated with `If-None-Match`/`If-Modified-Since`; a 304 refreshes
+    them. Endpoints without a TTL and without validators are not cached.
+    Any other method, and a GET to a mutating route such as `/config/set`,
+    bypasses the cache and drops every cached response for that host: a
+    device's endpoints share state, so POST /config also changes /status.
+
+    `MemoryCache` lives in the process; `DiskCache` is a SQLite file shared
+    by separate CLI invocations. Both are LRU-bounded by entry count.
+"""
+
+
+from __future__ import absolute_import
+
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from six.moves.urllib.parse import urlencode, urlsplit
+
+from swagger_client.rest import ApiException
+
+
+class CachedResponse(object):
+    """Same interface as `rest.RESTResponse` (status, reason, data, headers)."""
+
+    def __init__(self, status, reason, headers, data, stored_at, expires_at):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.data = data
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+    def getheaders(self):
+        """Returns a dictionary of the response headers."""
+        return self.headers
+
+    def getheader(self, name, default=None):
+        """Returns a given response header."""
+        for key, value in self.headers.items():
+            if key.lower() == name.lower():
+                return value
+        return default
+
+    def to_json(self):
+        return json.dumps([self.status, self.reason, self.headers, self.data,
+                           self.stored_at, self.expires_at])
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(*json.loads(text))
+
+
+class MemoryCache(object):
+    """In-process LRU of `CachedResponse` objects.
+
+    :param max_entries: entries kept before the least recently used is
+        dropped.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def default_cache_path():
+    """`$XDG_CACHE_HOME/swagger_client/responses.sqlite` (or ~/.cache/...)."""
+    base = (os.environ.get('XDG_CACHE_HOME') or
+            os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'swagger_client', 'responses.sqlite')
+
+
+class DiskCache(object):
+    """LRU of `CachedResponse` objects in a SQLite file.
+
+    Separate processes using the same `path` share entries; SQLite does
+    the locking.
+
+    :param path: database file, `default_cache_path()` if None.
+    :param max_entries: entries kept before the least recently used are
+        dropped.
+    """
+
+    def __init__(self, path=None, max_entries=4096):
+        self.path = path or default_cache_path()
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._local = threading.local()
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with self._db() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS responses ('
+                       'key TEXT PRIMARY KEY, entry TEXT NOT NULL, '
+                       'used REAL NOT NULL)')
+            db.execute('CREATE INDEX IF NOT EXISTS responses_used '
+                       'ON responses (used)')
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=5.0)
+        return db
+
+    def get(self, key):
+        with self._db() as db:
+            row = db.execute('SELECT entry FROM responses WHERE key = ?',
+                             (key,)).fetchone()
+            if row is None:
+                return None
+            db.execute('UPDATE responses SET used = ? WHERE key = ?',
+                       (time.time(), key))
+        return CachedResponse.from_json(row[0])
+
+    def set(self, key, entry):
+        with self._db() as db:
+            db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?)',
+                       (key, entry.to_json(), time.time()))
+            count = db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            if count > self.max_entries:
+                db.execute('DELETE FROM responses WHERE key IN (SELECT key '
+                           'FROM responses ORDER BY used LIMIT ?)',
+                           (count - self.max_entries,))
+                self.evictions += count - self.max_entries
+
+    def delete_prefix(self, prefix):
+        escaped = (prefix.replace('\\', '\\\\').replace('%', '\\%')
+                   .replace('_', '\\_'))
+        with self._db() as db:
+            db.execute("DELETE FROM responses WHERE key LIKE ? ESCAPE '\\'",
+                       (escaped + '%',))
+
+    def clear(self):
+        with self._db() as db:
+            db.execute('DELETE FROM responses')
+
+    def __len__(self):
+        return self._db().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+class ResponseCache(object):
+    """Cache policy in front of `ApiClient.request` for GET requests.
+
+    :param backend: `MemoryCache` (default) or `DiskCache`.
+    :param ttls: dict resource path -> seconds a response stays fresh,
+        e.g. {'/status': 5, '/config': 60}.
+    :param default_ttl: seconds for paths not in `ttls`.
+    :param mutating_gets: resource paths whose GET changes device state;
+        never cached, and they invalidate like a POST.
+    """
+
+    def __init__(self, backend=None, ttls=None, default_ttl=0,
+                 mutating_gets=('/config/set',)):
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.mutating_gets = frozenset(mutating_gets)
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0,
+                      'stores': 0, 'invalidations': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def hit_rate(self):
+        """Share of GET requests answered without a full response body."""
+        served = self.stats['hits'] + self.stats['revalidated']
+        total = served + self.stats['misses']
+        return served / total if total else 0.0
+
+    def ttl_for(self, resource_path):
+        return self.ttls.get(resource_path, self.default_ttl)
+
+    def mutates(self, method, resource_path):
+        """Whether the request may change state on the device."""
+        return method != 'GET' or resource_path in self.mutating_gets
+
+    @staticmethod
+    def key(url, query_params, headers):
+        """`url?query#hash of the request headers` (API keys, Accept, ...)."""
+        digest = hashlib.sha1(
+            repr(sorted((headers or {}).items())).encode('utf-8')).hexdigest()
+        return '%s?%s#%s' % (url, urlencode(query_params or []), digest[:16])
+
+    def invalidate(self, url):
+        """Drops all cached responses for the host of `url`."""
+        self._count('invalidations')
+        parts = urlsplit(url)
+        self.backend.delete_prefix('%s://%s/' % (parts.scheme, parts.netloc))
+
+    def fetch(self, request, resource_path, url, query_params, headers):
+        """Answers a GET from the cache or through `request(headers)`.
+
+        :param request: function headers -> response; raises ApiException
+            for non-2xx statuses like `ApiClient.request`.
+        """
+        ttl = self.ttl_for(resource_path)
+        key = self.key(url, query_params, headers)
+        now = time.time()
+        entry = self.backend.get(key)
+        if entry is not None and now < entry.expires_at:
+            self._count('hits')
+            return entry
+
+        conditional = dict(headers or {})
+        if entry is not None:
+            etag = entry.getheader('ETag')
+            last_modified = entry.getheader('Last-Modified')
+            if etag:
+                conditional['If-None-Match'] = etag
+            if last_modified:
+                conditional['If-Modified-Since'] = last_modified
+        try:
+            response = request(conditional)
+        except ApiException as e:
+            if e.status != 304 or entry is None:
+                raise
+            self._count('revalidated')
+            entry.stored_at, entry.expires_at = now, now + ttl
+            self.backend.set(key, entry)
+            return entry
+
+        self._count('misses')
+        headers = dict(response.getheaders() or {})
+        cache_control = ''.join(v for k, v in headers.items()
+                                if k.lower() == 'cache-control').lower()
+        validators = any(k.lower() in ('etag', 'last-modified') for k in headers)
+        if (response.status == 200 and (ttl > 0 or validators)
+                and 'no-store' not in cache_control):
+            self._count('stores')
+            self.backend.set(key, CachedResponse(
+                response.status, response.reason, headers, response.data,
+                now, now + ttl))
+        return response
@@ -0,0 +1,177 @@
+# coding: utf-8
+
+"""
+    Pico W Environmental Monitoring HTTP API
+
+    Columnar decoding of model arrays.
+
+    For analytics, `history_get(_columnar=True)` returns one `Columns`
+    object instead of a list of `ReadingSnapshot` models: one array per
+    attribute, no per-row objects. Column types follow `swagger_types`:
+
+        float     float32 (missing values are NaN)
+        int       int64
+        datetime  int64 seconds since the Unix epoch (naive times are UTC)
+        bool      bool
+        other     list of the JSON values
+
+    Arrays are NumPy arrays when NumPy is installed, `array.array` otherwise
+    (same item sizes, `numpy.asarray()` wraps them without copying).
+
+        cols = DefaultApi(client).history_get(_columnar=True)
+        cols.temperature.mean(), cols.timestamp[-1]
+"""
+
+
+from __future__ import absolute_import
+
+import array
+import datetime
+
+from swagger_client.rest import ApiException
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_EPOCH = datetime.date(1970, 1, 1)
+_NAN = float('nan')
+
+# swagger type -> (numpy dtype, array typecode)
+_COLUMN_TYPES = {
+    'float': ('float32', 'f'),
+    'int': ('int64', 'q'),
+    'datetime': ('int64', 'q'),
+    'bool': ('bool', 'b'),
+}
+
+
+def _to_array(values, swagger_type):
+    dtype, typecode = _COLUMN_TYPES[swagger_type]
+    if numpy is not None:
+        return numpy.array(values, dtype=dtype)
+    return array.array(typecode, values)
+
+
+class Columns(object):
+    """Column arrays for a list of models, indexed by attribute name."""
+
+    __slots__ = ('model', 'columns', '_length')
+
+    def __init__(self, model, columns, length):
+        self.model = model
+        self.columns = columns
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __getattr__(self, name):
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the typed columns (list columns are not counted)."""
+        total = 0
+        for column in self.columns.values():
+            if hasattr(column, 'nbytes'):
+                total += column.nbytes
+            elif isinstance(column, array.array):
+                total += column.itemsize * len(column)
+        return total
+
+    def to_dict(self):
+        """Returns the columns as a dict of name -> array."""
+        return dict(self.columns)
+
+    def __repr__(self):
+        return '<Columns %s x%d: %s>' % (self.model.__name__, self._length,
+                                         ', '.join(self.columns))
+
+
+def _epoch_parser(parse_datetime):
+    """Returns string -> epoch seconds, with a per-call cache of day starts.
+
+    Device timestamps (`YYYY-MM-DDTHH:MM:SSZ`) are sliced; everything else
+    goes through `parse_datetime` (the ApiClient datetime deserializer).
+    """
+    days = {}
+
+    def epoch(string):
+        if (len(string) == 20 and string[19] in 'Zz' and string[13] == ':'
+                and string[16] == ':'):
+            day = days.get(string[:10])
+            try:
+                if day is None:
+                    day = (datetime.date(int(string[0:4]), int(string[5:7]),
+                                         int(string[8:10])) - _EPOCH).days
+                    day = days[string[:10]] = day * 86400
+                hour, minute, second = (int(string[11:13]), int(string[14:16]),
+                                        int(string[17:19]))
+                if hour < 24 and minute < 60 and second < 61:
+                    return day + hour * 3600 + minute * 60 + second
+            except ValueError:
+                pass
+        value = parse_datetime(string)
+        if not isinstance(value, datetime.datetime):
+            raise ApiException(
+                status=0,
+                reason="Failed to parse `{0}` as datetime object".format(string))
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return int(value.timestamp() // 1)
+
+    return epoch
+
+
+def columns_plan(klass, parse_datetime):
+    """Builds data (list of dicts) -> `Columns` for the model class `klass`.
+
+    :param klass: model class with `swagger_types` and `attribute_map`.
+    :param parse_datetime: function str -> datetime for non-device formats.
+    """
+    fields = [(attr, klass.attribute_map[attr], swagger_type)
+              for attr, swagger_type in klass.swagger_types.items()]
+
+    def plan(data):
+        if data is None:
+            return None
+        columns = {}
+        for attr, key, swagger_type in fields:
+            values = [row.get(key) for row in data]
+            if swagger_type == 'datetime':
+                epoch = _epoch_parser(parse_datetime)
+                if None in values:
+                    raise ApiException(
+                        status=0, reason="Missing `{0}` values".format(key))
+                values = [epoch(v) for v in values]
+            elif swagger_type in ('int', 'bool'):
+                if None in values:
+                    raise ApiException(
+                        status=0, reason="Missing `{0}` values".format(key))
+            elif swagger_type == 'float':
+                if None in values:
+                    values = [_NAN if v is None else v for v in values]
+            else:
+                columns[attr] = values
+                continue
+            try:
+                columns[attr] = _to_array(values, swagger_type)
+            except (TypeError, ValueError, OverflowError):
+                raise ApiException(
+                    status=0,
+                    reason="Invalid `{0}` values for a {1} column".format(
+                        key, swagger_type))
+        return Columns(klass, columns, len(data))
+
+    return plan
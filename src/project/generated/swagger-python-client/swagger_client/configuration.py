@@ -31,6 +31,7 @@ class Configuration(object):
     """
 
     _default = None
+    _shared = None
 
     def __init__(self):
         """Constructor"""
@@ -88,18 +89,54 @@ class Configuration(object):
         # requests to the same host, which is often the case here.
         # cpu_count * 5 is used as default value to increase performance.
         self.connection_pool_maxsize = multiprocessing.cpu_count() * 5
+        # Host pools kept by urllib3 (one per device); the least recently
+        # used beyond this count is closed. Fleet tools talk to hundreds of
+        # devices, urllib3's default of 4 reconnects on almost every call.
+        self.connection_pool_hosts = 512
+        # Host pools unused for this many seconds are closed (None = never)
+        self.connection_pool_idle_s = 120.0
+        # TCP keep-alive probes after this many idle seconds (None = off)
+        self.socket_keepalive_s = 30
+        # Default timeouts in seconds when a call passes no
+        # _request_timeout; the devices answer within a second on Wi-Fi.
+        self.connect_timeout = 3.0
+        self.read_timeout = 10.0
 
         # Proxy URL
         self.proxy = None
+        # Accept-Encoding sent with every request. The device compresses
+        # large responses; urllib3 decodes gzip/deflate transparently.
+        # Set to None to request uncompressed bodies.
+        self.accept_encoding = 'gzip, deflate'
         # Safe chars for path_param
         self.safe_chars_for_path_param = ''
 
         # Disable client side validation
         self.client_side_validation = True
 
+        # cache.ResponseCache for GET responses (ApiClient only), None = off
+        self.response_cache = None
+        # retry.RetryPolicy for transient failures (ApiClient only),
+        # None = one attempt
+        self.retry_policy = None
+
     @classmethod
     def set_default(cls, default):
         cls._default = default
+        Configuration._shared = None
+
+    @classmethod
+    def shared(cls):
+        """Read-only configuration used by models created without one.
+
+        Built once (from the `set_default` configuration, if any) instead of
+        a full Configuration per model instance. Pass `_configuration` to a
+        model to use different settings.
+        """
+        shared = Configuration._shared
+        if shared is None:
+            shared = Configuration._shared = _SharedConfiguration()
+        return shared
 
     @property
     def logger_file(self):
@@ -244,3 +281,18 @@ class Configuration(object):
                "Version of the API: 1.0.0\n"\
                "SDK Package Version: 1.0.0".\
                format(env=sys.platform, pyversion=sys.version)
+
+
+class _SharedConfiguration(Configuration):
+    """Configuration that refuses changes after construction."""
+
+    def __init__(self):
+        Configuration.__init__(self)
+        self.__dict__['_frozen'] = True
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen'):
+            raise AttributeError(
+                "the shared model configuration is read-only; "
+                "pass _configuration=Configuration() to the model instead")
+        object.__setattr__(self, name, value)
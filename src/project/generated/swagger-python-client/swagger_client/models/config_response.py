@@ -32,6 +32,8 @@ class ConfigResponse(object):
       attribute_map (dict): The key is attribute name
                             and the value is json key in definition.
     """
+    __slots__ = ('_configuration', '_interval', '_timestamp', 'discriminator')
+
     swagger_types = {
         'interval': 'int',
         'timestamp': 'datetime'
@@ -45,7 +47,7 @@ class ConfigResponse(object):
     def __init__(self, interval=None, timestamp=None, _configuration=None):  # noqa: E501
         """ConfigResponse - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.shared()
         self._configuration = _configuration
 
         self._interval = None
@@ -32,6 +32,8 @@ class ConfigSetRequest(object):
       attribute_map (dict): The key is attribute name
                             and the value is json key in definition.
     """
+    __slots__ = ('_configuration', '_interval', '_persist', 'discriminator')
+
     swagger_types = {
         'interval': 'int',
         'persist': 'bool'
@@ -45,7 +47,7 @@ class ConfigSetRequest(object):
     def __init__(self, interval=None, persist=None, _configuration=None):  # noqa: E501
         """ConfigSetRequest - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.shared()
         self._configuration = _configuration
 
         self._interval = None
@@ -32,6 +32,9 @@ class ConfigSetResponse(object):
       attribute_map (dict): The key is attribute name
                             and the value is json key in definition.
     """
+    __slots__ = ('_configuration', '_interval', '_ok', '_persisted',
+                 '_timestamp', 'discriminator')
+
     swagger_types = {
         'interval': 'int',
         'ok': 'bool',
@@ -49,7 +52,7 @@ class ConfigSetResponse(object):
     def __init__(self, interval=None, ok=None, persisted=None, timestamp=None, _configuration=None):  # noqa: E501
         """ConfigSetResponse - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.shared()
         self._configuration = _configuration
 
         self._interval = None
@@ -32,6 +32,8 @@ class ErrorResponse(object):
       attribute_map (dict): The key is attribute name
                             and the value is json key in definition.
     """
+    __slots__ = ('_configuration', '_error', 'discriminator')
+
     swagger_types = {
         'error': 'str'
     }
@@ -43,7 +45,7 @@ class ErrorResponse(object):
     def __init__(self, error=None, _configuration=None):  # noqa: E501
         """ErrorResponse - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.shared()
         self._configuration = _configuration
 
         self._error = None
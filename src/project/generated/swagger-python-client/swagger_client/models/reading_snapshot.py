@@ -32,6 +32,9 @@ class ReadingSnapshot(object):
       attribute_map (dict): The key is attribute name
                             and the value is json key in definition.
     """
+    __slots__ = ('_configuration', '_humidity', '_temperature', '_timestamp',
+                 'discriminator')
+
     swagger_types = {
         'humidity': 'float',
         'temperature': 'float',
@@ -47,7 +50,7 @@ class ReadingSnapshot(object):
     def __init__(self, humidity=None, temperature=None, timestamp=None, _configuration=None):  # noqa: E501
         """ReadingSnapshot - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.shared()
         self._configuration = _configuration
 
         self._humidity = None
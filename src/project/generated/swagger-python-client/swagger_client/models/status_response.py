@@ -32,6 +32,10 @@ class StatusResponse(object):
       attribute_map (dict): The key is attribute name
                             and the value is json key in definition.
     """
+    __slots__ = ('_configuration', '_config', '_device_id', '_last_published',
+                 '_last_sensor', '_mqtt', '_timestamp', '_uptime_s', '_wifi',
+                 'discriminator')
+
     swagger_types = {
         'config': 'StatusResponseConfig',
         'device_id': 'str',
@@ -57,7 +61,7 @@ class StatusResponse(object):
     def __init__(self, config=None, device_id=None, last_published=None, last_sensor=None, mqtt=None, timestamp=None, uptime_s=None, wifi=None, _configuration=None):  # noqa: E501
         """StatusResponse - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.shared()
         self._configuration = _configuration
 
         self._config = None
@@ -32,6 +32,8 @@ class StatusResponseConfig(object):
       attribute_map (dict): The key is attribute name
                             and the value is json key in definition.
     """
+    __slots__ = ('_configuration', '_interval_s', 'discriminator')
+
     swagger_types = {
         'interval_s': 'int'
     }
@@ -43,7 +45,7 @@ class StatusResponseConfig(object):
     def __init__(self, interval_s=None, _configuration=None):  # noqa: E501
         """StatusResponseConfig - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.shared()
         self._configuration = _configuration
 
         self._interval_s = None
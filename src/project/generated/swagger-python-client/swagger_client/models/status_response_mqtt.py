@@ -32,6 +32,9 @@ class StatusResponseMqtt(object):
       attribute_map (dict): The key is attribute name
                             and the value is json key in definition.
     """
+    __slots__ = ('_configuration', '_base_topic', '_broker', '_connected',
+                 '_port', 'discriminator')
+
     swagger_types = {
         'base_topic': 'str',
         'broker': 'str',
@@ -49,7 +52,7 @@ class StatusResponseMqtt(object):
     def __init__(self, base_topic=None, broker=None, connected=None, port=None, _configuration=None):  # noqa: E501
         """StatusResponseMqtt - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.shared()
         self._configuration = _configuration
 
         self._base_topic = None
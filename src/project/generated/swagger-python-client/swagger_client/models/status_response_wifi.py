@@ -32,6 +32,9 @@ class StatusResponseWifi(object):
       attribute_map (dict): The key is attribute name
                             and the value is json key in definition.
     """
+    __slots__ = ('_configuration', '_connected', '_ip', '_ssid',
+                 'discriminator')
+
     swagger_types = {
         'connected': 'bool',
         'ip': 'str',
@@ -47,7 +50,7 @@ class StatusResponseWifi(object):
     def __init__(self, connected=None, ip=None, ssid=None, _configuration=None):  # noqa: E501
         """StatusResponseWifi - a model defined in Swagger"""  # noqa: E501
         if _configuration is None:
-            _configuration = Configuration()
+            _configuration = Configuration.shared()
         self._configuration = _configuration
 
         self._connected = None
@@ -17,7 +17,10 @@ import io
 import json
 import logging
 import re
+import socket
 import ssl
+import threading
+import time
 
 import certifi
 # python 2 and python 3 compatibility library
@@ -26,6 +29,8 @@ from six.moves.urllib.parse import urlencode
 
 try:
     import urllib3
+    from urllib3._collections import RecentlyUsedContainer
+    from urllib3.connection import HTTPConnection
 except ImportError:
     raise ImportError('Swagger python client requires urllib3.')
 
@@ -50,9 +55,113 @@ class RESTResponse(io.IOBase):
         return self.urllib3_response.headers.get(name, default)
 
 
+def keepalive_socket_options(idle_s):
+    """urllib3 socket options with TCP keep-alive probes after `idle_s`.
+
+    Probes keep NAT/AP state alive on pooled device connections and detect
+    devices that dropped off the Wi-Fi without a FIN.
+    """
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    for name, value in (('TCP_KEEPIDLE', idle_s),
+                        ('TCP_KEEPALIVE', idle_s),   # macOS name of KEEPIDLE
+                        ('TCP_KEEPINTVL', max(1, idle_s // 3)),
+                        ('TCP_KEEPCNT', 3)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name),
+                            int(value)))
+    return options
+
+
+class _FleetPoolMixin(object):
+    """Host pools for many devices: LRU bound, idle expiry and counters.
+
+    urllib3 keeps at most `num_pools` host pools and drops the least
+    recently used. Here dropped pools are closed right away, pools unused
+    for `idle_s` seconds are closed too, and request/connection counts
+    survive the pools they were made on.
+    """
+
+    def _init_fleet(self, num_pools, idle_s):
+        self.idle_s = idle_s
+        self.pools = RecentlyUsedContainer(num_pools,
+                                           dispose_func=self._retire)
+        self._last_used = {}
+        self._last_sweep = time.monotonic()
+        self._stats_lock = threading.Lock()
+        self._counts = {'pool_lookups': 0, 'pools_created': 0,
+                        'pools_evicted': 0, 'requests': 0,
+                        'connections_opened': 0}
+
+    def _retire(self, pool):
+        with self._stats_lock:
+            self._counts['pools_evicted'] += 1
+            self._counts['requests'] += pool.num_requests
+            self._counts['connections_opened'] += pool.num_connections
+        pool.close()
+
+    def connection_from_pool_key(self, pool_key, request_context):
+        now = time.monotonic()
+        with self.pools.lock:
+            if self.idle_s and now - self._last_sweep > self.idle_s / 2.0:
+                self._sweep(now)
+            self._counts['pool_lookups'] += 1
+            created = pool_key not in self.pools
+            pool = super(_FleetPoolMixin, self).connection_from_pool_key(
+                pool_key, request_context)
+            if created:
+                self._counts['pools_created'] += 1
+            self._last_used[pool_key] = now
+        return pool
+
+    def _sweep(self, now):
+        self._last_sweep = now
+        for key, used in list(self._last_used.items()):
+            if now - used > self.idle_s or key not in self.pools:
+                self._last_used.pop(key, None)
+                try:
+                    del self.pools[key]
+                except KeyError:
+                    pass
+
+    def stats(self):
+        with self.pools.lock:
+            counts = dict(self._counts)
+            pools = [self.pools[key] for key in self.pools.keys()]
+        for pool in pools:
+            counts['requests'] += pool.num_requests
+            counts['connections_opened'] += pool.num_connections
+        counts['pools_open'] = len(pools)
+        lookups, requests = counts['pool_lookups'], counts['requests']
+        counts['pool_hit_rate'] = (
+            1.0 - counts['pools_created'] / float(lookups) if lookups else 0.0)
+        counts['connection_reuse_rate'] = (
+            1.0 - counts['connections_opened'] / float(requests)
+            if requests else 0.0)
+        return counts
+
+
+class FleetPoolManager(_FleetPoolMixin, urllib3.PoolManager):
+
+    def __init__(self, num_pools=10, headers=None, idle_s=None,
+                 **connection_pool_kw):
+        urllib3.PoolManager.__init__(self, num_pools, headers,
+                                     **connection_pool_kw)
+        self._init_fleet(num_pools, idle_s)
+
+
+class FleetProxyManager(_FleetPoolMixin, urllib3.ProxyManager):
+
+    def __init__(self, proxy_url, num_pools=10, headers=None, idle_s=None,
+                 **connection_pool_kw):
+        urllib3.ProxyManager.__init__(self, proxy_url, num_pools, headers,
+                                      **connection_pool_kw)
+        self._init_fleet(num_pools, idle_s)
+
+
 class RESTClientObject(object):
 
-    def __init__(self, configuration, pools_size=4, maxsize=None):
+    def __init__(self, configuration, pools_size=None, maxsize=None):
         # urllib3.PoolManager will pass all kw parameters to connectionpool
         # https://github.com/shazow/urllib3/blob/f9409436f83aeb79fbaf090181cd81b784f1b8ce/urllib3/poolmanager.py#L75  # noqa: E501
         # https://github.com/shazow/urllib3/blob/f9409436f83aeb79fbaf090181cd81b784f1b8ce/urllib3/connectionpool.py#L680  # noqa: E501
@@ -81,11 +190,29 @@ class RESTClientObject(object):
                 maxsize = configuration.connection_pool_maxsize
             else:
                 maxsize = 4
+        if pools_size is None:
+            pools_size = configuration.connection_pool_hosts or 4
+
+        if configuration.retry_policy is not None:
+            # retries are up to the policy (ApiClient.request); urllib3
+            # makes one attempt and reports failures as MaxRetryError
+            addition_pool_args['retries'] = urllib3.Retry(0, redirect=False)
+        if configuration.socket_keepalive_s:
+            addition_pool_args['socket_options'] = keepalive_socket_options(
+                configuration.socket_keepalive_s)
+        if (configuration.connect_timeout is not None or
+                configuration.read_timeout is not None):
+            addition_pool_args['timeout'] = urllib3.Timeout(
+                connect=configuration.connect_timeout,
+                read=configuration.read_timeout)
+
+        self.accept_encoding = configuration.accept_encoding
 
         # https pool manager
         if configuration.proxy:
-            self.pool_manager = urllib3.ProxyManager(
+            self.pool_manager = FleetProxyManager(
                 num_pools=pools_size,
+                idle_s=configuration.connection_pool_idle_s,
                 maxsize=maxsize,
                 cert_reqs=cert_reqs,
                 ca_certs=ca_certs,
@@ -95,8 +222,9 @@ class RESTClientObject(object):
                 **addition_pool_args
             )
         else:
-            self.pool_manager = urllib3.PoolManager(
+            self.pool_manager = FleetPoolManager(
                 num_pools=pools_size,
+                idle_s=configuration.connection_pool_idle_s,
                 maxsize=maxsize,
                 cert_reqs=cert_reqs,
                 ca_certs=ca_certs,
@@ -105,6 +233,17 @@ class RESTClientObject(object):
                 **addition_pool_args
             )
 
+    def pool_stats(self):
+        """Counters of the connection pools.
+
+        pool_lookups/pools_created/pools_evicted/pools_open count host
+        pools. requests/connections_opened count HTTP requests and the TCP
+        connections made for them. pool_hit_rate and connection_reuse_rate
+        are the shares served by an existing pool and an existing
+        connection.
+        """
+        return self.pool_manager.stats()
+
     def request(self, method, url, query_params=None, headers=None,
                 body=None, post_params=None, _preload_content=True,
                 _request_timeout=None):
@@ -140,7 +279,7 @@ class RESTClientObject(object):
 
         timeout = None
         if _request_timeout:
-            if isinstance(_request_timeout, (int, ) if six.PY3 else (int, long)):  # noqa: E501,F821
+            if isinstance(_request_timeout, (int, float) if six.PY3 else (int, long, float)):  # noqa: E501,F821
                 timeout = urllib3.Timeout(total=_request_timeout)
             elif (isinstance(_request_timeout, tuple) and
                   len(_request_timeout) == 2):
@@ -149,6 +288,8 @@ class RESTClientObject(object):
 
         if 'Content-Type' not in headers:
             headers['Content-Type'] = 'application/json'
+        if self.accept_encoding and 'Accept-Encoding' not in headers:
+            headers['Accept-Encoding'] = self.accept_encoding
 
         try:
             # For `POST`, `PUT`, `PATCH`, `OPTIONS`, `DELETE`
@@ -0,0 +1,172 @@
+# coding: utf-8
+
+"""
+    Pico W Environmental Monitoring HTTP API
+
+    Retry policy for flaky Wi-Fi devices.
+
+        configuration.retry_policy = RetryPolicy(deadline_s=8, hedge_after_s=0.5)
+
+    `ApiClient.request` then retries transient failures (connection errors,
+    timeouts, 429/502/503/504) with exponential backoff and full jitter,
+    honours `Retry-After`, and gives up when `max_attempts` or the overall
+    `deadline_s` budget is used up; every attempt's timeout is capped at the
+    remaining budget. Only idempotent requests are repeated: GET/HEAD/
+    OPTIONS and POSTs to `idempotent_posts` (POST /config sets the interval,
+    sending the same body twice is harmless). Other requests are only
+    repeated if the connection was never established.
+
+    With `hedge_after_s`, a GET that has not answered after that many
+    seconds gets a second, identical request in parallel; the first
+    success wins.
+"""
+
+
+from __future__ import absolute_import
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import urllib3
+from six.moves.urllib.parse import urlsplit
+
+from swagger_client.rest import ApiException
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RetryPolicy(object):
+    """Retries, backoff and hedging around one HTTP request.
+
+    :param max_attempts: attempts per request, including the first.
+    :param backoff_base_s: backoff before the second attempt; doubles per
+        attempt, capped at `backoff_max_s`. The sleep is drawn uniformly
+        from [0, backoff] (full jitter).
+    :param deadline_s: budget for all attempts and sleeps of one request.
+    :param retry_statuses: HTTP statuses worth another attempt.
+    :param idempotent_posts: paths whose POST may be repeated.
+    :param hedge_after_s: seconds before a GET is hedged (None = off).
+    """
+
+    def __init__(self, max_attempts=4, backoff_base_s=0.2, backoff_max_s=2.0,
+                 deadline_s=10.0, retry_statuses=(429, 502, 503, 504),
+                 idempotent_posts=('/config',), hedge_after_s=None,
+                 hedge_workers=8, rng=None, sleep=time.sleep):
+        self.max_attempts = max_attempts
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.deadline_s = deadline_s
+        self.retry_statuses = frozenset(retry_statuses)
+        self.idempotent_posts = tuple(idempotent_posts)
+        self.hedge_after_s = hedge_after_s
+        self.hedge_workers = hedge_workers
+        self.rng = rng or random.Random()
+        self.sleep = sleep
+        self.stats = {'requests': 0, 'attempts': 0, 'retries': 0,
+                      'hedges': 0, 'hedge_wins': 0, 'gave_up': 0}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def idempotent(self, method, url):
+        if method in IDEMPOTENT_METHODS:
+            return True
+        if method == 'POST':
+            path = urlsplit(url).path
+            return any(path.endswith(p) for p in self.idempotent_posts)
+        return False
+
+    def retryable(self, error, idempotent):
+        """Whether `error` from one attempt is worth another attempt."""
+        if isinstance(error, ApiException):
+            return idempotent and error.status in self.retry_statuses
+        if isinstance(error, urllib3.exceptions.MaxRetryError):
+            reason = error.reason
+            if isinstance(reason, (urllib3.exceptions.NewConnectionError,
+                                   urllib3.exceptions.ConnectTimeoutError)):
+                return True     # nothing was sent
+            return idempotent
+        return idempotent and isinstance(
+            error, (urllib3.exceptions.HTTPError, OSError))
+
+    def backoff(self, attempt, error=None):
+        """Sleep before attempt `attempt + 1` (attempt counts from 1)."""
+        delay = self.rng.uniform(0, min(self.backoff_max_s,
+                                        self.backoff_base_s * 2 ** (attempt - 1)))
+        headers = getattr(error, 'headers', None)
+        if headers:
+            try:
+                delay = max(delay, float(headers.get('Retry-After')))
+            except (TypeError, ValueError):
+                pass
+        return delay
+
+    @staticmethod
+    def _clamp(timeout, remaining):
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining)
+                         for t in timeout)
+        return min(timeout, remaining)
+
+    def call(self, method, url, send, timeout=None):
+        """Runs `send(timeout)` under the policy and returns its response.
+
+        :param send: function timeout -> response; raises ApiException,
+            urllib3 errors or OSError on failure.
+        :param timeout: the caller's timeout (number or (connect, read)).
+        """
+        self._count('requests')
+        idempotent = self.idempotent(method, url)
+        hedge = method == 'GET' and self.hedge_after_s is not None
+        deadline = time.monotonic() + self.deadline_s
+        attempt = 0
+        while True:
+            attempt += 1
+            self._count('attempts')
+            remaining = deadline - time.monotonic()
+            try:
+                if hedge:
+                    return self._hedged(send, self._clamp(timeout, remaining))
+                return send(self._clamp(timeout, remaining))
+            except Exception as e:
+                if not self.retryable(e, idempotent) or attempt >= self.max_attempts:
+                    if attempt > 1:
+                        self._count('gave_up')
+                    raise
+                delay = self.backoff(attempt, e)
+                if time.monotonic() + delay >= deadline:
+                    self._count('gave_up')
+                    raise
+            self._count('retries')
+            self.sleep(delay)
+
+    def _hedged(self, send, timeout):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.hedge_workers, thread_name_prefix='hedge')
+        first = self._executor.submit(send, timeout)
+        done, _ = wait([first], timeout=self.hedge_after_s)
+        if done:
+            return first.result()
+        self._count('hedges')
+        second = self._executor.submit(send, timeout)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        raise error
@@ -50,6 +50,13 @@ class TestDefaultApi(unittest.TestCase):
         """
         pass
 
+    def test_history_get(self):
+        """Test case for history_get
+
+        Get locally buffered raw readings  # noqa: E501
+        """
+        pass
+
     def test_root_get(self):
         """Test case for root_get
 
@@ -0,0 +1,154 @@
+# health.py - Schleifen-Gesundheit, Watchdog-Fuetterung und Breadcrumbs fuer CircuitPython
+#
+# Der Hardware-Watchdog wird nur gefuettert, wenn jede Stufe der Hauptschleife
+# (Messung, MQTT, HTTP) innerhalb ihres Budgets Fortschritt gemeldet hat.
+# Haengt eine Stufe, bleibt das Fuettern aus und der Watchdog setzt das Geraet
+# zurueck. Vorher wird ein kleiner Breadcrumb-Datensatz in den NVM geschrieben,
+# den der naechste Boot zusammen mit dem Reset-Grund publiziert.
+# Hardware (microcontroller.nvm / .watchdog) wird von aussen hineingereicht.
+
+import json
+import time
+
+NVM_MAGIC = b"BC1"
+NVM_SIZE = 256          # reservierter Bereich am Anfang des NVM
+MAX_CRUMBS = 4
+
+
+class LoopHealth:
+    """
+    `budgets` = {"sample": 60, "mqtt": 120, "http": 10} (Sekunden ohne Fortschritt,
+    ab denen eine Stufe als haengend gilt).
+    """
+
+    def __init__(self, budgets: dict, clock=time.monotonic):
+        self.budgets = budgets
+        self.clock = clock
+        now = clock()
+        self.last = {}
+        for stage in budgets:
+            self.last[stage] = now
+        self.stage = None       # zuletzt betretene Stufe (fuer Crash-Breadcrumbs)
+        self.feeds = 0
+        self.reported = False   # Stall nur einmal als Breadcrumb festhalten
+
+    def enter(self, stage: str):
+        self.stage = stage
+
+    def progress(self, stage: str, now=None):
+        self.last[stage] = self.clock() if now is None else now
+
+    def stalled(self, now=None) -> list:
+        now = self.clock() if now is None else now
+        out = []
+        for stage, budget in self.budgets.items():
+            if now - self.last[stage] > budget:
+                out.append(stage)
+        return out
+
+    def feed(self, watchdog, breadcrumbs=None, now=None) -> bool:
+        """
+        Fuettert `watchdog`, wenn keine Stufe haengt. Sonst einmalig einen
+        "stall"-Breadcrumb schreiben und den Watchdog auslaufen lassen.
+        """
+        now = self.clock() if now is None else now
+        stalled = self.stalled(now)
+        if not stalled:
+            if watchdog is not None:
+                watchdog.feed()
+            self.feeds += 1
+            return True
+        if breadcrumbs is not None and not self.reported:
+            ages = {}
+            for stage in stalled:
+                ages[stage] = int(now - self.last[stage])
+            breadcrumbs.record("stall", stage=",".join(stalled), detail=ages)
+            self.reported = True
+        return False
+
+    def metrics(self, now=None) -> dict:
+        now = self.clock() if now is None else now
+        ages = {}
+        for stage in self.budgets:
+            ages[stage] = round(now - self.last[stage], 1)
+        return {"age_s": ages, "stalled": self.stalled(now), "feeds": self.feeds}
+
+
+class Breadcrumbs:
+    """
+    Kleiner Ringpuffer der letzten Ereignisse ("stall", "crash") im NVM.
+    Layout: MAGIC (3 B) | Laenge (2 B, big endian) | JSON-Liste.
+    Geschrieben wird nur bei Ereignissen, nie pro Schleifendurchlauf (Flash).
+    """
+
+    def __init__(self, nvm, offset=0, size=NVM_SIZE, clock=time.monotonic):
+        self.nvm = nvm
+        self.offset = offset
+        self.size = size
+        self.clock = clock
+
+    def load(self) -> list:
+        if self.nvm is None:
+            return []
+        o = self.offset
+        head = bytes(self.nvm[o:o + 5])
+        if head[:3] != NVM_MAGIC:
+            return []
+        n = (head[3] << 8) | head[4]
+        if n > self.size - 5:
+            return []
+        try:
+            crumbs = json.loads(bytes(self.nvm[o + 5:o + 5 + n]).decode("utf-8"))
+        except ValueError:
+            return []
+        return crumbs if isinstance(crumbs, list) else []
+
+    def record(self, kind: str, stage=None, detail=None):
+        crumb = {"kind": kind, "uptime_s": int(self.clock())}
+        if stage is not None:
+            crumb["stage"] = stage
+        if detail is not None:
+            crumb["detail"] = detail
+        crumbs = self.load()
+        crumbs.append(crumb)
+        crumbs = crumbs[-MAX_CRUMBS:]
+        data = json.dumps(crumbs).encode("utf-8")
+        # aelteste verwerfen, bis der Datensatz in den reservierten Bereich passt
+        while len(data) > self.size - 5 and len(crumbs) > 1:
+            crumbs = crumbs[1:]
+            data = json.dumps(crumbs).encode("utf-8")
+        if len(data) > self.size - 5:
+            data = json.dumps([{"kind": kind, "uptime_s": crumb["uptime_s"]}]).encode("utf-8")
+        self._write(NVM_MAGIC + bytes([len(data) >> 8, len(data) & 0xFF]) + data)
+
+    def clear(self):
+        if self.nvm is not None and bytes(self.nvm[self.offset:self.offset + 3]) == NVM_MAGIC:
+            self._write(b"\x00\x00\x00")
+
+    def _write(self, data: bytes):
+        if self.nvm is None:
+            return
+        self.nvm[self.offset:self.offset + len(data)] = data
+
+
+def reset_reason_name(reason) -> str:
+    """microcontroller.ResetReason.WATCHDOG -> "WATCHDOG"."""
+    if reason is None:
+        return "UNKNOWN"
+    return str(reason).split(".")[-1]
+
+
+def boot_report(reason, crumbs: list) -> dict:
+    """
+    Reset-Grund + Breadcrumbs fuer die Status-Nachricht. `cause` unterscheidet
+    erkannten Stall, Exception und harten Haenger (Watchdog ohne Breadcrumb).
+    """
+    name = reset_reason_name(reason)
+    last = crumbs[-1].get("kind") if crumbs else None
+    if name == "WATCHDOG":
+        cause = "stall" if last == "stall" else "hang"
+    elif last == "crash":
+        cause = "crash"
+    else:
+        cause = "normal"
+    return {"reason": name, "cause": cause, "breadcrumbs": crumbs}
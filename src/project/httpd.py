@@ -0,0 +1,596 @@
+# httpd.py - kleiner nicht-blockierender HTTP/1.1-Server fuer CircuitPython
+#
+# Ersetzt adafruit_httpserver in code.py. Die API ist bewusst gleich gehalten
+# (Server.route-Decorator, Request, Response, JSONResponse, GET/POST), aber
+# poll() bedient pro Aufruf mehrere Verbindungen aus einer kleinen festen
+# Verbindungstabelle, mit Timeouts je Verbindung und Keep-Alive. Optional begrenzt
+# ein RateLimiter (Token-Buckets je Client-IP und Route) die Last mit 429.
+# Groessere Text-/JSON-Antworten werden nach Accept-Encoding mit gzip/deflate
+# komprimiert, sofern die Firmware zlib-Kompression mitbringt.
+# Laeuft unveraendert auch unter CPython (pool = das Modul `socket`).
+
+import json
+import time
+
+try:
+    import zlib
+    if not hasattr(zlib, "compressobj"):
+        zlib = None   # CircuitPython-zlib kann nur dekomprimieren
+except ImportError:
+    zlib = None
+try:
+    import deflate    # MicroPython-Stil: DeflateIO(stream, format, wbits)
+except ImportError:
+    deflate = None
+
+GET = "GET"
+POST = "POST"
+
+EAGAIN = 11
+EWOULDBLOCK = 11
+ETIMEDOUT = 110
+_WOULD_BLOCK = (EAGAIN, EWOULDBLOCK, ETIMEDOUT, 35)  # 35 = EAGAIN auf macOS
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+def _unquote(s: str) -> str:
+    if "%" not in s and "+" not in s:
+        return s
+    s = s.replace("+", " ")
+    out = bytearray()
+    i = 0
+    raw = s.encode("utf-8")
+    while i < len(raw):
+        c = raw[i]
+        if c == 0x25 and i + 2 < len(raw):  # '%'
+            try:
+                out.append(int(raw[i + 1:i + 3], 16))
+                i += 3
+                continue
+            except ValueError:
+                pass
+        out.append(c)
+        i += 1
+    return out.decode("utf-8")
+
+
+def _would_block(e: OSError) -> bool:
+    return getattr(e, "errno", None) in _WOULD_BLOCK or (e.args and e.args[0] in _WOULD_BLOCK)
+
+
+ENCODINGS = ("gzip", "deflate")   # Reihenfolge = Vorzug bei gleichem q
+COMPRESS_WBITS = 10                # 1 KB Fenster: reicht fuer JSON, schont den RAM
+
+
+def can_compress() -> bool:
+    return zlib is not None or deflate is not None
+
+
+def negotiate(accept) -> str:
+    """Beste unterstuetzte Kodierung aus Accept-Encoding oder None."""
+    if not accept or not can_compress():
+        return None
+    offered = {}
+    for part in accept.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for enc in ENCODINGS:
+        q = offered.get(enc, offered.get("*", 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def compress(data: bytes, encoding: str, wbits=COMPRESS_WBITS) -> bytes:
+    """gzip- bzw. zlib-("deflate")-Strom; OSError ohne Kompressionsunterstuetzung."""
+    if zlib is not None:
+        c = zlib.compressobj(6, zlib.DEFLATED, wbits + 16 if encoding == "gzip" else wbits)
+        return c.compress(data) + c.flush()
+    if deflate is not None:
+        import io
+        out = io.BytesIO()
+        fmt = deflate.GZIP if encoding == "gzip" else deflate.ZLIB
+        with deflate.DeflateIO(out, fmt, wbits) as d:
+            d.write(data)
+        return out.getvalue()
+    raise OSError("keine Kompression verfuegbar")
+
+
+def _compressible(content_type: str) -> bool:
+    return content_type.startswith("text/") or content_type.startswith("application/json")
+
+
+class Headers:
+    """Header-Dict mit case-insensitivem Zugriff."""
+
+    def __init__(self):
+        self._h = {}
+
+    def __setitem__(self, name, value):
+        self._h[name.lower()] = value
+
+    def __getitem__(self, name):
+        return self._h[name.lower()]
+
+    def __contains__(self, name):
+        return name.lower() in self._h
+
+    def get(self, name, default=None):
+        return self._h.get(name.lower(), default)
+
+    def items(self):
+        return self._h.items()
+
+
+class Request:
+    def __init__(self, method, path, query_params, headers, body, client_address, http_version):
+        self.method = method
+        self.path = path
+        self.query_params = query_params
+        self.headers = headers
+        self.body = body
+        self.client_address = client_address
+        self.http_version = http_version
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8")) if self.body else None
+
+
+class Response:
+    def __init__(self, request, body="", content_type="text/plain", status=200, headers=None):
+        self.request = request
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.content_type = content_type
+        self.status = status
+        self.headers = headers or {}
+
+
+class JSONResponse(Response):
+    def __init__(self, request, data, status=200, headers=None):
+        super().__init__(request, json.dumps(data), "application/json", status, headers)
+
+
+class TokenBucket:
+    """Token-Bucket: `rate` Anfragen/s im Mittel, Spitzen bis `burst`."""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be > 0 and burst >= 1")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = now
+
+    def take(self, now: float) -> float:
+        """0.0 wenn erlaubt (Token verbraucht), sonst Wartezeit in Sekunden."""
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def refund(self):
+        self.tokens = min(self.burst, self.tokens + 1.0)
+
+
+class RateLimiter:
+    """
+    Zulassungskontrolle je Client-IP und je Route ("GET /status"). Die IP-Tabelle ist auf
+    `max_clients` Eintraege begrenzt (der am laengsten inaktive fliegt raus).
+    Routen ohne eigenen Eintrag in `route_limits` nutzen `route_rate`/`route_burst`.
+    Der Route-Bucket ist fuer alle Clients gemeinsam; er muss deutlich groesser
+    sein als der IP-Bucket, sonst leert ein einzelner Client die Route fuer alle.
+    """
+
+    def __init__(self, ip_rate=5.0, ip_burst=10.0, route_rate=20.0, route_burst=40.0,
+                 route_limits=None, max_clients=16):
+        # Fehlkonfiguration (Rate 0) beim Start melden, nicht bei der ersten Anfrage
+        for rate, burst in [(ip_rate, ip_burst), (route_rate, route_burst)] + list(
+                (route_limits or {}).values()):
+            if rate <= 0 or burst < 1:
+                raise ValueError("rate must be > 0 and burst >= 1")
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.route_rate = route_rate
+        self.route_burst = route_burst
+        self.route_limits = route_limits or {}
+        self.max_clients = max_clients
+        self._ips = {}
+        self._routes = {}
+        self.rejected = 0
+        self.rejected_by_route = {}
+        self.rejected_by_ip = 0
+
+    def check(self, ip: str, path: str, now: float) -> float:
+        """0.0 wenn die Anfrage zugelassen wird, sonst Retry-After in Sekunden."""
+        bucket = self._ips.get(ip)
+        if bucket is None:
+            if len(self._ips) >= self.max_clients:
+                oldest = None
+                for k, b in self._ips.items():
+                    if oldest is None or b.last < self._ips[oldest].last:
+                        oldest = k
+                del self._ips[oldest]
+            bucket = self._ips[ip] = TokenBucket(self.ip_rate, self.ip_burst, now)
+        wait = bucket.take(now)
+        if wait:
+            self.rejected_by_ip += 1
+            return self._reject(path, wait)
+
+        route = self._routes.get(path)
+        if route is None:
+            rate, burst = self.route_limits.get(path, (self.route_rate, self.route_burst))
+            route = self._routes[path] = TokenBucket(rate, burst, now)
+        wait = route.take(now)
+        if wait:
+            bucket.refund()
+            return self._reject(path, wait)
+        return 0.0
+
+    def _reject(self, path, wait):
+        self.rejected += 1
+        self.rejected_by_route[path] = self.rejected_by_route.get(path, 0) + 1
+        return wait
+
+    def metrics(self) -> dict:
+        return {
+            "rejected": self.rejected,
+            "rejected_by_ip": self.rejected_by_ip,
+            "rejected_by_route": self.rejected_by_route,
+            "clients": len(self._ips),
+        }
+
+
+class _Conn:
+    # Zustaende einer Verbindung
+    READING = 0
+    WRITING = 1
+    CLOSED = 2
+
+    def __init__(self, sock, addr, now, read_timeout_s):
+        self.sock = sock
+        self.addr = addr
+        self.buf = b""
+        self.out = None
+        self.sent = 0
+        self.state = _Conn.READING
+        self.deadline = now + read_timeout_s
+        self.keep_alive = False
+        self.served = 0
+        self.idle_since = now
+
+
+class Server:
+    """
+    Nicht-blockierender HTTP/1.1-Server.
+
+    max_connections  Groesse der Verbindungstabelle (weitere Clients warten im Listen-Backlog)
+    read_timeout_s   Zeit, um eine vollstaendige Anfrage zu empfangen (auch Keep-Alive-Leerlauf)
+    write_timeout_s  Zeit, um eine Antwort vollstaendig zu senden
+    keep_alive       HTTP/1.1 Keep-Alive erlauben
+    compress_min     Text/JSON-Antworten ab so vielen Bytes komprimieren (0 = nie)
+    """
+
+    MAX_REQUEST_BYTES = 2048
+    MAX_REQUESTS_PER_CONN = 100
+    # Keep-Alive-Verbindungen, die so lange leerlaufen, duerfen bei voller
+    # Tabelle fuer einen neuen Client geschlossen werden
+    IDLE_EVICT_S = 0.25
+
+    def __init__(self, pool, debug=False, max_connections=4, read_timeout_s=2.0,
+                 write_timeout_s=2.0, keep_alive=True, limiter=None, compress_min=1024,
+                 clock=time.monotonic):
+        self.pool = pool
+        self.debug = debug
+        self.headers = {}
+        self.max_connections = max_connections
+        self.read_timeout_s = read_timeout_s
+        self.write_timeout_s = write_timeout_s
+        self.keep_alive = keep_alive
+        self.limiter = limiter
+        self.compress_min = compress_min
+        self.clock = clock
+        self._routes = {}
+        self._sock = None
+        self._conns = []
+        self._chunk = bytearray(512)
+        self.stats = {"accepted": 0, "requests": 0, "timeouts": 0, "errors": 0}
+        self.compression = {"responses": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def route(self, path, method=GET):
+        def _register(handler):
+            self._routes.setdefault(path, {})[method] = handler
+            return handler
+        return _register
+
+    def start(self, host, port=80, backlog=8):
+        sock = self.pool.socket(self.pool.AF_INET, self.pool.SOCK_STREAM)
+        try:
+            sock.setsockopt(self.pool.SOL_SOCKET, self.pool.SO_REUSEADDR, 1)
+        except Exception:
+            pass
+        sock.bind((host, port))
+        sock.listen(backlog)
+        sock.setblocking(False)
+        self._sock = sock
+
+    def stop(self):
+        for c in self._conns:
+            self._close(c)
+        self._conns = []
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    @property
+    def port(self):
+        return self._sock.getsockname()[1]
+
+    def poll(self, budget_s=None) -> int:
+        """
+        Nimmt neue Verbindungen an und bedient alle offenen Verbindungen,
+        solange es Fortschritt gibt (optional begrenzt durch `budget_s`;
+        ein Durchlauf ueber die Tabelle findet immer statt).
+        Liefert die Anzahl beantworteter Anfragen.
+        """
+        if self._sock is None:
+            return 0
+        now = self.clock()
+        deadline = None if budget_s is None else now + budget_s
+        handled = 0
+        progress = True
+        while progress:
+            progress = self._accept(now)
+            for c in list(self._conns):
+                if c.state == _Conn.READING:
+                    r = self._read(c, now)
+                    if r:
+                        progress = True
+                    if r == 2:
+                        handled += 1
+                if c.state == _Conn.WRITING and self._write(c, now):
+                    progress = True
+            now = self.clock()
+            if deadline is not None and now >= deadline:
+                break
+        return handled
+
+    # ------------------------------------------------------------------
+
+    def _accept(self, now) -> bool:
+        accepted = False
+        while True:
+            # Tabelle voll: nur annehmen, wenn eine leerlaufende Keep-Alive-
+            # Verbindung geopfert werden kann (sonst warten neue Clients im Backlog)
+            idle = None
+            if len(self._conns) >= self.max_connections:
+                for c in self._conns:
+                    if (c.state == _Conn.READING and c.served and not c.buf
+                            and now - c.idle_since >= self.IDLE_EVICT_S):
+                        idle = c
+                        break
+                if idle is None:
+                    break
+            try:
+                sock, addr = self._sock.accept()
+            except OSError as e:
+                if not _would_block(e):
+                    self.stats["errors"] += 1
+                break
+            if idle is not None:
+                self._close(idle)
+            sock.setblocking(False)
+            self._conns.append(_Conn(sock, addr, now, self.read_timeout_s))
+            self.stats["accepted"] += 1
+            accepted = True
+        return accepted
+
+    def _close(self, c):
+        c.state = _Conn.CLOSED
+        try:
+            c.sock.close()
+        except Exception:
+            pass
+        if c in self._conns:
+            self._conns.remove(c)
+
+    def _read(self, c, now) -> int:
+        """0 = nichts passiert, 1 = Daten gelesen, 2 = Anfrage beantwortet."""
+        try:
+            n = c.sock.recv_into(self._chunk)
+        except OSError as e:
+            if _would_block(e):
+                if now >= c.deadline:
+                    self.stats["timeouts"] += 1
+                    self._close(c)
+                return 0
+            self.stats["errors"] += 1
+            self._close(c)
+            return 0
+        if n == 0:
+            self._close(c)
+            return 0
+        c.buf += bytes(self._chunk[:n])
+        return self._process(c, now)
+
+    def _process(self, c, now) -> int:
+        end = c.buf.find(b"\r\n\r\n")
+        if end < 0:
+            if len(c.buf) > self.MAX_REQUEST_BYTES:
+                self._respond_error(c, 413, now)
+                return 2
+            return 1
+
+        try:
+            head = c.buf[:end].decode("utf-8")
+        except UnicodeError:
+            # kaputter Header: nur diese Verbindung schliessen, nicht poll() abbrechen
+            self._respond_error(c, 400, now)
+            return 2
+        lines = head.split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            self._respond_error(c, 400, now)
+            return 2
+        headers = Headers()
+        for line in lines[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                headers[k.strip()] = v.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        if length < 0 or end + 4 + length > self.MAX_REQUEST_BYTES:
+            self._respond_error(c, 413 if length > 0 else 400, now)
+            return 2
+        if len(c.buf) < end + 4 + length:
+            return 1
+
+        body = c.buf[end + 4:end + 4 + length]
+        c.buf = c.buf[end + 4 + length:]
+
+        path, _, qs = target.partition("?")
+        query = {}
+        for part in qs.split("&") if qs else ():
+            k, _, v = part.partition("=")
+            query[_unquote(k)] = _unquote(v)
+
+        conn_hdr = (headers.get("connection") or "").lower()
+        if version == "HTTP/1.1":
+            c.keep_alive = conn_hdr != "close"
+        else:
+            c.keep_alive = conn_hdr == "keep-alive"
+        c.keep_alive = (self.keep_alive and c.keep_alive
+                        and c.served + 1 < self.MAX_REQUESTS_PER_CONN)
+
+        request = Request(method, path, query, headers, body, c.addr, version)
+        if self.limiter is not None and path in self._routes:
+            wait = self.limiter.check(c.addr[0] if c.addr else "", method + " " + path, now)
+            if wait:
+                retry = int(wait) + (1 if wait > int(wait) else 0)
+                resp = JSONResponse(request, {"error": "rate limited"}, status=429,
+                                    headers={"Retry-After": str(max(1, retry))})
+                self._start_response(c, resp, now)
+                return 2
+        self._start_response(c, self._dispatch(request), now)
+        return 2
+
+    def _dispatch(self, request) -> Response:
+        methods = self._routes.get(request.path)
+        if methods is None:
+            return JSONResponse(request, {"error": "not found"}, status=404)
+        handler = methods.get(request.method)
+        if handler is None:
+            return JSONResponse(request, {"error": "method not allowed"}, status=405)
+        try:
+            return handler(request)
+        except Exception as e:
+            self.stats["errors"] += 1
+            if self.debug:
+                print("HTTP-Handler-Fehler:", e)
+            return JSONResponse(request, {"error": "internal error"}, status=500)
+
+    def _respond_error(self, c, status, now):
+        c.keep_alive = False
+        c.buf = b""
+        self._start_response(c, JSONResponse(None, {"error": REASONS.get(status, "error")}, status=status), now)
+
+    def _encode(self, resp):
+        """(Body, Content-Encoding oder None, Vary setzen?) fuer die Antwort."""
+        body = resp.body
+        if (not self.compress_min or len(body) < self.compress_min or resp.request is None
+                or "Content-Encoding" in resp.headers or not _compressible(resp.content_type)):
+            return body, None, False
+        encoding = negotiate(resp.request.headers.get("accept-encoding"))
+        if encoding is None:
+            return body, None, True
+        try:
+            packed = compress(body, encoding)
+        except (OSError, MemoryError) as e:
+            if self.debug:
+                print("Kompression fehlgeschlagen:", e)
+            return body, None, True
+        if len(packed) >= len(body):
+            return body, None, True
+        self.compression["responses"] += 1
+        self.compression["bytes_in"] += len(body)
+        self.compression["bytes_out"] += len(packed)
+        return packed, encoding, True
+
+    def _start_response(self, c, resp, now):
+        self.stats["requests"] += 1
+        c.served += 1
+        body, encoding, vary = self._encode(resp)
+        lines = [
+            "HTTP/1.1 %d %s" % (resp.status, REASONS.get(resp.status, "")),
+            "Content-Type: " + resp.content_type,
+            "Content-Length: %d" % len(body),
+            "Connection: " + ("keep-alive" if c.keep_alive else "close"),
+        ]
+        if encoding:
+            lines.append("Content-Encoding: " + encoding)
+        if vary:
+            lines.append("Vary: Accept-Encoding")
+        for k, v in self.headers.items():
+            lines.append("%s: %s" % (k, v))
+        for k, v in resp.headers.items():
+            lines.append("%s: %s" % (k, v))
+        c.out = ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8") + body
+        c.sent = 0
+        c.state = _Conn.WRITING
+        c.deadline = now + self.write_timeout_s
+        self._write(c, now)
+
+    def _write(self, c, now) -> bool:
+        if c.state != _Conn.WRITING:
+            return False
+        try:
+            n = c.sock.send(memoryview(c.out)[c.sent:])
+        except OSError as e:
+            if _would_block(e):
+                if now >= c.deadline:
+                    self.stats["timeouts"] += 1
+                    self._close(c)
+                return False
+            self.stats["errors"] += 1
+            self._close(c)
+            return False
+        c.sent += n
+        if c.sent < len(c.out):
+            return n > 0
+        # Antwort komplett
+        c.out = None
+        if c.keep_alive:
+            c.state = _Conn.READING
+            c.deadline = now + self.read_timeout_s
+            c.idle_since = now
+            if c.buf:
+                # bereits empfangene (pipelined) Anfrage direkt bearbeiten
+                self._process(c, now)
+        else:
+            self._close(c)
+        return True
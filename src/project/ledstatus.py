@@ -0,0 +1,61 @@
+# ledstatus.py - nicht-blockierende LED-Blinkcodes fuer CircuitPython
+#
+# Die Onboard-LED zeigt den Geraetezustand als Blinkcode. Jede aktive
+# Bedingung hat ein Muster; angezeigt wird die mit der hoechsten Prioritaet.
+# update() wird aus der Hauptschleife aufgerufen und schaltet die LED nur,
+# wenn die naechste Deadline (time.monotonic) erreicht ist - kein sleep.
+
+import time
+
+# Muster: Dauern in ms, abwechselnd an/aus, beginnend mit "an".
+# None = dauerhaft an.
+PATTERNS = {
+    "wifi_down":      (100, 100),                                # schnelles Flackern
+    "mqtt_down":      (150, 150, 150, 1000),                     # 2x kurz, Pause
+    "sensor_error":   (150, 150, 150, 150, 150, 1000),           # 3x kurz, Pause
+    "backlog":        (600, 600),                                # langsames Blinken
+    "clock_unsynced": (1800, 200),                               # meist an, kurz aus
+    "ok":             None,                                      # dauerhaft an
+}
+
+# Hoechste Prioritaet zuerst; "ok" gilt, wenn nichts anderes aktiv ist
+PRIORITY = ("wifi_down", "mqtt_down", "sensor_error", "backlog", "clock_unsynced")
+
+
+class LedStatus:
+    def __init__(self, led, patterns=None, clock=time.monotonic):
+        self.led = led
+        self.patterns = patterns or PATTERNS
+        self.clock = clock
+        self.active = {}
+        self.current = None
+        self._step = 0
+        self._deadline = 0.0
+
+    def set(self, condition: str, active: bool = True):
+        self.active[condition] = bool(active)
+
+    def condition(self) -> str:
+        """Aktive Bedingung mit der hoechsten Prioritaet (sonst "ok")."""
+        for name in PRIORITY:
+            if self.active.get(name):
+                return name
+        return "ok"
+
+    def update(self, now=None):
+        now = self.clock() if now is None else now
+        cond = self.condition()
+        if cond != self.current:
+            # Musterwechsel: sofort von vorn beginnen
+            self.current = cond
+            self._step = 0
+            self._deadline = now
+        pattern = self.patterns.get(cond)
+        if pattern is None:
+            self.led.value = True
+            return
+        if now < self._deadline:
+            return
+        self.led.value = self._step % 2 == 0
+        self._deadline = now + pattern[self._step] / 1000.0
+        self._step = (self._step + 1) % len(pattern)
@@ -0,0 +1,121 @@
+# outbox.py - priorisierte Sende-Warteschlange fuer MQTT (CircuitPython)
+#
+# Nachrichten werden nicht mehr direkt im Mess-Zweig der Hauptschleife
+# publiziert, sondern hier eingereiht und pro Schleifendurchlauf mit einem
+# Zeitbudget abgearbeitet. Ein langsamer PUBACK blockiert damit nicht mehr
+# die Messung, und Status-Nachrichten ueberholen Telemetrie.
+
+import time
+
+# Prioritaetsklassen (kleiner = wichtiger)
+PRIO_STATUS = 0
+PRIO_REPLY = 1
+PRIO_TELEMETRY = 2
+
+CLASS_NAMES = ("status", "reply", "telemetry")
+
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_COALESCE = "coalesce"
+
+
+class Outbox:
+    """
+    Begrenzte Warteschlange je Prioritaetsklasse.
+
+    Ist eine Klasse voll, wird je nach `policy` die aelteste Nachricht
+    verworfen ("drop_oldest") oder eine bereits wartende Nachricht auf
+    demselben Topic durch die neue ersetzt ("coalesce"; faellt auf
+    drop_oldest zurueck, wenn kein passendes Topic wartet). Solange Platz
+    ist, wird nie etwas ersetzt oder verworfen.
+    """
+
+    def __init__(self, capacity=(4, 8, 32), policy: str = POLICY_DROP_OLDEST,
+                 max_inflight: int = 4):
+        if policy not in (POLICY_DROP_OLDEST, POLICY_COALESCE):
+            raise ValueError("unbekannte Queue-Policy: " + str(policy))
+        self.capacity = tuple(capacity)
+        self.policy = policy
+        # MiniMQTT wartet bei QoS1 im publish() selbst auf den PUBACK, jede
+        # QoS1-Nachricht kostet also einen Round-Trip. Pro drain() werden
+        # hoechstens so viele QoS1-Nachrichten ausgeliefert.
+        self.max_inflight = max_inflight
+        self.queues = [[] for _ in self.capacity]
+
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.max_depth = 0
+
+    def put(self, topic: str, payload: str, qos: int = 1, retain: bool = False,
+            prio: int = PRIO_TELEMETRY) -> bool:
+        q = self.queues[prio]
+        self.enqueued += 1
+
+        if len(q) >= self.capacity[prio]:
+            # coalesce: die aelteste Nachricht auf demselben Topic weicht der
+            # neuen (Reihenfolge der Messwerte bleibt erhalten)
+            same = -1
+            if self.policy == POLICY_COALESCE:
+                for i in range(len(q)):
+                    if q[i][0] == topic:
+                        same = i
+                        break
+            if same >= 0:
+                q.pop(same)
+                self.coalesced += 1
+            else:
+                q.pop(0)
+                self.dropped += 1
+
+        q.append((topic, payload, qos, retain))
+        depth = self.depth()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def drain(self, publish, budget_s: float = 0.25, clock=time.monotonic) -> int:
+        """
+        Sendet wartende Nachrichten, wichtigste Klasse zuerst, bis die Queue
+        leer, das Zeitbudget aufgebraucht oder das QoS1-Fenster voll ist.
+
+        `publish(topic, payload, qos, retain)` darf eine Exception werfen; die
+        Nachricht bleibt dann vorne in ihrer Klasse und die Exception wird
+        weitergereicht (Reconnect-Logik der Hauptschleife).
+        """
+        deadline = clock() + budget_s
+        inflight = 0
+        n = 0
+        for q in self.queues:
+            while q:
+                topic, payload, qos, retain = q[0]
+                if qos > 0 and inflight >= self.max_inflight:
+                    return n
+                try:
+                    publish(topic, payload, qos, retain)
+                except Exception:
+                    self.failed += 1
+                    raise
+                q.pop(0)
+                self.sent += 1
+                n += 1
+                if qos > 0:
+                    inflight += 1
+                if clock() >= deadline:
+                    return n
+        return n
+
+    def depth(self) -> int:
+        return sum(len(q) for q in self.queues)
+
+    def metrics(self) -> dict:
+        return {
+            "depth": {CLASS_NAMES[i]: len(q) for i, q in enumerate(self.queues)},
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+        }
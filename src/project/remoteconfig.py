@@ -0,0 +1,88 @@
+# remoteconfig.py - versionierte Konfiguration ueber retained MQTT-Topics (CircuitPython)
+#
+# Geraete abonnieren zusaetzlich zu {base}/{id}/cmd zwei retained Topics:
+#   {base}/_config       Gruppen-Konfiguration fuer alle Geraete eines Standorts
+#   {base}/{id}/config   Override fuer ein einzelnes Geraet (gewinnt gegen die Gruppe)
+# Nachricht: {"version": 7, "interval": 30}. Jede Quelle hat ihren eigenen
+# Versionszaehler; aeltere Versionen werden ignoriert. Weil die Topics retained
+# sind, bekommt auch ein Geraet, das beim Publish offline war, die aktuelle
+# Konfiguration beim naechsten Subscribe. Dieselbe Version kommt nach jedem
+# MQTT-Reconnect erneut an; sie wird nur beim ersten Mal seit dem Boot
+# angewendet, sonst wuerde jeder Reconnect lokale Aenderungen (POST /config,
+# cmd-Topic) zuruecksetzen. Quittiert wird ueber die angewendeten Versionen
+# in der Status-Nachricht.
+
+SOURCES = ("group", "device")   # spaetere Quelle ueberschreibt fruehere
+
+# Nachrichtenfeld -> (settings.toml-Schluessel, Minimum)
+KEYS = {
+    "interval": ("READING_INTERVAL_SECONDS", 3),   # DHT11 >= 3s
+}
+
+
+def validate(msg: dict) -> dict:
+    """Nur bekannte Felder, als int und >= Minimum; sonst ValueError."""
+    values = {}
+    for key, value in msg.items():
+        if key == "version":
+            continue
+        if key not in KEYS:
+            raise ValueError("unbekanntes Feld: " + key)
+        minimum = KEYS[key][1]
+        value = int(value)
+        if value < minimum:
+            raise ValueError("%s < %d" % (key, minimum))
+        values[key] = value
+    return values
+
+
+class ConfigSync:
+    def __init__(self, versions=None):
+        self.versions = {"group": 0, "device": 0}
+        if versions:
+            self.versions.update(versions)
+        self.values = {"group": {}, "device": {}}
+        self.seen = set()       # Quellen, die seit dem Boot schon geliefert haben
+        self.redelivered = 0
+        self.stale = 0
+        self.rejected = 0
+
+    def offer(self, source: str, msg):
+        """
+        Neue Nachricht einer Quelle. Liefert (effektive Konfiguration, neuer?)
+        oder None, wenn nichts anzuwenden ist: die Version ist aelter als die
+        bereits angewendete, oder dieselbe Version kommt seit dem Boot erneut.
+        `msg` None/leer = retained Nachricht geloescht -> Quelle entfaellt.
+        ValueError bei ungueltigem Inhalt.
+        """
+        if not msg:
+            if not self.values[source]:
+                return None
+            self.values[source] = {}
+            return self.effective(), False
+        try:
+            version = int(msg["version"])
+            values = validate(msg)
+        except (KeyError, TypeError, ValueError) as e:
+            self.rejected += 1
+            raise ValueError("ungueltige Konfiguration: " + str(e))
+        if version < self.versions[source]:
+            self.stale += 1
+            return None
+        newer = version > self.versions[source]
+        if not newer and source in self.seen:
+            self.redelivered += 1
+            return None
+        self.seen.add(source)
+        self.versions[source] = version
+        self.values[source] = values
+        return self.effective(), newer
+
+    def effective(self) -> dict:
+        out = {}
+        for source in SOURCES:
+            out.update(self.values[source])
+        return out
+
+    def status(self) -> dict:
+        return {"group": self.versions["group"], "device": self.versions["device"]}
@@ -0,0 +1,12 @@
+import os
+import sys
+
+# Geraete-Module (code.py-Nachbarn) und der generierte Client liegen nicht in
+# einem installierten Paket; fuer die Tests hinten an den Suchpfad haengen
+# (hinten, damit code.py nicht das stdlib-Modul `code` verdeckt).
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT = os.path.dirname(HERE)
+
+for path in (PROJECT, os.path.join(PROJECT, "generated", "swagger-python-client")):
+    if path not in sys.path:
+        sys.path.append(path)
@@ -0,0 +1,55 @@
+import math
+
+from aggregator import History, RunningStats, WindowAggregator
+
+
+def test_running_stats_matches_two_pass():
+    values = [21.0, 22.5, 19.0, 23.25, 20.0]
+    st = RunningStats()
+    for v in values:
+        st.add(v)
+
+    mean = sum(values) / len(values)
+    var = sum((v - mean) ** 2 for v in values) / len(values)
+    assert st.count == 5
+    assert st.min == 19.0 and st.max == 23.25
+    assert math.isclose(st.mean, mean)
+    assert math.isclose(st.stddev(), math.sqrt(var))
+
+
+def test_window_emits_one_summary_per_window():
+    agg = WindowAggregator(60)
+    summaries = []
+    for i in range(13):  # alle 10 s, 0..120 s
+        s = agg.add({"temperature": 20.0 + i, "humidity": 50.0}, now=i * 10.0)
+        if s:
+            summaries.append(s)
+
+    assert len(summaries) == 2
+    first, second = summaries
+    assert first["count"] == 7          # 0..60 s inkl. Grenze
+    assert first["temperature"]["min"] == 20.0
+    assert first["temperature"]["max"] == 26.0
+    assert first["temperature"]["mean"] == 23.0
+    assert first["humidity"]["stddev"] == 0.0
+    assert second["count"] == 6         # 70..120 s, festes Raster
+    assert second["temperature"]["min"] == 27.0
+
+
+def test_window_realigns_after_long_gap():
+    agg = WindowAggregator(60)
+    agg.add({"temperature": 1.0, "humidity": 1.0}, now=0.0)
+    s = agg.add({"temperature": 2.0, "humidity": 1.0}, now=500.0)
+    assert s["count"] == 2
+    assert agg.window_end == 560.0
+    assert agg.flush(now=501.0) is None
+
+
+def test_history_ring_buffer_keeps_newest():
+    h = History(3)
+    for i in range(5):
+        h.append({"i": i})
+    assert len(h) == 3
+    assert [x["i"] for x in h.items()] == [2, 3, 4]
+    assert [x["i"] for x in h.items(limit=2)] == [3, 4]
+    assert History(0).items() == []
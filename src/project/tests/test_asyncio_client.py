@@ -0,0 +1,162 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from httpd import GET, POST, JSONResponse, Response, Server
+from swagger_client import AsyncApiClient, Configuration, DefaultApi, StatusResponse
+from swagger_client.rest import ApiException
+
+STATUS = {
+    "device_id": "sensor-a", "timestamp": "2026-01-19T10:00:00Z", "uptime_s": 12,
+    "wifi": {"connected": True, "ip": "127.0.0.1"},
+    "mqtt": {"connected": True, "port": 1883, "base_topic": "iiot/x"},
+    "config": {"interval_s": 10},
+    "last_sensor": {"temperature": 21.5, "humidity": 40.0, "timestamp": "2026-01-19T10:00:00Z"},
+    "last_published": {"temperature": 21.5, "humidity": 40.0, "timestamp": "2026-01-19T10:00:00Z"},
+}
+HISTORY = [{"temperature": 20.0 + i % 5, "humidity": 40.0, "timestamp": "2026-01-19T10:00:00Z"}
+           for i in range(80)]
+
+
+@pytest.fixture
+def device():
+    srv = Server(socket, max_connections=4, read_timeout_s=0.5)
+
+    @srv.route("/", GET)
+    def root(request):
+        return Response(request, "OK")
+
+    @srv.route("/status", GET)
+    def status(request):
+        return JSONResponse(request, STATUS)
+
+    @srv.route("/history", GET)
+    def history(request):
+        return JSONResponse(request, HISTORY[:int(request.query_params.get("limit", 80))])
+
+    @srv.route("/config", POST)
+    def config(request):
+        if request.headers.get("x-api-key") != "geheim":
+            return JSONResponse(request, {"error": "unauthorized"}, status=401)
+        body = request.json()
+        return JSONResponse(request, {"ok": True, "interval": body["interval"], "persisted": True,
+                                      "timestamp": "2026-01-19T10:00:00Z"})
+
+    srv.start("127.0.0.1", 0)
+    stop = threading.Event()
+
+    def _run():
+        while not stop.is_set():
+            srv.poll()
+            time.sleep(0.002)
+
+    t = threading.Thread(target=_run, daemon=True)
+    t.start()
+    yield srv
+    stop.set()
+    t.join()
+    srv.stop()
+
+
+def _client(srv, api_key=None):
+    cfg = Configuration()
+    cfg.host = "http://127.0.0.1:%d" % srv.port
+    if api_key:
+        cfg.api_key["x-api-key"] = api_key
+    return AsyncApiClient(cfg)
+
+
+def test_default_api_methods_are_awaitable(device):
+    async def run():
+        async with _client(device, api_key="geheim") as client:
+            api = DefaultApi(client)
+            assert await api.root_get() == "OK"
+            status = await api.status_get()
+            assert isinstance(status, StatusResponse)
+            assert status.device_id == "sensor-a" and status.last_sensor.temperature == 21.5
+            # gzip-komprimierte Antwort (> 1 KB) transparent dekodiert
+            history = await api.history_get(limit=80)
+            assert len(history) == 80 and history[3].temperature == 23.0
+            data, code, headers = await api.status_get_with_http_info()
+            assert code == 200 and headers["Content-Type"] == "application/json"
+            resp = await api.config_post({"interval": 30})
+            assert resp.ok and resp.interval == 30
+            assert client.last_response.getheader("Connection") == "keep-alive"
+
+    asyncio.run(run())
+    # alle Anfragen ueber eine Keep-Alive-Verbindung
+    assert device.stats["accepted"] == 1
+    assert device.compression["responses"] == 1
+
+
+def test_no_sync_pool_manager_per_client():
+    # Scraper/Rollout bauen einen Client je Geraet: kein urllib3-PoolManager dafuer
+    client = AsyncApiClient(Configuration(), transport=object())
+    assert client.rest_client is None
+
+
+def test_errors_and_concurrency(device):
+    async def run():
+        async with _client(device) as client:
+            api = DefaultApi(client)
+            with pytest.raises(ApiException) as e:
+                await api.config_post({"interval": 30})
+            assert e.value.status == 401
+            results = await asyncio.gather(*(api.status_get() for _ in range(20)))
+            assert all(r.device_id == "sensor-a" for r in results)
+
+    asyncio.run(run())
+
+
+def test_stale_keep_alive_connection_is_replaced(device):
+    async def run():
+        async with _client(device) as client:
+            api = DefaultApi(client)
+            await api.root_get()
+            await asyncio.sleep(0.8)       # Server schliesst die Leerlauf-Verbindung
+            assert await api.root_get() == "OK"
+
+    asyncio.run(run())
+    assert device.stats["accepted"] == 2
+
+
+def test_timeout_on_unresponsive_device():
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen(1)                       # nimmt an, antwortet nie
+    cfg = Configuration()
+    cfg.host = "http://127.0.0.1:%d" % silent.getsockname()[1]
+
+    async def run():
+        async with AsyncApiClient(cfg) as client:
+            with pytest.raises(asyncio.TimeoutError):
+                await DefaultApi(client).status_get(_request_timeout=0.2)
+
+    try:
+        asyncio.run(run())
+    finally:
+        silent.close()
+
+
+def test_configured_timeouts_apply_without_request_timeout():
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen(1)
+    cfg = Configuration()
+    cfg.host = "http://127.0.0.1:%d" % silent.getsockname()[1]
+    cfg.read_timeout = 0.2                 # wie rest.py: Standard aus der Configuration
+
+    async def run():
+        async with AsyncApiClient(cfg) as client:
+            t0 = time.perf_counter()
+            with pytest.raises(asyncio.TimeoutError):
+                await DefaultApi(client).status_get()
+            assert time.perf_counter() - t0 < 2.0
+
+    try:
+        asyncio.run(run())
+    finally:
+        silent.close()
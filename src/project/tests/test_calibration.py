@@ -0,0 +1,29 @@
+import pytest
+
+from calibration import Calibration, apply_chain, parse_chain
+
+
+def test_chain_applied_in_order():
+    chain = parse_chain("offset:-0.5; gain:1.02; clamp:-40,80; round:1")
+    assert apply_chain(chain, 21.5) == 21.4
+    assert apply_chain(chain, 120.0) == 80.0
+
+
+def test_poly_uses_ascending_coefficients():
+    chain = parse_chain("poly:1,2,0.5")
+    assert apply_chain(chain, 2.0) == 1 + 2 * 2 + 0.5 * 4
+
+
+@pytest.mark.parametrize("spec", ["scale:2", "offset", "offset:1,2", "clamp:5,1", "round:-1", "gain:x"])
+def test_invalid_specs_rejected(spec):
+    with pytest.raises(ValueError):
+        parse_chain(spec)
+
+
+def test_calibration_from_settings_and_metadata():
+    cal = Calibration.from_settings({"CAL_TEMPERATURE": "offset:-1", "CAL_HUMIDITY": "bogus:1"})
+    assert cal.apply({"temperature": 20.0, "humidity": 40.0}) == {"temperature": 19.0, "humidity": 40.0}
+    meta = cal.metadata()
+    assert meta["temperature"] == "offset:-1.0"
+    assert "error" in meta["humidity"]
+    assert Calibration.from_settings({}).metadata() == {}
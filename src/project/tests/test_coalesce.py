@@ -0,0 +1,106 @@
+import socket
+import time
+
+import pytest
+
+from coalesce import EAGAIN, ETIMEDOUT, CoalescingSocket
+
+
+class RecordingSocket:
+    def __init__(self, reply=b""):
+        self.writes = []
+        self.reply = reply
+
+    def send(self, data):
+        self.writes.append(bytes(data))
+        return len(data)
+
+    def recv(self, n):
+        return self.reply[:n]
+
+    def recv_into(self, buf, n=0):
+        buf[:len(self.reply)] = self.reply
+        return len(self.reply)
+
+    def close(self):
+        self.closed = True
+
+
+def test_sends_coalesced_until_flush():
+    raw = RecordingSocket()
+    s = CoalescingSocket(raw)
+    data = bytearray(b"topicpayload")
+    assert s.send(b"\x30\x0c") == 2
+    assert s.send(memoryview(data)[:5]) == 5
+    data[:5] = b"XXXXX"          # MiniMQTT darf seinen Puffer danach wiederverwenden
+    s.send(b"payload")
+    assert raw.writes == []
+    s.flush()
+    assert raw.writes == [b"\x30\x0ctopicpayload"]
+    assert s.stats == {"sends": 3, "writes": 1, "bytes": 14}
+
+
+def test_read_flushes_pending_request_first():
+    raw = RecordingSocket(reply=b"\x40\x02\x00\x01")
+    s = CoalescingSocket(raw)
+    s.send(b"publish-qos1")
+    buf = bytearray(4)
+    assert s.recv_into(buf, 4) == 4
+    assert raw.writes == [b"publish-qos1"]
+
+
+def test_max_buffer_and_close_flush():
+    raw = RecordingSocket()
+    s = CoalescingSocket(raw, max_buffer=8)
+    s.send(b"12345")
+    s.send(b"6789")
+    assert raw.writes == [b"123456789"]
+    s.send(b"x")
+    s.close()
+    assert raw.writes[-1] == b"x" and raw.closed
+
+
+def test_partial_sends_over_real_socket():
+    a, b = socket.socketpair()
+    try:
+        s = CoalescingSocket(a)
+        for i in range(100):
+            s.send(b"%03d" % i)
+        s.flush()
+        got = b""
+        while len(got) < 300:
+            got += b.recv(1024)
+        assert got == b"".join(b"%03d" % i for i in range(100))
+    finally:
+        a.close()
+        b.close()
+
+
+class StuckSocket(RecordingSocket):
+    """Nimmt `accept` Bytes an, danach nur noch EAGAIN."""
+
+    def __init__(self, accept):
+        super().__init__()
+        self.accept = accept
+
+    def send(self, data):
+        if not self.accept:
+            raise OSError(EAGAIN, "EAGAIN")
+        n = min(self.accept, len(data))
+        self.accept -= n
+        self.writes.append(bytes(data[:n]))
+        return n
+
+
+def test_flush_gives_up_on_eagain_and_keeps_the_rest():
+    raw = StuckSocket(accept=4)
+    s = CoalescingSocket(raw, flush_timeout_s=0.05)
+    s.send(b"12345678")
+    t0 = time.monotonic()
+    with pytest.raises(OSError) as e:
+        s.flush()
+    assert e.value.args[0] == ETIMEDOUT and time.monotonic() - t0 < 1.0
+    assert raw.writes == [b"1234"] and s.pending() == 4
+    raw.accept = 100                 # Socket wieder schreibbar: Rest geht raus
+    s.flush()
+    assert raw.writes[-1] == b"5678" and s.pending() == 0
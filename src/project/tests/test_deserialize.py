@@ -0,0 +1,167 @@
+import datetime
+import json
+import math
+import threading
+import time
+
+import pytest
+
+from swagger_client import ApiClient, Configuration, DefaultApi, ReadingSnapshot, StatusResponse
+from swagger_client.columnar import Columns
+from swagger_client.rest import ApiException
+
+READING = {"temperature": 21.5, "humidity": 40.0, "timestamp": "2026-01-19T10:00:00Z"}
+STATUS = {
+    "device_id": "sensor-a", "timestamp": "2026-01-19T10:00:05Z", "uptime_s": 12,
+    "wifi": {"connected": True, "ip": "127.0.0.1"},
+    "mqtt": {"connected": False, "port": 1883, "base_topic": "iiot/x"},
+    "config": {"interval_s": 10},
+    "last_sensor": READING, "last_published": READING,
+}
+
+
+class _Resp:
+    def __init__(self, data):
+        self.data = json.dumps(data)
+
+
+def test_nested_models_and_containers():
+    client = ApiClient()
+    status = client.deserialize(_Resp(STATUS), "StatusResponse")
+    assert isinstance(status, StatusResponse)
+    assert status.mqtt.connected is False and status.config.interval_s == 10
+    assert status.last_sensor.timestamp == datetime.datetime(2026, 1, 19, 10, 0, tzinfo=datetime.timezone.utc)
+
+    history = client.deserialize(_Resp([READING, READING]), "list[ReadingSnapshot]")
+    assert [type(r) for r in history] == [ReadingSnapshot, ReadingSnapshot]
+    by_id = client.deserialize(_Resp({"a": READING}), "dict(str, ReadingSnapshot)")
+    assert by_id["a"].humidity == 40.0
+    assert client.deserialize(_Resp({"a": 1, "b": None}), "dict(str, int)") == {"a": 1, "b": None}
+    assert client.deserialize(_Resp(None), "list[ReadingSnapshot]") is None
+
+
+def test_plans_are_compiled_once_and_shared():
+    ApiClient().deserialize(_Resp([READING]), "list[ReadingSnapshot]")
+    plans = ApiClient._deserializer_plans
+    plan = plans["list[ReadingSnapshot]"]
+    assert plans["ReadingSnapshot"] is plans[ReadingSnapshot]
+    # ein weiterer Client nutzt denselben Plan, ohne ihn neu zu bauen
+    ApiClient().deserialize(_Resp([READING]), "list[ReadingSnapshot]")
+    assert plans["list[ReadingSnapshot]"] is plan
+
+
+def test_models_share_a_read_only_configuration():
+    a = ReadingSnapshot(humidity=40.0, temperature=21.5, timestamp="x")
+    b = ApiClient().deserialize(_Resp(READING), "ReadingSnapshot")
+    assert a._configuration is b._configuration is Configuration.shared()
+    assert not hasattr(a, "__dict__")
+    with pytest.raises(AttributeError):
+        Configuration.shared().client_side_validation = False
+
+    # eigene Konfiguration weiterhin moeglich, z.B. ohne Validierung
+    cfg = Configuration()
+    cfg.client_side_validation = False
+    assert ReadingSnapshot(_configuration=cfg).humidity is None
+    with pytest.raises(ValueError):
+        ReadingSnapshot()
+
+    # set_default wirkt auch auf die gemeinsame Modell-Konfiguration
+    try:
+        Configuration.set_default(cfg)
+        assert ReadingSnapshot().humidity is None
+    finally:
+        Configuration.set_default(None)
+    assert Configuration.shared().client_side_validation is True
+
+
+UTC = datetime.timezone.utc
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2026-01-19T10:00:05Z", datetime.datetime(2026, 1, 19, 10, 0, 5, tzinfo=UTC)),
+    ("2026-01-19t10:00:05z", datetime.datetime(2026, 1, 19, 10, 0, 5, tzinfo=UTC)),
+    ("2026-01-19 10:00:05Z", datetime.datetime(2026, 1, 19, 10, 0, 5, tzinfo=UTC)),
+    ("2026-01-19T10:00:05.250Z", datetime.datetime(2026, 1, 19, 10, 0, 5, 250000, tzinfo=UTC)),
+    ("2026-01-19T11:00:05+01:00", datetime.datetime(2026, 1, 19, 10, 0, 5, tzinfo=UTC)),
+    ("2026-01-19T10:00:05", datetime.datetime(2026, 1, 19, 10, 0, 5)),
+    # kein RFC 3339 -> dateutil
+    ("19 Jan 2026 10:00:05 UTC", datetime.datetime(2026, 1, 19, 10, 0, 5, tzinfo=UTC)),
+    ("20260119T100005Z", datetime.datetime(2026, 1, 19, 10, 0, 5, tzinfo=UTC)),
+])
+def test_timestamp_formats(text, expected):
+    value = ApiClient().deserialize(_Resp(dict(READING, timestamp=text)), "ReadingSnapshot").timestamp
+    assert value == expected
+    assert (value.utcoffset() is None) == (expected.utcoffset() is None)
+
+
+def test_dates_and_invalid_timestamps():
+    client = ApiClient()
+    assert client.deserialize(_Resp("2026-01-19"), "date") == datetime.date(2026, 1, 19)
+    assert client.deserialize(_Resp("19 Jan 2026"), "date") == datetime.date(2026, 1, 19)
+    for bad in ("2026-13-19T10:00:05Z", "gestern"):
+        with pytest.raises(ApiException):
+            client.deserialize(_Resp(bad), "datetime")
+
+
+class _CannedClient(ApiClient):
+    """Beantwortet jeden Aufruf mit `payload` ueber den normalen Deserialisierer."""
+
+    def __init__(self, payload):
+        super().__init__()
+        self.payload = payload
+
+    def call_api(self, resource_path, method, *args, response_type=None, **kwargs):
+        return self.deserialize(_Resp(self.payload), response_type)
+
+
+def test_columnar_history():
+    rows = [dict(READING, temperature=20.0 + i, timestamp="2026-01-19T10:00:%02dZ" % i) for i in range(3)]
+    rows.append({"temperature": 23.0, "humidity": None, "timestamp": "2026-01-19T11:00:03+01:00"})
+    cols = DefaultApi(_CannedClient(rows)).history_get(_columnar=True, limit=4)
+    assert isinstance(cols, Columns) and len(cols) == 4
+    assert sorted(cols) == ["humidity", "temperature", "timestamp"]
+    t0 = int(datetime.datetime(2026, 1, 19, 10, tzinfo=UTC).timestamp())
+    assert list(cols.timestamp) == [t0, t0 + 1, t0 + 2, t0 + 3]
+    assert list(cols["temperature"]) == [20.0, 21.0, 22.0, 23.0]
+    assert math.isnan(cols.humidity[3]) and cols.humidity[0] == 40.0
+    # float32 / int64: 4 + 4 + 8 Byte je Zeile
+    assert cols.nbytes == 4 * 16
+    # ohne Flag weiterhin Modelle
+    assert isinstance(DefaultApi(_CannedClient(rows[:1])).history_get()[0], ReadingSnapshot)
+
+
+def test_columnar_rejects_bad_rows():
+    client = ApiClient()
+    for rows in ([dict(READING, timestamp=None)], [dict(READING, temperature="warm")],
+                 [dict(READING, timestamp="gestern")]):
+        with pytest.raises(ApiException):
+            client.deserialize(_Resp(rows), "columns[ReadingSnapshot]")
+    assert client.deserialize(_Resp(None), "columns[ReadingSnapshot]") is None
+
+
+def test_concurrent_compile_never_sees_half_built_plans(monkeypatch):
+    from swagger_client import StatusResponseConfig
+
+    class SlowMap(dict):
+        def __getitem__(self, key):
+            time.sleep(0.05)
+            return dict.__getitem__(self, key)
+
+    monkeypatch.setattr(ApiClient, "_deserializer_plans", {})
+    monkeypatch.setattr(StatusResponseConfig, "attribute_map", SlowMap(StatusResponseConfig.attribute_map))
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(ApiClient().deserialize(_Resp(STATUS), "StatusResponse"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    threads[0].start()
+    time.sleep(0.02)              # zweiter Thread startet mitten im Kompilieren
+    threads[1].start()
+    for t in threads:
+        t.join()
+    assert errors == [] and [r.config.interval_s for r in results] == [10, 10]
+    assert getattr(ApiClient._compiling, "plans", None) is None
@@ -0,0 +1,123 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from announce import Announcer
+import fleet.discovery
+from fleet.discovery import DeviceIndex, Listener, make_api, resolve
+
+INFO = {"device_id": "sensor-a", "ip": "127.0.0.1", "port": 8080, "base_topic": "iiot/x"}
+
+
+def _free_udp_port():
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def test_announce_and_query_over_loopback():
+    index = DeviceIndex()
+    with Listener(index, port=0, host="127.0.0.1") as listener:
+        dev = Announcer(socket, INFO, interval_s=60, listen_port=_free_udp_port(),
+                        announce_port=listener.port, broadcast_addr="127.0.0.1")
+        dev.start("127.0.0.1")
+        try:
+            dev.poll()                       # erstes Announcement sofort
+            assert listener.poll(1.0) == 1
+            assert index.endpoint("sensor-a") == "http://127.0.0.1:8080"
+            assert index.get("sensor-a")["expires"] - index.get("sensor-a")["seen"] == 180
+
+            stop = threading.Event()
+
+            def device_loop():
+                while not stop.is_set():
+                    dev.poll()
+                    time.sleep(0.005)
+
+            t = threading.Thread(target=device_loop, daemon=True)
+            t.start()
+            assert listener.query("127.0.0.1", dev.listen_port, device_id="sensor-a", wait_s=0.5) == 1
+            assert listener.query("127.0.0.1", dev.listen_port, device_id="other", wait_s=0.3) == 0
+            stop.set()
+            t.join()
+            assert dev.stats["queries"] == 1 and dev.stats["announced"] == 1
+        finally:
+            dev.stop()
+
+
+def test_ttl_expiry_and_cache_roundtrip(tmp_path):
+    t = [1000.0]
+    cache = str(tmp_path / "devices.json")
+    index = DeviceIndex(default_ttl_s=60, cache_path=cache, clock=lambda: t[0])
+    index.update(INFO)
+    index.update({"device_id": "sensor-b", "ttl": 10}, addr=("10.0.0.7", 5354))
+    index.save()
+
+    again = DeviceIndex(cache_path=cache, clock=lambda: t[0])
+    assert [r["device_id"] for r in again.devices()] == ["sensor-a", "sensor-b"]
+    assert again.endpoint("sensor-b") == "http://10.0.0.7:8080"
+
+    t[0] += 30
+    assert again.get("sensor-b") is None
+    with pytest.raises(KeyError):
+        again.endpoint("sensor-b")
+    assert again.prune() == 1 and len(again) == 1
+
+
+def test_ingest_retained_status():
+    index = DeviceIndex()
+    payload = json.dumps({"device_id": "sensor-c", "status": "ok", "ip": "10.0.0.9", "http_port": 8080})
+    rec = index.ingest_status("iiot/x/sensor-c/status", payload)
+    assert rec["source"] == "mqtt" and rec["base_topic"] == "iiot/x"
+    assert index.ingest_status("iiot/x/sensor-d/status", '{"status": "offline"}') is None
+
+
+def test_make_api_addresses_device_by_id():
+    index = DeviceIndex()
+    index.update(INFO)
+    api = make_api("sensor-a", index, api_key="k")
+    assert api.api_client.configuration.host == "http://127.0.0.1:8080"
+    assert api.api_client.default_headers["x-api-key"] == "k"
+
+
+def test_make_api_keeps_shared_configuration():
+    from swagger_client import Configuration
+
+    index = DeviceIndex()
+    index.update(INFO)
+    index.update(dict(INFO, device_id="sensor-b", port=8081))
+    shared = Configuration()
+    a = make_api("sensor-a", index, configuration=shared)
+    b = make_api("sensor-b", index, configuration=shared)
+    assert a.api_client.configuration.host == "http://127.0.0.1:8080"
+    assert b.api_client.configuration.host == "http://127.0.0.1:8081"
+    assert shared.host == Configuration().host
+
+
+def test_resolve_uses_fresh_cache_without_query(tmp_path, monkeypatch):
+    queries = []
+
+    class CountingListener(Listener):
+        def query(self, *args, **kw):
+            queries.append(kw.get("device_id"))
+            return 0
+
+    monkeypatch.setattr(fleet.discovery, "Listener", CountingListener)
+    t = [1000.0]
+    cache = str(tmp_path / "devices.json")
+    index = DeviceIndex(default_ttl_s=60, cache_path=cache, clock=lambda: t[0])
+    index.update(INFO)
+    index.save()
+
+    again = DeviceIndex(cache_path=cache, clock=lambda: t[0])
+    assert resolve("sensor-a", index=again) == "http://127.0.0.1:8080"
+    assert queries == []
+    t[0] += 120                          # abgelaufen: jetzt wird gezielt gefragt
+    with pytest.raises(KeyError):
+        resolve("sensor-a", index=again, wait_s=0.01)
+    assert queries == ["sensor-a"]
@@ -0,0 +1,38 @@
+from dutycycle import HEADER_SIZE, SAMPLE_SIZE, EnergyModel, SampleBuffer
+
+
+def test_buffer_survives_reinit_like_deep_sleep():
+    mem = bytearray(256)
+    buf = SampleBuffer(mem)
+    buf.append(1700000000, 21.5, 40.0)
+    buf.append(1700000030, -3.2, 55.5)
+    buf.add_time(awake_ms=1200, sleep_ms=28800)
+    buf.clock = 1700000060
+
+    # nach dem Aufwachen: neues Objekt auf demselben Speicher
+    buf = SampleBuffer(mem)
+    assert buf.samples() == [(1700000000, 21.5, 40.0), (1700000030, -3.2, 55.5)]
+    assert buf.times_ms() == (1200, 28800, 0)
+    assert buf.clock == 1700000060
+
+    buf.reset()
+    assert len(buf) == 0 and buf.times_ms() == (0, 0, 0)
+    assert buf.clock == 1700000060
+
+
+def test_full_buffer_drops_oldest():
+    mem = bytearray(HEADER_SIZE + 3 * SAMPLE_SIZE)
+    buf = SampleBuffer(mem)
+    assert buf.capacity == 3
+    for i in range(5):
+        buf.append(i, 20.0 + i, 50.0)
+    assert [s[0] for s in buf.samples()] == [2, 3, 4]
+
+
+def test_energy_report():
+    m = EnergyModel(active_ma=20, wifi_ma=60, sleep_ma=1, voltage=3.0)
+    r = m.report(10, awake_ms=10000, sleep_ms=286000, upload_ms=4000, battery_mah=1000)
+    # (10*20 + 286*1 + 4*60) mAs * 3 V / 10 Messungen
+    assert r["mj_per_sample"] == round((200 + 286 + 240) * 3.0 / 10, 2)
+    assert r["avg_ma"] == round(726 / 300, 3)
+    assert r["battery_days"] == round(1000 / r["avg_ma"] / 24, 1)
@@ -0,0 +1,55 @@
+from health import Breadcrumbs, LoopHealth, boot_report, MAX_CRUMBS
+
+
+class FakeWatchdog:
+    def __init__(self):
+        self.fed = 0
+
+    def feed(self):
+        self.fed += 1
+
+
+def test_feeds_only_while_all_stages_progress():
+    t = [0.0]
+    h = LoopHealth({"sample": 60, "mqtt": 120, "http": 10}, clock=lambda: t[0])
+    wd = FakeWatchdog()
+    crumbs = Breadcrumbs(bytearray(256), clock=lambda: t[0])
+
+    t[0] = 9.0
+    assert h.feed(wd, crumbs) and wd.fed == 1
+
+    t[0] = 11.0                      # http ohne Fortschritt seit 11 s
+    h.progress("mqtt")
+    h.progress("sample")
+    assert not h.feed(wd, crumbs) and wd.fed == 1
+    assert h.stalled() == ["http"]
+    assert crumbs.load() == [{"kind": "stall", "uptime_s": 11, "stage": "http", "detail": {"http": 11}}]
+
+    h.feed(wd, crumbs)               # Stall nur einmal festhalten
+    assert len(crumbs.load()) == 1
+
+    h.progress("http")
+    assert h.feed(wd, crumbs) and wd.fed == 2
+
+
+def test_breadcrumbs_ring_and_clear():
+    nvm = bytearray(128)
+    crumbs = Breadcrumbs(nvm, size=128, clock=lambda: 5)
+    assert crumbs.load() == []
+    for i in range(MAX_CRUMBS + 2):
+        crumbs.record("crash", stage="mqtt", detail="OSError(%d)" % i)
+    loaded = crumbs.load()
+    assert 1 <= len(loaded) <= MAX_CRUMBS
+    assert loaded[-1]["detail"] == "OSError(%d)" % (MAX_CRUMBS + 1)
+    crumbs.clear()
+    assert crumbs.load() == []
+
+
+def test_boot_report_tells_stall_crash_and_hang_apart():
+    stall = [{"kind": "stall", "stage": "mqtt"}]
+    crash = [{"kind": "crash", "stage": "http"}]
+    assert boot_report("microcontroller.ResetReason.WATCHDOG", stall)["cause"] == "stall"
+    assert boot_report("microcontroller.ResetReason.WATCHDOG", [])["cause"] == "hang"
+    assert boot_report("microcontroller.ResetReason.SOFTWARE", crash)["cause"] == "crash"
+    r = boot_report("microcontroller.ResetReason.POWER_ON", [])
+    assert r == {"reason": "POWER_ON", "cause": "normal", "breadcrumbs": []}
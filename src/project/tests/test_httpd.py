@@ -0,0 +1,269 @@
+import gzip
+import http.client
+import json
+import socket
+import threading
+import time
+import zlib
+
+import pytest
+
+from httpd import GET, POST, JSONResponse, RateLimiter, Response, Server, TokenBucket, negotiate
+
+BIG = [{"temperature": 21.5 + i % 7, "humidity": 40.0, "timestamp": "2026-01-19T10:%02d:00Z" % (i % 60)}
+       for i in range(100)]
+
+
+@pytest.fixture
+def server():
+    srv = Server(socket, max_connections=4, read_timeout_s=0.5)
+
+    @srv.route("/", GET)
+    def root(request):
+        return Response(request, "OK")
+
+    @srv.route("/echo", POST)
+    def echo(request):
+        return JSONResponse(request, {"body": request.json(), "q": request.query_params})
+
+    @srv.route("/big", GET)
+    def big(request):
+        return JSONResponse(request, BIG)
+
+    @srv.route("/fail", GET)
+    def fail(request):
+        raise RuntimeError("kaputt")
+
+    srv.start("127.0.0.1", 0)
+    stop = threading.Event()
+
+    def _run():
+        while not stop.is_set():
+            srv.poll()
+            time.sleep(0.005)
+
+    t = threading.Thread(target=_run, daemon=True)
+    t.start()
+    yield srv
+    stop.set()
+    t.join()
+    srv.stop()
+
+
+def _conn(srv):
+    return http.client.HTTPConnection("127.0.0.1", srv.port, timeout=5)
+
+
+def test_routes_and_errors(server):
+    c = _conn(server)
+    c.request("GET", "/")
+    r = c.getresponse()
+    assert r.status == 200 and r.read() == b"OK"
+
+    c.request("GET", "/nope")
+    r = c.getresponse()
+    assert r.status == 404
+    r.read()
+
+    c.request("GET", "/echo")
+    r = c.getresponse()
+    assert r.status == 405
+    r.read()
+
+    c.request("GET", "/fail")
+    r = c.getresponse()
+    assert r.status == 500
+    r.read()
+
+
+def test_post_json_and_query_params(server):
+    c = _conn(server)
+    c.request("POST", "/echo?name=a%20b&x=1+2", body=b'{"interval": 7}',
+              headers={"Content-Type": "application/json"})
+    r = c.getresponse()
+    import json
+    data = json.loads(r.read())
+    assert data == {"body": {"interval": 7}, "q": {"name": "a b", "x": "1 2"}}
+
+
+def test_keep_alive_reuses_connection(server):
+    c = _conn(server)
+    for _ in range(5):
+        c.request("GET", "/")
+        r = c.getresponse()
+        assert r.getheader("Connection") == "keep-alive"
+        r.read()
+    assert server.stats["accepted"] == 1
+    assert server.stats["requests"] == 5
+
+
+def test_connection_close_is_honoured(server):
+    c = _conn(server)
+    c.request("GET", "/", headers={"Connection": "close"})
+    r = c.getresponse()
+    assert r.getheader("Connection") == "close"
+    r.read()
+
+
+def test_concurrent_clients_served(server):
+    results = []
+
+    def client():
+        c = _conn(server)
+        for _ in range(10):
+            c.request("GET", "/")
+            results.append(c.getresponse().read())
+        c.close()
+
+    threads = [threading.Thread(target=client) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [b"OK"] * 60
+
+
+def test_idle_connection_times_out(server):
+    s = socket.create_connection(("127.0.0.1", server.port))
+    s.sendall(b"GET / HTTP/1.1\r\n")  # unvollstaendig
+    s.settimeout(3)
+    assert s.recv(100) == b""  # Server schliesst nach read_timeout_s
+    assert server.stats["timeouts"] >= 1
+    s.close()
+
+
+def test_oversized_request_rejected(server):
+    s = socket.create_connection(("127.0.0.1", server.port))
+    s.sendall(b"GET / HTTP/1.1\r\nX: " + b"a" * 4000 + b"\r\n\r\n")
+    s.settimeout(3)
+    assert s.recv(100).startswith(b"HTTP/1.1 413")
+    s.close()
+
+
+def test_invalid_utf8_header_gets_400_and_others_keep_working(server):
+    s = socket.create_connection(("127.0.0.1", server.port))
+    s.sendall(b"GET / HTTP/1.1\r\nX: \xff\xfe\r\n\r\n")
+    s.settimeout(3)
+    data = b""
+    while True:                      # Server schliesst die Verbindung
+        chunk = s.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    assert data.startswith(b"HTTP/1.1 400")
+    s.close()
+    c = _conn(server)
+    c.request("GET", "/")
+    assert c.getresponse().read() == b"OK"
+
+
+def test_rate_limiter_per_ip_and_route():
+    rl = RateLimiter(ip_rate=1.0, ip_burst=2, route_rate=10.0, route_burst=3, max_clients=2)
+    assert rl.check("a", "/status", 0.0) == 0.0
+    assert rl.check("a", "/status", 0.0) == 0.0
+    assert rl.check("a", "/status", 0.0) == pytest.approx(1.0)  # IP-Bucket leer
+    assert rl.check("b", "/status", 0.0) == 0.0
+    assert rl.check("c", "/status", 0.0) > 0    # Route-Bucket leer, Token zurueck an c
+    assert rl.check("a", "/status", 1.0) == 0.0  # nachgefuellt
+    m = rl.metrics()
+    assert m["rejected"] == 2 and m["rejected_by_ip"] == 1
+    assert m["rejected_by_route"] == {"/status": 2}
+    assert m["clients"] == 2                     # Tabelle begrenzt
+
+
+def test_one_client_cannot_starve_a_route():
+    rl = RateLimiter()
+    for i in range(100):                       # "a" haemmert mit 10 Anfragen/s
+        rl.check("a", "/status", i * 0.1)
+    # "b" kommt trotzdem durch: die Route ist groesser als ein IP-Bucket
+    assert rl.check("b", "/status", 10.0) == 0.0
+    assert rl.metrics()["rejected_by_ip"] == rl.metrics()["rejected"]
+
+
+@pytest.mark.parametrize("kwargs", [{"ip_rate": 0}, {"route_rate": 0},
+                                    {"route_limits": {"POST /config": (0, 2)}}])
+def test_rate_limiter_rejects_zero_rate(kwargs):
+    with pytest.raises(ValueError):
+        RateLimiter(**kwargs)
+    with pytest.raises(ValueError):
+        TokenBucket(0, 1, 0.0)
+
+
+def test_rate_limited_request_gets_429():
+    srv = Server(socket, limiter=RateLimiter(ip_rate=0.5, ip_burst=2))
+
+    @srv.route("/", GET)
+    def root(request):
+        return Response(request, "OK")
+
+    srv.start("127.0.0.1", 0)
+    stop = threading.Event()
+
+    def _run():
+        while not stop.is_set():
+            srv.poll(budget_s=0.01)
+            time.sleep(0.005)
+
+    t = threading.Thread(target=_run, daemon=True)
+    t.start()
+    try:
+        c = _conn(srv)
+        codes = []
+        for _ in range(3):
+            c.request("GET", "/")
+            r = c.getresponse()
+            r.read()
+            codes.append(r.status)
+        assert codes == [200, 200, 429]
+        assert r.getheader("Retry-After") == "2"
+        c.request("GET", "/nope")                # unbekannte Route: kein Token
+        assert c.getresponse().status == 404
+    finally:
+        stop.set()
+        t.join()
+        srv.stop()
+
+
+def test_negotiate_accept_encoding():
+    assert negotiate(None) is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip, deflate, br") == "gzip"
+    assert negotiate("deflate") == "deflate"
+    assert negotiate("gzip;q=0.5, deflate") == "deflate"
+    assert negotiate("gzip;q=0, *;q=0.1") == "deflate"
+
+
+def test_large_json_is_compressed_when_accepted(server):
+    c = _conn(server)
+    c.request("GET", "/big", headers={"Accept-Encoding": "gzip"})
+    r = c.getresponse()
+    raw = r.read()
+    assert r.getheader("Content-Encoding") == "gzip"
+    assert r.getheader("Vary") == "Accept-Encoding"
+    assert json.loads(gzip.decompress(raw)) == BIG
+    plain = len(json.dumps(BIG))
+    assert len(raw) < plain / 3
+
+    c.request("GET", "/big", headers={"Accept-Encoding": "deflate"})
+    r = c.getresponse()
+    assert r.getheader("Content-Encoding") == "deflate"
+    assert json.loads(zlib.decompress(r.read())) == BIG
+
+    # ohne Accept-Encoding und bei kleinen Antworten unveraendert
+    c.request("GET", "/big")
+    r = c.getresponse()
+    assert r.getheader("Content-Encoding") is None and json.loads(r.read()) == BIG
+    c.request("GET", "/", headers={"Accept-Encoding": "gzip"})
+    r = c.getresponse()
+    assert r.getheader("Content-Encoding") is None and r.read() == b"OK"
+    assert server.compression["responses"] == 2
+
+
+def test_generated_client_decodes_compressed_body(server):
+    from swagger_client import Configuration
+    from swagger_client.rest import RESTClientObject
+
+    rest = RESTClientObject(Configuration())
+    r = rest.GET("http://127.0.0.1:%d/big" % server.port)
+    assert r.getheader("Content-Encoding") == "gzip"
+    assert json.loads(r.data) == BIG
@@ -0,0 +1,47 @@
+from ledstatus import LedStatus
+
+
+class FakeLed:
+    def __init__(self):
+        self.value = False
+
+
+def test_priority_order():
+    s = LedStatus(FakeLed())
+    assert s.condition() == "ok"
+    s.set("clock_unsynced")
+    s.set("backlog")
+    assert s.condition() == "backlog"
+    s.set("mqtt_down")
+    s.set("wifi_down")
+    assert s.condition() == "wifi_down"
+    s.set("wifi_down", False)
+    assert s.condition() == "mqtt_down"
+
+
+def test_pattern_follows_deadlines_without_sleep():
+    led = FakeLed()
+    s = LedStatus(led, patterns={"mqtt_down": (100, 300), "ok": None})
+    s.set("mqtt_down")
+    trace = []
+    for ms in range(0, 800, 50):
+        s.update(ms / 1000)
+        trace.append(led.value)
+    # an 100 ms, aus 300 ms, wiederholt
+    assert trace == [True, True, False, False, False, False, False, False] * 2
+
+    s.set("mqtt_down", False)
+    s.update(0.85)
+    assert led.value is True and s.current == "ok"
+
+
+def test_pattern_change_restarts_immediately():
+    led = FakeLed()
+    s = LedStatus(led, patterns={"backlog": (1000, 1000), "wifi_down": (100, 100)})
+    s.set("backlog")
+    s.update(0.0)
+    s.update(1.2)
+    assert led.value is False
+    s.set("wifi_down")
+    s.update(1.25)          # nicht bis 2.0 s warten
+    assert led.value is True and s.current == "wifi_down"
@@ -0,0 +1,76 @@
+import pytest
+
+from outbox import Outbox, PRIO_REPLY, PRIO_STATUS, PRIO_TELEMETRY
+
+
+class FakeBroker:
+    def __init__(self, fail_after=None):
+        self.sent = []
+        self.fail_after = fail_after
+
+    def publish(self, topic, payload, qos, retain):
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            raise OSError("broker weg")
+        self.sent.append((topic, payload, qos, retain))
+
+
+def test_drain_sends_by_priority():
+    ob = Outbox(max_inflight=10)
+    ob.put("t/temp", "1", prio=PRIO_TELEMETRY)
+    ob.put("t/reply", "r", prio=PRIO_REPLY)
+    ob.put("t/status", "s", retain=True, prio=PRIO_STATUS)
+
+    broker = FakeBroker()
+    assert ob.drain(broker.publish) == 3
+    assert [m[0] for m in broker.sent] == ["t/status", "t/reply", "t/temp"]
+    assert ob.depth() == 0
+
+
+def test_drop_oldest_when_full():
+    ob = Outbox(capacity=(1, 1, 2))
+    for i in range(4):
+        ob.put("t/temp", str(i))
+    assert ob.dropped == 2
+    assert [m[1] for m in ob.queues[PRIO_TELEMETRY]] == ["2", "3"]
+
+
+def test_coalesce_replaces_pending_topic_only_when_full():
+    ob = Outbox(capacity=(1, 1, 3), policy="coalesce")
+    ob.put("t/temp", "1")
+    ob.put("t/hum", "50")
+    ob.put("t/temp", "2")            # noch Platz: beide Messwerte bleiben
+    assert ob.coalesced == 0
+    ob.put("t/temp", "3")            # voll: die aelteste t/temp-Nachricht weicht
+    assert ob.coalesced == 1 and ob.dropped == 0
+    assert [m[1] for m in ob.queues[PRIO_TELEMETRY]] == ["50", "2", "3"]
+    ob.put("t/co2", "400")           # voll, kein passendes Topic: drop_oldest
+    assert ob.dropped == 1
+    assert [m[1] for m in ob.queues[PRIO_TELEMETRY]] == ["2", "3", "400"]
+
+
+def test_qos1_inflight_window_limits_one_drain():
+    ob = Outbox(max_inflight=2)
+    for i in range(5):
+        ob.put("t/temp", str(i), qos=1)
+    ob.put("t/temp0", "x", qos=0)
+
+    broker = FakeBroker()
+    assert ob.drain(broker.publish) == 2
+    assert ob.depth() == 4
+
+
+def test_failed_publish_keeps_message_queued():
+    ob = Outbox()
+    ob.put("t/a", "1")
+    ob.put("t/b", "2")
+    with pytest.raises(OSError):
+        ob.drain(FakeBroker(fail_after=1).publish)
+    assert ob.failed == 1
+    assert [m[0] for m in ob.queues[PRIO_TELEMETRY]] == ["t/b"]
+    m = ob.metrics()
+    assert m["depth"]["telemetry"] == 1 and m["sent"] == 1
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        Outbox(policy="lifo")
@@ -0,0 +1,44 @@
+import pytest
+
+from remoteconfig import ConfigSync
+
+
+def test_only_newer_versions_apply():
+    sync = ConfigSync()
+    assert sync.offer("group", {"version": 3, "interval": 60}) == ({"interval": 60}, True)
+    assert sync.offer("group", {"version": 2, "interval": 5}) is None
+    assert sync.stale == 1
+    assert sync.status() == {"group": 3, "device": 0}
+
+
+def test_device_override_wins_and_clearing_falls_back():
+    sync = ConfigSync()
+    sync.offer("group", {"version": 1, "interval": 60})
+    assert sync.offer("device", {"version": 1, "interval": 20})[0] == {"interval": 20}
+    sync.offer("group", {"version": 2, "interval": 90})
+    assert sync.effective() == {"interval": 20}
+    assert sync.offer("device", None) == ({"interval": 90}, False)
+
+
+def test_redelivered_retained_config_after_reboot_is_not_new():
+    sync = ConfigSync({"group": 4, "device": 0})
+    assert sync.offer("group", {"version": 4, "interval": 30}) == ({"interval": 30}, False)
+
+
+def test_same_version_after_reconnect_keeps_local_change():
+    # Intervall lokal (POST /config) geaendert, dann Reconnect: retained
+    # Konfiguration kommt mit gleicher Version erneut und darf nichts aendern
+    sync = ConfigSync()
+    assert sync.offer("group", {"version": 2, "interval": 60}) == ({"interval": 60}, True)
+    assert sync.offer("group", {"version": 2, "interval": 60}) is None
+    assert sync.redelivered == 1 and sync.stale == 0
+    assert sync.offer("group", {"version": 3, "interval": 90}) == ({"interval": 90}, True)
+
+
+@pytest.mark.parametrize("msg", [{"interval": 30}, {"version": 1, "interval": 1},
+                                 {"version": 1, "colour": "red"}, {"version": "x"}])
+def test_invalid_config_rejected(msg):
+    sync = ConfigSync()
+    with pytest.raises(ValueError):
+        sync.offer("group", msg)
+    assert sync.rejected == 1 and sync.status() == {"group": 0, "device": 0}
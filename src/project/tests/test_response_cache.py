@@ -0,0 +1,142 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from httpd import GET, POST, JSONResponse, Response, Server
+from swagger_client import ApiClient, Configuration, ConfigSetRequest, DefaultApi
+from swagger_client.cache import CachedResponse, DiskCache, MemoryCache, ResponseCache
+
+TS = "2026-01-19T10:00:00Z"
+
+
+@pytest.fixture
+def device():
+    """Stand-in mit /status (ohne Validatoren) und /config (ETag = Intervall)."""
+    state = {"interval": 10, "calls": [], "not_modified": 0}
+    srv = Server(socket, read_timeout_s=0.5)
+
+    @srv.route("/status", GET)
+    def status(request):
+        state["calls"].append("/status")
+        reading = {"temperature": 21.5, "humidity": 40.0, "timestamp": TS}
+        return JSONResponse(request, {
+            "device_id": "a", "timestamp": TS, "uptime_s": len(state["calls"]),
+            "wifi": {"connected": True, "ip": "127.0.0.1"},
+            "mqtt": {"connected": True, "port": 1883, "base_topic": "x"},
+            "config": {"interval_s": state["interval"]},
+            "last_sensor": reading, "last_published": reading})
+
+    @srv.route("/config", GET)
+    def get_config(request):
+        state["calls"].append("/config")
+        etag = '"%d"' % state["interval"]
+        if request.headers.get("if-none-match") == etag:
+            state["not_modified"] += 1
+            return Response(request, "", status=304, headers={"ETag": etag})
+        return JSONResponse(request, {"interval": state["interval"], "timestamp": TS},
+                            headers={"ETag": etag})
+
+    @srv.route("/config", POST)
+    def set_config(request):
+        state["interval"] = request.json()["interval"]
+        return JSONResponse(request, {"ok": True, "interval": state["interval"],
+                                      "persisted": False, "timestamp": TS})
+
+    @srv.route("/config/set", GET)
+    def set_config_query(request):
+        state["calls"].append("/config/set")
+        state["interval"] = int(request.query_params["interval"])
+        return JSONResponse(request, {"ok": True, "interval": state["interval"],
+                                      "persisted": False, "timestamp": TS})
+
+    srv.start("127.0.0.1", 0)
+    stop = threading.Event()
+
+    def _run():
+        while not stop.is_set():
+            srv.poll()
+            time.sleep(0.002)
+
+    t = threading.Thread(target=_run, daemon=True)
+    t.start()
+    state["url"] = "http://127.0.0.1:%d" % srv.port
+    yield state
+    stop.set()
+    t.join()
+    srv.stop()
+
+
+def _api(url, cache):
+    cfg = Configuration()
+    cfg.host = url
+    cfg.response_cache = cache
+    return DefaultApi(ApiClient(cfg))
+
+
+def test_ttl_hits_and_post_invalidation(device):
+    cache = ResponseCache(ttls={"/status": 60})
+    api = _api(device["url"], cache)
+    first = api.status_get()
+    assert api.status_get().uptime_s == first.uptime_s == 1
+    assert device["calls"] == ["/status"]
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+    # andere Header (z.B. API-Key) sind ein eigener Eintrag
+    api.api_client.set_default_header("x-api-key", "k")
+    assert api.status_get().uptime_s == 2
+
+    # ein POST verwirft alle Antworten des Geraets, auch /status
+    api.config_get()
+    api.config_post(ConfigSetRequest(interval=20))
+    assert cache.stats["invalidations"] == 1
+    assert api.config_get().interval == 20
+    assert api.status_get().config.interval_s == 20
+
+
+def test_mutating_get_is_never_cached(device):
+    cache = ResponseCache(ttls={"/status": 60, "/config/set": 60})
+    api = _api(device["url"], cache)
+    assert api.status_get().config.interval_s == 10
+    api.config_set_get(20)
+    api.config_set_get(20)           # zweimal geschickt, nicht aus dem Cache
+    assert device["calls"].count("/config/set") == 2
+    assert cache.stats["invalidations"] == 2 and cache.stats["stores"] == 1
+    assert api.status_get().config.interval_s == 20
+
+
+def test_etag_revalidation(device):
+    cache = ResponseCache()          # keine TTL: nur mit Validatoren zwischenspeichern
+    api = _api(device["url"], cache)
+    assert api.config_get().interval == 10
+    assert api.config_get().interval == 10
+    assert device["not_modified"] == 1 and cache.stats["revalidated"] == 1
+    # /status ohne ETag und ohne TTL wird nicht gespeichert
+    api.status_get()
+    api.status_get()
+    assert device["calls"].count("/status") == 2 and cache.stats["stores"] == 1
+    assert cache.hit_rate() == pytest.approx(1 / 4)
+
+
+def test_disk_cache_shared_between_clients(device, tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    a = _api(device["url"], ResponseCache(DiskCache(path), ttls={"/status": 60}))
+    b = _api(device["url"], ResponseCache(DiskCache(path), ttls={"/status": 60}))
+    assert a.status_get().uptime_s == b.status_get().uptime_s == 1
+    assert device["calls"] == ["/status"]
+    assert b.api_client.configuration.response_cache.stats["hits"] == 1
+
+
+@pytest.mark.parametrize("make", [lambda p: MemoryCache(max_entries=2),
+                                  lambda p: DiskCache(str(p / "c.sqlite"), max_entries=2)])
+def test_lru_bound(make, tmp_path):
+    backend = make(tmp_path)
+    for key in ("a", "b"):
+        backend.set(key, CachedResponse(200, "OK", {}, key, 0, 1))
+        time.sleep(0.01)
+    backend.get("a")                 # a zuletzt benutzt -> b faellt heraus
+    time.sleep(0.01)
+    backend.set("c", CachedResponse(200, "OK", {}, "c", 0, 1))
+    assert len(backend) == 2 and backend.get("b") is None and backend.get("a").data == "a"
+    assert backend.evictions == 1
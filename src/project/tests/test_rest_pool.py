@@ -0,0 +1,97 @@
+import socket
+import threading
+import time
+
+import pytest
+import urllib3
+
+from httpd import GET, JSONResponse, Server
+from swagger_client import Configuration
+from swagger_client.rest import RESTClientObject
+
+
+@pytest.fixture
+def hosts():
+    """Sechs Stand-in-Geraete mit Keep-Alive."""
+    servers, stop = [], threading.Event()
+    for _ in range(6):
+        srv = Server(socket, read_timeout_s=5.0)
+        srv.route("/", GET)(lambda request: JSONResponse(request, {"ok": True}))
+        srv.start("127.0.0.1", 0)
+        servers.append(srv)
+
+    def _run():
+        while not stop.is_set():
+            for srv in servers:
+                srv.poll()
+            time.sleep(0.001)
+
+    t = threading.Thread(target=_run, daemon=True)
+    t.start()
+    yield ["http://127.0.0.1:%d/" % srv.port for srv in servers]
+    stop.set()
+    t.join()
+    for srv in servers:
+        srv.stop()
+
+
+def _client(**settings):
+    cfg = Configuration()
+    for k, v in settings.items():
+        setattr(cfg, k, v)
+    return RESTClientObject(cfg)
+
+
+def _sweep(client, urls, rounds=3):
+    for _ in range(rounds):
+        for url in urls:
+            assert client.request("GET", url).status == 200
+    return client.pool_stats()
+
+
+def test_one_pool_per_device_reuses_connections(hosts):
+    stats = _sweep(_client(), hosts)
+    assert stats["pools_created"] == stats["connections_opened"] == 6
+    assert stats["requests"] == 18 and stats["pools_evicted"] == 0
+    assert stats["pool_hit_rate"] == stats["connection_reuse_rate"] == pytest.approx(12 / 18)
+
+
+def test_lru_bound_closes_evicted_pools(hosts):
+    # weniger Pools als Geraete: jede Runde verdraengt den aeltesten Pool
+    stats = _sweep(_client(connection_pool_hosts=4), hosts)
+    assert stats["pools_open"] == 4 and stats["pools_evicted"] == 14
+    assert stats["connections_opened"] == stats["requests"] == 18
+
+
+def test_idle_pools_expire(hosts):
+    client = _client(connection_pool_idle_s=0.2)
+    _sweep(client, hosts[:2], rounds=1)
+    time.sleep(0.3)
+    stats = _sweep(client, hosts[2:3], rounds=1)
+    assert stats["pools_open"] == 1 and stats["pools_evicted"] == 2
+
+
+def test_socket_options_and_default_timeouts():
+    pm = _client(socket_keepalive_s=20, connect_timeout=1.5, read_timeout=4.0).pool_manager
+    options = pm.connection_pool_kw["socket_options"]
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in options
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        assert (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 20) in options
+    timeout = pm.connection_pool_kw["timeout"]
+    assert (timeout.connect_timeout, timeout.read_timeout) == (1.5, 4.0)
+
+    pm = _client(socket_keepalive_s=None, connect_timeout=None, read_timeout=None).pool_manager
+    assert "socket_options" not in pm.connection_pool_kw and "timeout" not in pm.connection_pool_kw
+
+
+def test_float_request_timeout():
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen(1)
+    client = _client()
+    t0 = time.perf_counter()
+    with pytest.raises(urllib3.exceptions.MaxRetryError):
+        client.request("GET", "http://127.0.0.1:%d/" % silent.getsockname()[1],
+                       _request_timeout=0.3)
+    assert time.perf_counter() - t0 < 3.0
+    silent.close()
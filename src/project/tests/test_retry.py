@@ -0,0 +1,165 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import urllib3
+
+from swagger_client import ApiClient, Configuration, ConfigSetRequest, DefaultApi
+from swagger_client.rest import ApiException
+from swagger_client.retry import RetryPolicy
+
+TS = "2026-01-19T10:00:00Z"
+READING = {"temperature": 21.5, "humidity": 40.0, "timestamp": TS}
+STATUS = {"device_id": "a", "timestamp": TS, "uptime_s": 1,
+          "wifi": {"connected": True, "ip": "127.0.0.1"},
+          "mqtt": {"connected": True, "port": 1883, "base_topic": "x"},
+          "config": {"interval_s": 10}, "last_sensor": READING, "last_published": READING}
+
+
+class FlakyDevice(ThreadingHTTPServer):
+    """Stand-in, das je Anfrage den naechsten Schritt aus `script` spielt.
+
+    "reset" schliesst die Verbindung ohne Antwort, "503"/"429"/"404" antworten
+    mit dem Status (Retry-After: `retry_after`), "slow" wartet 1 s, sonst 200.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, script, retry_after="0"):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.script = list(script)
+        self.retry_after = retry_after
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def next_step(self, method, path, body):
+        with self.lock:
+            self.requests.append((method, path, body))
+            return self.script.pop(0) if self.script else "ok"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+        step = self.server.next_step(self.command, self.path, body)
+        if step == "reset":
+            self.close_connection = True
+            return
+        if step == "slow":
+            time.sleep(1.0)
+        if step.isdigit():
+            self._reply(int(step), {"error": step}, {"Retry-After": self.server.retry_after})
+        elif self.path.startswith("/status"):
+            self._reply(200, STATUS)
+        else:
+            interval = json.loads(body or "{}").get("interval", 10)
+            self._reply(200, {"ok": True, "interval": interval, "persisted": False, "timestamp": TS})
+
+    do_GET = do_POST = _handle
+
+    def _reply(self, status, data, headers=None):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def device():
+    servers = []
+
+    def start(script, retry_after="0"):
+        srv = FlakyDevice(script, retry_after)
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        servers.append(srv)
+        return srv
+
+    yield start
+    for srv in servers:
+        srv.shutdown()
+        srv.server_close()
+
+
+def _api(port, **policy):
+    sleeps = []
+    cfg = Configuration()
+    cfg.host = "http://127.0.0.1:%d" % port
+    cfg.retry_policy = RetryPolicy(sleep=sleeps.append, **policy)
+    cfg.retry_policy.sleeps = sleeps
+    return DefaultApi(ApiClient(cfg)), cfg.retry_policy
+
+
+def test_get_survives_reset_and_503(device):
+    srv = device(["reset", "503", "429"])
+    api, policy = _api(srv.server_address[1], backoff_base_s=0.1)
+    assert api.status_get().device_id == "a"
+    assert len(srv.requests) == 4
+    assert policy.stats["retries"] == 3 and policy.stats["gave_up"] == 0
+    # volle Streuung: je Versuch hoechstens base * 2^(n-1)
+    assert all(0 <= s <= 0.1 * 2 ** i for i, s in enumerate(policy.sleeps))
+
+
+def test_post_config_is_repeated_with_the_same_body(device):
+    srv = device(["reset", "503"])
+    api, policy = _api(srv.server_address[1])
+    assert api.config_post(ConfigSetRequest(interval=20)).interval == 20
+    bodies = {body for method, path, body in srv.requests}
+    assert len(srv.requests) == 3 and len(bodies) == 1 and json.loads(bodies.pop()) == {"interval": 20}
+
+
+def test_other_posts_and_client_errors_are_not_repeated(device):
+    srv = device(["reset", "404"])
+    api, policy = _api(srv.server_address[1])
+    with pytest.raises(urllib3.exceptions.ProtocolError):
+        api.api_client.call_api("/reboot", "POST", response_type="object")
+    with pytest.raises(ApiException) as e:
+        api.status_get()
+    assert e.value.status == 404
+    assert len(srv.requests) == 2 and policy.stats["retries"] == 0
+
+
+def test_refused_connections_are_retried_up_to_max_attempts():
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    api, policy = _api(port, max_attempts=3)
+    with pytest.raises(urllib3.exceptions.MaxRetryError):
+        api.api_client.call_api("/reboot", "POST", response_type="object")
+    assert policy.stats["attempts"] == 3 and policy.stats["gave_up"] == 1
+
+
+def test_deadline_budget_stops_early(device):
+    srv = device(["503"] * 5, retry_after="30")
+    api, policy = _api(srv.server_address[1], deadline_s=2.0)
+    t0 = time.perf_counter()
+    with pytest.raises(ApiException):
+        api.status_get()
+    # Retry-After 30 s passt nicht ins Budget: kein Schlaf, keine Wiederholung
+    assert time.perf_counter() - t0 < 1.0 and policy.sleeps == []
+    assert len(srv.requests) == 1 and policy.stats["gave_up"] == 1
+
+
+def test_hedged_get_beats_a_slow_device(device):
+    srv = device(["slow"])
+    api, policy = _api(srv.server_address[1], hedge_after_s=0.1)
+    t0 = time.perf_counter()
+    assert api.status_get().device_id == "a"
+    assert time.perf_counter() - t0 < 0.8
+    assert policy.stats["hedges"] == policy.stats["hedge_wins"] == 1
+    # POSTs werden nie parallel doppelt geschickt
+    srv.script = ["slow"]
+    api.config_post(ConfigSetRequest(interval=30))
+    assert [m for m, _, _ in srv.requests].count("POST") == 1
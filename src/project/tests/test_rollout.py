@@ -0,0 +1,127 @@
+import asyncio
+import io
+import json
+import time
+
+import pytest
+
+from fleet.rollout import main, plan_waves, print_table, rollout
+from swagger_client import ConfigSetRequest
+from swagger_client.asyncio_client import AsyncRESTResponse
+from swagger_client.rest import ApiException
+
+TS = "2026-01-19T10:00:00Z"
+
+
+class FakeFleet:
+    """Transport-Ersatz: Geraet je Host, 50 ms Antwortzeit, Verhalten je Geraet.
+
+    "ok" uebernimmt das Intervall, "down" ist nicht erreichbar, "stuck" meldet
+    beim Pruefen weiter das alte Intervall, "locked" verlangt einen anderen Key.
+    """
+
+    def __init__(self, behaviour, delay=0.05):
+        self.behaviour = behaviour
+        self.delay = delay
+        self.interval = {host: 10 for host in behaviour}
+        self.in_flight = self.peak = 0
+
+    async def request(self, method, url, query_params=None, headers=None, body=None,
+                      post_params=None, _preload_content=True, _request_timeout=None):
+        host = url.split("/")[2]
+        kind = self.behaviour[host]
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if kind == "down":
+            raise ConnectionRefusedError(111, "Connection refused")
+        if method == "POST":
+            if kind == "locked" or headers.get("x-api-key") != "k":
+                raise ApiException(status=401, reason="Unauthorized")
+            if kind != "stuck":
+                self.interval[host] = body["interval"]
+            data = {"ok": True, "interval": body["interval"],
+                    "persisted": bool(body.get("persist")), "timestamp": TS}
+        else:
+            data = {"interval": self.interval[host], "timestamp": TS}
+        return AsyncRESTResponse(200, "OK", {"Content-Type": "application/json"}, json.dumps(data))
+
+    async def close(self):
+        pass
+
+
+def _fleet(n, bad=None):
+    behaviour = {"10.0.%d.%d:8080" % (i // 250, i % 250): "ok" for i in range(n)}
+    targets = [("dev-%03d" % i, "http://" + host) for i, host in enumerate(behaviour)]
+    for i, kind in (bad or {}).items():
+        behaviour[targets[i][1][7:]] = kind
+    return targets, FakeFleet(behaviour)
+
+
+def test_plan_waves():
+    targets = list(range(300))
+    assert [len(w) for w in plan_waves(targets)] == [1, 29, 120, 150]
+    assert [len(w) for w in plan_waves(targets, canary=5, steps=(25,))] == [5, 70, 225]
+    assert sum(plan_waves(targets, canary=0, steps=(50, 100)), []) == targets
+    assert plan_waves(targets[:1]) == [[0]] and plan_waves([]) == []
+
+
+def test_300_devices_in_seconds():
+    targets, fleet = _fleet(300)
+    seen = []
+    t0 = time.perf_counter()
+    summary = asyncio.run(rollout(targets, ConfigSetRequest(interval=20, persist=True),
+                                  api_key="k", transport=fleet, on_result=seen.append))
+    assert time.perf_counter() - t0 < 5.0
+    assert summary["applied"] == 300 and summary["aborted"] is None
+    assert summary["waves"] == [1, 29, 120, 150] and len(seen) == 300
+    assert set(fleet.interval.values()) == {20} and fleet.peak == 64
+    assert all(r["persisted"] for r in seen)
+
+
+def test_error_rate_stops_the_rollout():
+    # Welle 1 (Geraete 1..29) mit 3 Fehlern: 10 % > 5 %
+    targets, fleet = _fleet(300, {3: "down", 7: "stuck", 11: "locked"})
+    summary = asyncio.run(rollout(targets, ConfigSetRequest(interval=20), api_key="k",
+                                  transport=fleet))
+    assert summary["aborted"].startswith("wave 1")
+    assert (summary["applied"], summary["failed"], summary["skipped"]) == (27, 3, 270)
+    errors = {r["device_id"]: r["error"] for r in summary["results"] if r["state"] == "failed"}
+    assert errors["dev-003"].startswith("ConnectionRefusedError")
+    assert errors["dev-007"] == "verify: interval 10 statt 20"
+    assert errors["dev-011"] == "HTTP 401"
+    assert list(fleet.interval.values()).count(20) == 27
+
+    out = io.StringIO()
+    print_table(summary["results"], out)
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 301 and "skipped" in lines[-1]
+
+
+def test_failed_canary_touches_nothing_else():
+    targets, fleet = _fleet(20, {0: "down"})
+    summary = asyncio.run(rollout(targets, ConfigSetRequest(interval=20), api_key="k",
+                                  transport=fleet, max_error_rate=0.5))
+    assert summary["aborted"].startswith("wave 0") and summary["skipped"] == 19
+    assert set(fleet.interval.values()) == {10}
+
+
+@pytest.mark.parametrize("deadline, state", [(0.01, "failed"), (1.0, "applied")])
+def test_deadline_per_device(deadline, state):
+    targets, fleet = _fleet(1)
+    summary = asyncio.run(rollout(targets, ConfigSetRequest(interval=20), api_key="k",
+                                  transport=fleet, deadline_s=deadline))
+    assert summary["results"][0]["state"] == state
+
+
+def test_too_small_interval_is_rejected_up_front(capsys):
+    targets, fleet = _fleet(3)
+    with pytest.raises(ValueError):
+        asyncio.run(rollout(targets, ConfigSetRequest(interval=2), api_key="k", transport=fleet))
+    assert fleet.peak == 0                     # kein Geraet angefragt
+    with pytest.raises(SystemExit) as e:
+        main(["--inventory", "unused.json", "--interval", "2"])
+    assert e.value.code == 2 and "--interval" in capsys.readouterr().err
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from fleet.scraper import load_inventory, scrape, scrape_fleet
+from httpd import GET, JSONResponse, Server
+
+
+def _status(device_id, temperature, age_s=0, mqtt=True):
+    ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - age_s))
+    reading = {"temperature": temperature, "humidity": 40.0, "timestamp": ts}
+    return {
+        "device_id": device_id, "timestamp": ts, "uptime_s": 5,
+        "wifi": {"connected": True, "ip": "127.0.0.1"},
+        "mqtt": {"connected": mqtt, "port": 1883, "base_topic": "iiot/x"},
+        "config": {"interval_s": 10},
+        "last_sensor": reading, "last_published": reading,
+    }
+
+
+@pytest.fixture
+def fleet():
+    """Drei antwortende Geraete, ein stummes (Timeout) und ein geschlossener Port."""
+    servers, stop = [], threading.Event()
+    for status in (_status("a", 19.5), _status("b", 24.0, mqtt=False), _status("c", 35.0, age_s=3600)):
+        srv = Server(socket, read_timeout_s=0.5)
+        srv.route("/status", GET)(lambda request, status=status: JSONResponse(request, status))
+        srv.start("127.0.0.1", 0)
+        servers.append(srv)
+
+    def _run():
+        while not stop.is_set():
+            for srv in servers:
+                srv.poll()
+            time.sleep(0.002)
+
+    t = threading.Thread(target=_run, daemon=True)
+    t.start()
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen(1)
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+    targets = [("a", "http://127.0.0.1:%d" % servers[0].port),
+               ("silent", "http://127.0.0.1:%d" % silent.getsockname()[1]),
+               ("b", "http://127.0.0.1:%d" % servers[1].port),
+               ("c", "http://127.0.0.1:%d" % servers[2].port),
+               ("gone", "http://127.0.0.1:%d" % closed_port)]
+    yield targets
+    stop.set()
+    t.join()
+    silent.close()
+    for srv in servers:
+        srv.stop()
+
+
+def test_snapshot_counts_and_extremes(fleet):
+    seen = []
+    t0 = time.perf_counter()
+    snap = asyncio.run(scrape_fleet(fleet, stale_after_s=120, on_result=seen.append,
+                                    concurrency=2, deadline_s=0.5))
+    # das stumme Geraet kostet nur seine Deadline
+    assert time.perf_counter() - t0 < 2.0
+    assert snap["devices"] == 5 and snap["online"] == 3 and snap["offline"] == 2
+    assert snap["errors"]["silent"] == "timeout"
+    assert snap["errors"]["gone"].startswith("ConnectionRefusedError")
+    assert snap["mqtt_disconnected"] == ["b"] and snap["stale"] == ["c"]
+    # c ist veraltet und zaehlt nicht fuer min/max
+    assert snap["temperature"] == {"min": 19.5, "min_device": "a", "max": 24.0, "max_device": "b"}
+    assert seen[-1]["device_id"] == "silent"        # Ergebnisse in Eintreffreihenfolge
+    json.dumps(seen)
+
+
+def test_scrape_streams_results(fleet):
+    async def run():
+        out = []
+        async for result in scrape(fleet[:1], deadline_s=1.0):
+            out.append(result)
+        return out
+
+    (result,) = asyncio.run(run())
+    assert result["ok"] and result["status"]["device_id"] == "a"
+
+
+def test_load_inventory_formats(tmp_path):
+    cache = tmp_path / "devices.json"
+    cache.write_text(json.dumps([{"device_id": "a", "ip": "10.0.0.5", "port": 8080},
+                                 {"device_id": "b", "url": "http://10.0.0.6:80"}]))
+    assert load_inventory(str(cache)) == [("a", "http://10.0.0.5:8080"), ("b", "http://10.0.0.6:80")]
+    mapping = tmp_path / "map.json"
+    mapping.write_text(json.dumps({"c": "10.0.0.7:8080"}))
+    assert load_inventory(str(mapping)) == [("c", "http://10.0.0.7:8080")]
+    text = tmp_path / "devices.txt"
+    text.write_text("# Halle 1\nd http://10.0.0.8:8080\n\ne 10.0.0.9:8080  # Lager\n")
+    assert load_inventory(str(text)) == [("d", "http://10.0.0.8:8080"), ("e", "http://10.0.0.9:8080")]
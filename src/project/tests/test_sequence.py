@@ -0,0 +1,68 @@
+import contextlib
+import io
+import json
+
+from fleet.sequence import (DUPLICATE, GAP, LATE, OK, REORDERED, RESTART, STALE,
+                            SequenceTracker, main)
+
+
+def _msg(epoch, seq):
+    return json.dumps({"device_id": "sensor", "value": 21.0, "epoch": epoch, "seq": seq})
+
+
+def test_gaps_duplicates_and_reordering():
+    tr = SequenceTracker(window=8)
+    kinds = [tr.observe("t", 7, s) for s in (1, 2, 3, 6, 5, 5, 7)]
+    assert kinds == [OK, OK, OK, GAP, REORDERED, DUPLICATE, OK]
+    st = tr.stats("t")
+    # 4 fehlt, 5 kam verspaetet nach
+    assert st["expected"] == 7 and st["received"] == 6 and st["missing"] == 1
+    assert st["duplicates"] == 1 and st["reordered"] == 1
+    assert abs(tr.loss_rates()["t"] - 1 / 7) < 1e-9
+
+
+def test_late_beyond_window_and_join_mid_stream():
+    tr = SequenceTracker(window=4)
+    assert tr.observe("t", 1, 100) == OK      # Einstieg mitten im Stream: kein Verlust
+    assert tr.observe("t", 1, 99) == LATE     # vor dem Einstieg
+    assert tr.observe("t", 1, 110) == GAP
+    assert tr.observe("t", 1, 101) == LATE    # aelter als das Fenster
+    st = tr.stats("t")
+    assert st["missing"] == 9 and st["late"] == 2 and st["expected"] == 11
+
+
+def test_restart_starts_new_epoch_and_counts_lost_head():
+    tr = SequenceTracker()
+    for s in (1, 2, 3):
+        tr.observe("t", 11, s)
+    assert tr.observe("t", 22, 3) == RESTART  # 1 und 2 des neuen Boots fehlen
+    assert tr.observe("t", 11, 4) == STALE    # Nachzuegler des alten Boots
+    assert tr.observe("t", 22, 4) == OK
+    st = tr.stats("t")
+    assert st["restarts"] == 1 and st["stale"] == 1
+    assert st["expected"] == 3 + 4 and st["missing"] == 2
+
+
+def test_constant_memory_per_stream():
+    tr = SequenceTracker(window=64)
+    for s in range(1, 10001):
+        if s % 100:
+            tr.observe("t", 5, s)
+    st = tr.streams["t"]
+    assert st.mask < (1 << 64)
+    assert tr.stats("t")["missing"] == 99
+
+
+def test_ingest_and_cli_report():
+    tr = SequenceTracker()
+    assert tr.ingest("a/temperature", _msg(3, 1)) == OK
+    assert tr.ingest("a/temperature", "{\"value\": 1}") is None
+    assert tr.ingest("a/temperature", "kein json") is None
+
+    lines = "".join("a/humidity %s\n" % _msg(3, s) for s in (1, 2, 4, 4))
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        main(["--json"], stdin=io.StringIO(lines))
+    row = json.loads(out.getvalue().splitlines()[-1])
+    assert row["stream"] == "a/humidity"
+    assert row["missing"] == 1 and row["duplicates"] == 1 and row["loss_rate"] == 0.25